@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""Zil çizelgelerinin yerel ağ üzerinden dağıtımı.
+
+Denetleyici, kendi veri dosyasındaki çizelgeyi, takvim istisnalarını ve zil seslerini kayıtlı
+düğümlere (zil çalan bilgisayarlara) asyncio TCP üzerinden gönderir. İletiler satır sonuyla ayrılmış
+JSON'dur. Düğüm bağlanınca elindeki belgenin özetini bildirir; denetleyici yalnızca o belgeden bu yana
+değişen alanları (delta) ve düğümde olmayan ses dosyalarını gönderir. Düğüm her güncellemeyi yerel
+dosyalara yazdıktan sonra onaylar.
+
+Denetleyiciye ulaşılamazsa düğüm yerel veri dosyası ve ses önbelleğiyle zil çalmaya devam eder; aynı
+makinedeki zamanlayıcı çekirdeği değişen veri dosyasını kendisi yeniden yükler.
+
+    python3 ag_dagitimi.py controller --port 5577 --token GIZLI
+    python3 ag_dagitimi.py node --controller 192.168.1.10:5577 --node-id lab-1 --token GIZLI
+"""
+
+import argparse
+import asyncio
+import base64
+import copy
+import hashlib
+import hmac
+import json
+import os
+import socket
+import sys
+from collections import OrderedDict
+from datetime import datetime
+
+from loglama import get_logger, setup_logging
+from veri_deposu import JournaledDataStore, write_file_atomic
+
+log = get_logger(__name__)
+
+DEFAULT_PORT = 5577
+# Düğümlere dağıtılan alanlar; ses aygıtları ve logo gibi makineye özel ayarlar düğümde kalır
+DISTRIBUTED_KEYS = ("school_name", "bell_sound_paths", "catch_up_window_seconds", "bell_max_durations", "bell_priorities",
+                    "lesson_times", "calendar_overrides")
+ASSET_PREFIX = "asset:"
+ASSET_DIR_NAME = "dagitim_sesleri"
+NODE_STATE_FILE_NAME = "dagitim_durumu.json"
+REGISTRY_FILE_NAME = "dagitim_dugumleri.json"
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024 # base64 ile gönderilen ses dosyaları bu sınıra sığmalı
+POLL_INTERVAL_SECS = 2.0
+ACK_TIMEOUT_SECS = 30.0
+HISTORY_SIZE = 20
+RECONNECT_DELAY_SECS = (1.0, 30.0) # en kısa, en uzun
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def document_hash(document):
+    return hashlib.sha256(json.dumps(document, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+EMPTY_DOCUMENT_HASH = document_hash({})
+
+def diff_documents(old, new, path=()):
+    """İki belge arasındaki farkı (değişen yollar ve değerleri, silinen yollar) döndürür.
+    Sözlükler alan alan karşılaştırılır; listeler ve diğer değerler bütün olarak değiştirilir."""
+    changes, removed = [], []
+    for key, value in new.items():
+        old_value = old.get(key)
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            sub_changes, sub_removed = diff_documents(old_value, value, path + (key,))
+            changes.extend(sub_changes)
+            removed.extend(sub_removed)
+        elif key not in old or old_value != value:
+            changes.append([list(path + (key,)), value])
+    removed.extend(list(path + (key,)) for key in old if key not in new)
+    return changes, removed
+
+def apply_delta(document, changes, removed):
+    """Farkı belgenin bir kopyasına uygular."""
+    document = copy.deepcopy(document)
+    for key_path in removed:
+        parent = document
+        for key in key_path[:-1]:
+            parent = parent.get(key, {})
+        parent.pop(key_path[-1], None)
+    for key_path, value in changes:
+        parent = document
+        for key in key_path[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[key_path[-1]] = value
+    return document
+
+def asset_refs(document):
+    """Belgedeki ses dosyası başvurularını ({ses özeti: başvuru}) döndürür."""
+    refs = {}
+    for path in document.get("bell_sound_paths", {}).values():
+        if isinstance(path, str) and path.startswith(ASSET_PREFIX):
+            refs[path[len(ASSET_PREFIX):].split("/", 1)[0]] = path
+    return refs
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+async def read_message(reader):
+    """Bir JSON iletisi okur; bağlantı kapandıysa None döndürür."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise ProtocolError(f"Geçersiz ileti: {e}")
+    if not isinstance(message, dict):
+        raise ProtocolError(f"İleti bir JSON nesnesi olmalı: {line[:80]!r}")
+    return message
+
+async def write_message(writer, message):
+    writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+# --- Denetleyici ---
+class BellController:
+    """Veri dosyasını izler ve değişiklikleri bağlı düğümlere delta olarak dağıtır."""
+
+    def __init__(self, data_file, token, host="0.0.0.0", port=DEFAULT_PORT, registry_file=None,
+                 poll_interval=POLL_INTERVAL_SECS):
+        self.data_file = data_file
+        self.token = token
+        self.host = host
+        self.port = port
+        self.registry_file = registry_file or os.path.join(os.path.dirname(data_file), REGISTRY_FILE_NAME)
+        self.poll_interval = poll_interval
+
+        self.version = 0
+        self.document = {}
+        self.history = OrderedDict() # belge özeti -> belge; düğümün elindeki belgeye göre delta hesaplamak için
+        self.assets = {} # ses özeti -> denetleyicideki dosya yolu
+        self.registry = {"version": 0, "document_hash": EMPTY_DOCUMENT_HASH, "nodes": {}}
+        self._asset_hash_cache = {} # yol -> ((mtime, boyut), özet)
+        self._data_file_signature = None
+        self._sessions = {} # düğüm adı -> değişiklik olayı
+        self._server = None
+
+    async def start(self):
+        self._load_registry()
+        self.version = self.registry.get("version", 0)
+        self._try_reload_document() # Bozuk veri dosyası düzeltilene kadar boş belgeyle dinlenir
+        self._server = await asyncio.start_server(self._handle_node, self.host, self.port, limit=MAX_MESSAGE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        asyncio.get_running_loop().create_task(self._poll_data_file())
+        log.info("Denetleyici %s:%d adresinde dinliyor (sürüm %d).", self.host, self.port, self.version)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def _load_registry(self):
+        if os.path.exists(self.registry_file):
+            try:
+                with open(self.registry_file, 'r', encoding='utf-8') as f:
+                    self.registry.update(json.load(f))
+            except (OSError, ValueError) as e:
+                log.warning("Düğüm kayıtları okunamadı: %s", e)
+
+    def _save_registry(self):
+        try:
+            write_file_atomic(self.registry_file, json.dumps(self.registry, ensure_ascii=False, indent=2))
+        except OSError as e:
+            log.warning("Düğüm kayıtları yazılamadı: %s", e)
+
+    async def _poll_data_file(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self._try_reload_document()
+
+    def _try_reload_document(self):
+        try:
+            self.reload_document()
+        except Exception as e:
+            log.warning("Veri dosyası okunamadı: %s", e)
+
+    def reload_document(self):
+        """Veri dosyası değiştiyse dağıtılacak belgeyi yeniden kurar ve bağlı düğümleri uyandırır."""
+        try:
+            stat_result = os.stat(self.data_file)
+            signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        except OSError:
+            signature = None
+        if signature == self._data_file_signature:
+            return
+        self._data_file_signature = signature
+        data = {}
+        if signature is not None:
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        document = {key: copy.deepcopy(data[key]) for key in DISTRIBUTED_KEYS if key in data}
+        if "bell_sound_paths" in document:
+            document["bell_sound_paths"] = {bell_type: self._asset_ref(path)
+                                            for bell_type, path in document["bell_sound_paths"].items()}
+        new_hash = document_hash(document)
+        if new_hash == document_hash(self.document):
+            return
+        self.document = document
+        self.history[new_hash] = document
+        while len(self.history) > HISTORY_SIZE:
+            self.history.popitem(last=False)
+        if new_hash != self.registry.get("document_hash"):
+            self.version += 1
+            self.registry["version"] = self.version
+            self.registry["document_hash"] = new_hash
+            self._save_registry()
+        log.info("Dağıtılacak belge güncellendi: sürüm %d.", self.version)
+        for changed in self._sessions.values():
+            changed.set()
+
+    def _asset_ref(self, path):
+        """Ses dosyası yolunu düğümde çözülecek "asset:<özet>/<ad>" başvurusuna çevirir."""
+        if not path or not os.path.isfile(path):
+            if path:
+                log.warning("Dağıtılacak ses dosyası bulunamadı: %s", path)
+            return ""
+        stat_result = os.stat(path)
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._asset_hash_cache.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, file_sha256(path))
+            self._asset_hash_cache[path] = cached
+        self.assets[cached[1]] = path
+        return f"{ASSET_PREFIX}{cached[1]}/{os.path.basename(path)}"
+
+    async def _handle_node(self, reader, writer):
+        address = writer.get_extra_info("peername")
+        node_id = None
+        inbox = asyncio.Queue()
+        reader_task = asyncio.get_running_loop().create_task(self._read_into(reader, inbox))
+        try:
+            hello = await asyncio.wait_for(inbox.get(), ACK_TIMEOUT_SECS)
+            if not hello or hello.get("type") != "hello":
+                raise ProtocolError("İlk ileti 'hello' olmalı.")
+            if not hmac.compare_digest(str(hello.get("token", "")).encode("utf-8"), self.token.encode("utf-8")):
+                await write_message(writer, {"type": "error", "error": "Geçersiz anahtar"})
+                raise ProtocolError("Geçersiz anahtar")
+            node_id = str(hello.get("node_id") or address)
+            if node_id in self._sessions:
+                raise ProtocolError(f"'{node_id}' zaten bağlı.")
+            changed = self._sessions[node_id] = asyncio.Event()
+            self._register_node(node_id, address)
+            log.info("Düğüm bağlandı: %s %s", node_id, address)
+
+            base = await self._node_base_document(hello, writer, inbox)
+            node_assets = set(hello.get("assets", []))
+            while True:
+                if document_hash(base) != document_hash(self.document):
+                    base = await self._send_update(node_id, base, node_assets, writer, inbox)
+                changed.clear()
+                if document_hash(base) != document_hash(self.document):
+                    continue # Onay beklenirken belge yine değişti
+                waiter = asyncio.get_running_loop().create_task(changed.wait())
+                getter = asyncio.get_running_loop().create_task(inbox.get())
+                done, pending = await asyncio.wait({waiter, getter}, return_when=asyncio.FIRST_COMPLETED)
+                for task in pending:
+                    task.cancel()
+                if getter in done and getter.result() is None:
+                    break # Bağlantı kapandı
+        except (ProtocolError, asyncio.TimeoutError, OSError) as e:
+            # OSError: bağlantı hataları ve yoklamadan sonra silinen veya okunamayan ses dosyası
+            log.warning("Düğüm bağlantısı kesildi (%s): %s", node_id or address, e)
+        finally:
+            reader_task.cancel()
+            if node_id is not None and node_id in self._sessions:
+                del self._sessions[node_id]
+                log.info("Düğüm ayrıldı: %s", node_id)
+            writer.close()
+
+    async def _read_into(self, reader, inbox):
+        try:
+            while True:
+                message = await read_message(reader)
+                await inbox.put(message)
+                if message is None:
+                    return
+        except (ProtocolError, ConnectionError, ValueError) as e:
+            # Aşırı uzun satır ValueError olarak gelir
+            log.warning("Düğüm iletisi okunamadı: %s", e)
+            await inbox.put(None)
+
+    def _register_node(self, node_id, address):
+        node = self.registry["nodes"].setdefault(node_id, {"version": 0})
+        node["address"] = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+        node["last_seen"] = datetime.now().isoformat(timespec="seconds")
+        self._save_registry()
+
+    async def _node_base_document(self, hello, writer, inbox):
+        """Düğümün elindeki belgeyi bulur; tanınmıyorsa düğümden ister."""
+        node_hash = hello.get("document_hash", EMPTY_DOCUMENT_HASH)
+        if node_hash == EMPTY_DOCUMENT_HASH:
+            return {}
+        if node_hash in self.history:
+            return self.history[node_hash]
+        # Denetleyici yeniden başlatılmış veya düğüm çok eski; yine de yalnızca fark gönderilsin
+        await write_message(writer, {"type": "state_request"})
+        reply = await asyncio.wait_for(inbox.get(), ACK_TIMEOUT_SECS)
+        if not reply or reply.get("type") != "state":
+            raise ProtocolError("Düğüm durumunu göndermedi.")
+        return reply.get("document", {})
+
+    async def _send_update(self, node_id, base, node_assets, writer, inbox):
+        """Düğüme eksik sesleri ve belgedeki farkı gönderir, onayı bekler. Düğümün yeni belgesini döndürür."""
+        document, version = self.document, self.version
+        for asset_hash, ref in asset_refs(document).items():
+            if asset_hash in node_assets:
+                continue
+            with open(self.assets[asset_hash], 'rb') as f:
+                data = base64.b64encode(f.read()).decode("ascii")
+            await write_message(writer, {"type": "asset", "sha256": asset_hash, "name": ref.split("/", 1)[1], "data": data})
+            node_assets.add(asset_hash)
+
+        changes, removed = diff_documents(base, document)
+        await write_message(writer, {"type": "update", "version": version, "base_hash": document_hash(base),
+                                     "document_hash": document_hash(document), "changes": changes, "removed": removed})
+        reply = await asyncio.wait_for(inbox.get(), ACK_TIMEOUT_SECS)
+        if reply is None:
+            raise ConnectionError("Onay beklenirken bağlantı kapandı.")
+        if reply.get("type") != "ack" or reply.get("version") != version:
+            raise ProtocolError(f"Güncelleme onaylanmadı: {reply.get('error', reply)}")
+        self.registry["nodes"][node_id]["version"] = version
+        self._save_registry()
+        log.info("Düğüm %s sürüm %d'i onayladı (%d değişiklik).", node_id, version, len(changes) + len(removed))
+        return document
+
+
+# --- Düğüm ---
+class BellNode:
+    """Denetleyiciye bağlanır, güncellemeleri yerel veri dosyasına ve ses önbelleğine yazar."""
+
+    def __init__(self, host, port, node_id, token, data_file):
+        self.host = host
+        self.port = port
+        self.node_id = node_id
+        self.token = token
+        self.data_file = data_file
+        self.app_data_dir = os.path.dirname(data_file)
+        self.asset_dir = os.path.join(self.app_data_dir, ASSET_DIR_NAME)
+        self.state_file = os.path.join(self.app_data_dir, NODE_STATE_FILE_NAME)
+        self.version = 0
+        self.document = {}
+        os.makedirs(self.asset_dir, exist_ok=True)
+        self._load_state()
+
+    def _load_state(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.version = state.get("version", 0)
+            self.document = state.get("document", {})
+        except (OSError, ValueError) as e:
+            log.warning("Dağıtım durumu okunamadı, tam güncelleme istenecek: %s", e)
+
+    def local_assets(self):
+        return [os.path.splitext(name)[0] for name in os.listdir(self.asset_dir) if not name.endswith(".tmp")]
+
+    def asset_path(self, ref):
+        asset_hash, name = ref[len(ASSET_PREFIX):].split("/", 1)
+        return os.path.join(self.asset_dir, asset_hash + os.path.splitext(name)[1].lower())
+
+    async def run_forever(self):
+        """Bağlantı koparsa artan aralıklarla yeniden bağlanır; bu sırada yerel kayıtlar kullanılmaya devam eder."""
+        delay = RECONNECT_DELAY_SECS[0]
+        while True:
+            try:
+                await self.run_session()
+                delay = RECONNECT_DELAY_SECS[0]
+            except (OSError, ProtocolError, asyncio.TimeoutError, ValueError, KeyError) as e:
+                # ValueError: aşırı uzun satır veya bozuk base64; KeyError: eksik alanlı ileti
+                log.warning("Denetleyiciye bağlanılamadı (%s:%d): %s. Yerel çizelge kullanılıyor.", self.host, self.port, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_DELAY_SECS[1])
+
+    async def run_session(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_MESSAGE_BYTES)
+        try:
+            await write_message(writer, {"type": "hello", "node_id": self.node_id, "token": self.token,
+                                         "version": self.version, "document_hash": document_hash(self.document),
+                                         "assets": self.local_assets()})
+            log.info("Denetleyiciye bağlanıldı: %s:%d", self.host, self.port)
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    log.warning("Denetleyici bağlantıyı kapattı.")
+                    return
+                kind = message.get("type")
+                if kind == "asset":
+                    self._store_asset(message)
+                elif kind == "state_request":
+                    await write_message(writer, {"type": "state", "document": self.document})
+                elif kind == "update":
+                    await write_message(writer, self._apply_update(message))
+                elif kind == "error":
+                    raise ProtocolError(message.get("error", "Bilinmeyen hata"))
+        finally:
+            writer.close()
+
+    def _store_asset(self, message):
+        for key in ("sha256", "name", "data"):
+            if not isinstance(message.get(key), str):
+                raise ProtocolError(f"Ses iletisinde '{key}' alanı eksik veya geçersiz.")
+        name = os.path.basename(message["name"])
+        data = base64.b64decode(message["data"], validate=True)
+        if hashlib.sha256(data).hexdigest() != message["sha256"]:
+            raise ProtocolError(f"Ses dosyası bozuk geldi: {name}")
+        path = self.asset_path(f"{ASSET_PREFIX}{message['sha256']}/{name}")
+        with open(path + ".tmp", 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        log.info("Ses dosyası alındı: %s", name)
+
+    def _apply_update(self, message):
+        """Güncellemeyi uygular ve gönderilecek onay/ret iletisini döndürür."""
+        version = message.get("version")
+        if message.get("base_hash") != document_hash(self.document):
+            return {"type": "nack", "version": version, "error": "Temel belge uyuşmuyor."}
+        document = apply_delta(self.document, message.get("changes", []), message.get("removed", []))
+        if document_hash(document) != message.get("document_hash"):
+            return {"type": "nack", "version": version, "error": "Uygulanan belge özeti uyuşmuyor."}
+        missing = [ref for ref in asset_refs(document).values() if not os.path.exists(self.asset_path(ref))]
+        if missing:
+            return {"type": "nack", "version": version, "error": f"Eksik ses dosyaları: {missing}"}
+        try:
+            self._write_local_data(document)
+            write_file_atomic(self.state_file, json.dumps({"version": version, "document": document}, ensure_ascii=False))
+        except (OSError, ValueError) as e:
+            # ValueError: yerel veri dosyası bozuk
+            return {"type": "nack", "version": version, "error": str(e)}
+        self.document = document
+        self.version = version
+        log.info("Sürüm %d uygulandı.", version)
+        return {"type": "ack", "version": version}
+
+    def _write_local_data(self, document):
+        """Dağıtılan alanları yerel veri dosyasına işler; makineye özel diğer alanlara dokunmaz.
+        Günlükteki yerel düzenlemeler önce uygulanır, sonra günlük boşaltılır; yoksa uygulama açılışta
+        eski günlüğü yeni görüntünün üzerine oynatıp güncellemeyi geri alırdı."""
+        store = JournaledDataStore(self.data_file)
+        data = store.load() or {}
+        for key in DISTRIBUTED_KEYS:
+            if key in document:
+                data[key] = copy.deepcopy(document[key])
+            else:
+                data.pop(key, None)
+        if "bell_sound_paths" in data:
+            data["bell_sound_paths"] = {bell_type: self.asset_path(ref) if ref.startswith(ASSET_PREFIX) else ref
+                                        for bell_type, ref in data["bell_sound_paths"].items()}
+        store.save_snapshot_now(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ATAM Okul Zili çizelge dağıtımı.")
+    parser.add_argument("mode", choices=["controller", "node"], help="Denetleyici ya da düğüm olarak çalışır.")
+    parser.add_argument("--data-file", help="Kullanılacak veri dosyası (varsayılan: uygulama veri dizinindeki okul_zili_data.json).")
+    parser.add_argument("--token", required=True, help="Denetleyici ile düğümlerin paylaştığı anahtar.")
+    parser.add_argument("--host", default="0.0.0.0", help="Denetleyicinin dinleyeceği adres.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Denetleyicinin dinleyeceği kapı.")
+    parser.add_argument("--controller", help="Düğüm kipinde denetleyicinin adresi (makine:kapı).")
+    parser.add_argument("--node-id", help="Düğüm kipinde bu makinenin adı (varsayılan: makine adı).")
+    parser.add_argument("--debug", action="store_true", help="Hata ayıklama (DEBUG) kayıtlarını da yazar.")
+    args = parser.parse_args(argv)
+
+    if args.data_file:
+        data_file = os.path.abspath(args.data_file)
+    else:
+        from zil_cekirdegi import get_app_data_directory, DATA_FILE_NAME
+        data_file = os.path.join(get_app_data_directory(), DATA_FILE_NAME)
+    os.makedirs(os.path.dirname(data_file), exist_ok=True)
+    setup_logging(os.path.dirname(data_file), debug=args.debug or None)
+
+    if args.mode == "controller":
+        runner = BellController(data_file, args.token, args.host, args.port).serve_forever()
+    else:
+        if not args.controller:
+            parser.error("Düğüm kipinde --controller gereklidir.")
+        host, _, port = args.controller.rpartition(":")
+        node_id = args.node_id or socket.gethostname()
+        runner = BellNode(host or args.controller, int(port) if host else DEFAULT_PORT, node_id, args.token, data_file).run_forever()
+    try:
+        asyncio.run(runner)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
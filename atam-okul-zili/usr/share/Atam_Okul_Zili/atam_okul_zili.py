@@ -5,65 +5,213 @@ from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QPushButton, QLineEdit, QTabWidget,
                              QGridLayout, QFrame, QSizePolicy, QSpacerItem,
                              QStyle, QFileDialog, QDialog, QMessageBox, QMenu,
-                             QTabBar) # QTabBar eklendi
-from PyQt5.QtCore import Qt, QTimer, QTime, QDate, QSize, QUrl, QDateTime
+                             QTabBar, QSpinBox, QTableView, QStyledItemDelegate,
+                             QHeaderView, QAbstractItemView, QDateEdit, QComboBox,
+                             QCheckBox, QTableWidget, QTableWidgetItem,
+                             QGraphicsOpacityEffect, QInputDialog, QTimeEdit) # QTabBar eklendi
+from PyQt5.QtCore import (Qt, QTimer, QDate, QTime, QSize, QAbstractTableModel, QModelIndex,
+                          QSortFilterProxyModel, pyqtSignal)
 from PyQt5.QtGui import QFont, QPixmap, QIcon, QColor # QColor eklendi
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent 
+from PyQt5.QtMultimedia import QMediaPlayer
 
-import json
 import os
-import platform
 
-# --- Medya Oynatıcı Fonksiyonu ---
-_player_instance = QMediaPlayer()
-
-def _play_sound(file_path, parent_widget=None):
-    """Verilen dosya yolundaki sesi çalar."""
-    print(f"DEBUG: _play_sound çağrıldı. file_path: {file_path}")
-    print(f"DEBUG: Player state before playing: {_player_instance.state()}")
+from zil_cekirdegi import (OkulZiliCekirdegi, AlreadyRunningError, SIRENLER_BASE_PATH, DEFAULT_CONTROL_PORT,
+                           day_name_for_date, get_app_data_directory)
+from ders_cizelgesi import (DAY_NAMES, WEEKDAY_NAMES, SESSIONS, LESSON_KEYS, BELL_TYPES, DEFAULT_TEACHER_LEAD_SECS,
+                            ScheduleConflict, time_str_to_seconds)
+from cizelge_aktarimi import import_schedule, export_schedule
+from ses_oynatici import (get_audio_router, get_sound_cache, is_playing, available_output_devices,
+                          DEFAULT_ZONE, DEFAULT_DEVICE, NULL_DEVICE)
+from baslangic_olcumu import StartupProfile
+from calma_planlayici import get_playback_scheduler, PRIORITY_TEST
+from gecikme_olcumu import METRIC_NAMES, PERCENTILES
+from takvim import DateOverride, DATE_FORMAT
+from loglama import get_logger, setup_logging
+from saat import get_clock
+
+log = get_logger("arayuz")
+
+STARTUP_FALLBACK_MSECS = 3000 # İlk çizim gelmezse arka plan işlerinin başlatılacağı süre
+INDICATOR_MIN_DISPLAY_MSECS = 2000 # Çok kısa seslerde de "zil çalıyor" göstergesi fark edilsin
+MAX_LISTED_CONFLICTS = 3 # Gün sekmesinin altında listelenen en fazla çakışma
 
-    if not file_path:
-        error_message = "Ses dosyası yolu boş."
-        print(f"DEBUG: {error_message}")
+# --- Medya Oynatıcı Fonksiyonu ---
+def _play_sound(file_path, parent_widget=None, channel=None, zone=DEFAULT_ZONE):
+    """Verilen dosya yolundaki sesi deneme önceliğiyle bölgede çalar; çalınamazsa kullanıcıyı uyarır.
+    Zil, siren veya marş çalarken deneme sesi onları kesmez."""
+    error_message = get_playback_scheduler().submit(file_path, PRIORITY_TEST, channel, zone, label="Deneme").error
+    if error_message:
         if parent_widget:
             QMessageBox.warning(parent_widget, "Ses Çalma Hatası", error_message)
         else:
-            print(f"Uyarı: {error_message}")
-        return
+            log.warning("%s", error_message)
 
-    url = QUrl.fromLocalFile(file_path)
-    if not url.isValid():
-        error_message = f"Ses dosyası yolu geçersiz bir URL formatında: {file_path}"
-        print(f"DEBUG: {error_message}")
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Ses Çalma Hatası", error_message)
-        else:
-            print(f"Uyarı: {error_message}")
-        return
 
-    if not os.path.exists(file_path):
-        error_message = f"Ses dosyası bulunamadı: {file_path}"
-        print(f"DEBUG: {error_message}")
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Ses Çalma Hatası", error_message)
-        else:
-            print(f"Uyarı: {error_message}")
-        return
+# --- Zil Saatleri Tablo Modeli ---
+class LessonTimesModel(QAbstractTableModel):
+    """Tüm günlerin zil saatlerini tek bir tabloda sunar.
+
+    Satırlar gün × ders (7 × 9), sütunlar oturum × zil tipi (2 × 3) şeklindedir.
+    Veriler çekirdekteki lesson_times çizelgesinden okunur ve yine oraya yazılır.
+    Aynı anda çalan veya bir önceki zili kesen ziller renkle ve ipucuyla işaretlenir.
+    """
+    conflictsChanged = pyqtSignal(str) # gün
+
+    CONFLICT_COLORS = {ScheduleConflict.COLLISION: "#f8d0d0", ScheduleConflict.OVERLAP: "#fbeec1"}
+
+    def __init__(self, core, parent=None):
+        super().__init__(parent)
+        self.core = core
+        self._conflicts = {} # gün -> ScheduleConflict listesi; gün düzenlenince yeniden hesaplanır
+        self._slot_conflicts = {} # gün -> {(oturum, ders, zil tipi): ScheduleConflict}
+
+    def conflicts(self, day):
+        if day not in self._conflicts:
+            conflicts = self.core.schedule_conflicts(day)
+            slot_conflicts = {}
+            for conflict in conflicts:
+                for entry in conflict.entries:
+                    # Aynı yuvada çakışma, kesmeden daha önemlidir
+                    existing = slot_conflicts.get(entry[1:])
+                    if existing is None or existing.kind != ScheduleConflict.COLLISION:
+                        slot_conflicts[entry[1:]] = conflict
+            self._conflicts[day] = conflicts
+            self._slot_conflicts[day] = slot_conflicts
+        return self._conflicts[day]
+
+    def invalidate_conflicts(self, day=None):
+        """Günün (verilmezse tüm günlerin) çakışmalarını yeniden hesaplatır ve görünümleri yeniler."""
+        days = [day] if day is not None else DAY_NAMES
+        for invalid_day in days:
+            self._conflicts.pop(invalid_day, None)
+            self._slot_conflicts.pop(invalid_day, None)
+            first_row = DAY_NAMES.index(invalid_day) * len(LESSON_KEYS)
+            self.dataChanged.emit(self.index(first_row, 0),
+                                  self.index(first_row + len(LESSON_KEYS) - 1, self.columnCount() - 1),
+                                  [Qt.BackgroundRole, Qt.ToolTipRole])
+            self.conflictsChanged.emit(invalid_day)
+
+    def _conflict_for_index(self, index):
+        day, session, lesson_key, bell_type = self.slot_for_index(index)
+        self.conflicts(day)
+        return self._slot_conflicts[day].get((session, lesson_key, bell_type))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(DAY_NAMES) * len(LESSON_KEYS)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(SESSIONS) * len(BELL_TYPES)
+
+    def slot_for_index(self, index):
+        """Model indeksine karşılık gelen (gün, oturum, ders, zil tipi) dörtlüsünü döndürür."""
+        row, column = index.row(), index.column()
+        return (DAY_NAMES[row // len(LESSON_KEYS)], SESSIONS[column // len(BELL_TYPES)],
+                LESSON_KEYS[row % len(LESSON_KEYS)], BELL_TYPES[column % len(BELL_TYPES)])
+
+    def index_for_slot(self, day, session, lesson_key, bell_type):
+        row = DAY_NAMES.index(day) * len(LESSON_KEYS) + LESSON_KEYS.index(lesson_key)
+        column = SESSIONS.index(session) * len(BELL_TYPES) + BELL_TYPES.index(bell_type)
+        return self.index(row, column)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.core.lesson_times.get_text(*self.slot_for_index(index))
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            conflict = self._conflict_for_index(index)
+            return QColor(self.CONFLICT_COLORS[conflict.kind]) if conflict is not None else None
+        if role == Qt.ToolTipRole:
+            conflict = self._conflict_for_index(index)
+            hint = "Saati silmek (DELETE) zili iptal eder."
+            return f"{conflict.message()}\n{hint}" if conflict is not None else hint
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        text = value.strip()
+        if not text.replace(":", "").strip(): # Maskeli boş alan ":" olarak gelir
+            text = ""
+        elif time_str_to_seconds(text) is None:
+            return False # Geçersiz saat kaydedilmez, eski değer kalır
+        self.core.set_lesson_time(*self.slot_for_index(index), text)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self.invalidate_conflicts(self.slot_for_index(index)[0])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return f"{BELL_TYPES[section % len(BELL_TYPES)]} Zili"
+        return LESSON_KEYS[section % len(LESSON_KEYS)]
+
+    def refresh(self):
+        """Çekirdekteki veriler topluca değiştiğinde (ör. dosyadan yükleme) görünümleri yeniler."""
+        self.beginResetModel()
+        self._conflicts.clear()
+        self._slot_conflicts.clear()
+        self.endResetModel()
+        for day in DAY_NAMES:
+            self.conflictsChanged.emit(day)
+
+
+class DaySessionProxyModel(QSortFilterProxyModel):
+    """Tablo modelinden yalnızca bir günün bir oturumunu gösterir."""
+    def __init__(self, day, session, parent=None):
+        super().__init__(parent)
+        self.first_row = DAY_NAMES.index(day) * len(LESSON_KEYS)
+        self.first_column = SESSIONS.index(session) * len(BELL_TYPES)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.first_row <= source_row < self.first_row + len(LESSON_KEYS)
+
+    def filterAcceptsColumn(self, source_column, source_parent):
+        return self.first_column <= source_column < self.first_column + len(BELL_TYPES)
+
 
-    if _player_instance.state() == QMediaPlayer.PlayingState:
-        _player_instance.stop()
-    _player_instance.setMedia(QMediaContent(url))
-    _player_instance.play()
-    print(f"Ses çalınıyor: {file_path}")
+class TimeEditDelegate(QStyledItemDelegate):
+    """Hücre düzenlenirken "HH:MM" maskeli, saniyesi isteğe bağlı ("HH:MM:SS") bir satır düzenleyici açar."""
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setInputMask("99:99:00") # Saniye basamakları boş bırakılabilir
+        editor.setAlignment(Qt.AlignCenter)
+        return editor
 
-def _stop_sound():
-    """Çalmakta olan sesi durdurur."""
-    print(f"DEBUG: _stop_sound çağrıldı. Player state before stop: {_player_instance.state()}")
-    if _player_instance.state() == QMediaPlayer.PlayingState:
-        _player_instance.stop()
-        print("Ses durduruldu.")
-    else:
-        print("Şu anda çalan bir ses yok.")
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(Qt.EditRole) or "")
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), Qt.EditRole)
+
+
+class LessonTimesView(QTableView):
+    """Zil saatleri tablosu. DELETE/BACKSPACE seçili hücrelerdeki zilleri iptal eder."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(TimeEditDelegate(self))
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed
+                             | QAbstractItemView.AnyKeyPressed)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.verticalHeader().setDefaultAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Delete, Qt.Key_Backspace) and self.state() != QAbstractItemView.EditingState:
+            for index in self.selectedIndexes():
+                self.model().setData(index, "", Qt.EditRole)
+            return
+        super().keyPressEvent(event)
 
 
 # --- Özel Durumlar Penceresi Sınıfı ---
@@ -74,12 +222,8 @@ class SpecialSituationsWindow(QDialog):
         self.setFixedSize(500, 680) # Pencere yüksekliği 610'dan 680'e çıkarıldı
 
         # Sirenlerin ve marşların yolunu ana pencereden al
-        self.sirenler_base_path = parent.sirenler_base_path if parent else ""
-        self.ten_kasim_siren_path = os.path.join(self.sirenler_base_path, "10 KASIM siren ve İstiklal Marşı bileşik.mp3")
-        self.istiklal_marsi_path = os.path.join(self.sirenler_base_path, "İSTİKLAL MARŞI.mp3")
-        self.saygi_ti_path = os.path.join(self.sirenler_base_path, "saygı_ti.mp3") # Yeni eklenen dosya yolu
-        
-        self.bell_sound_paths = parent.bell_sound_paths if parent else {} # Ayarlardan gelen zil sesleri
+        # Çalma işleri çekirdektedir; aynı işlemler denetim arayüzünden de tetiklenebilir
+        self.core = parent.core if parent else None
 
 
         self.initUI()
@@ -110,7 +254,7 @@ class SpecialSituationsWindow(QDialog):
         ten_kasim_buttons_layout.addWidget(self.ten_kasim_button)
 
         self.ten_kasim_stop_button = QPushButton("Durdur")
-        self.ten_kasim_stop_button.clicked.connect(_stop_sound)
+        self.ten_kasim_stop_button.clicked.connect(lambda: self.core.stop_sound("ten_kasim"))
         self.ten_kasim_stop_button.setMinimumHeight(30)
         ten_kasim_buttons_layout.addWidget(self.ten_kasim_stop_button)
         ten_kasim_layout.addLayout(ten_kasim_buttons_layout)
@@ -136,7 +280,7 @@ class SpecialSituationsWindow(QDialog):
             bell_row_layout.addWidget(play_button)
 
             stop_button = QPushButton("Durdur")
-            stop_button.clicked.connect(_stop_sound)
+            stop_button.clicked.connect(lambda _, bt=bell_type: self.core.stop_sound(bt))
             stop_button.setMinimumHeight(30)
             bell_row_layout.addWidget(stop_button)
             manual_play_layout.addLayout(bell_row_layout)
@@ -171,7 +315,7 @@ class SpecialSituationsWindow(QDialog):
         saygi_ti_row_layout.addWidget(self.saygi_ti_button)
 
         self.saygi_ti_stop_button = QPushButton("Durdur")
-        self.saygi_ti_stop_button.clicked.connect(_stop_sound)
+        self.saygi_ti_stop_button.clicked.connect(lambda: self.core.stop_sound("saygi_ti"))
         self.saygi_ti_stop_button.setMinimumHeight(30)
         saygi_ti_row_layout.addWidget(self.saygi_ti_stop_button)
         national_anthems_layout.addLayout(saygi_ti_row_layout) # Milli Marşlar grubuna eklendi
@@ -190,12 +334,12 @@ class SpecialSituationsWindow(QDialog):
         deprem_row_layout = QHBoxLayout()
         self.deprem_button = QPushButton("Deprem Sireni Çal")
         self.deprem_button.setStyleSheet("background-color: #f44336; color: white; font-weight: bold;")
-        self.deprem_button.clicked.connect(lambda: self._play_emergency_siren("Deprem", os.path.join(self.sirenler_base_path, "deprem.mp3")))
+        self.deprem_button.clicked.connect(lambda: self._play_emergency_siren("deprem"))
         self.deprem_button.setMinimumHeight(30)
         deprem_row_layout.addWidget(self.deprem_button)
 
         self.deprem_stop_button = QPushButton("Durdur")
-        self.deprem_stop_button.clicked.connect(_stop_sound)
+        self.deprem_stop_button.clicked.connect(lambda: self.core.stop_sound("deprem"))
         self.deprem_stop_button.setMinimumHeight(30)
         deprem_row_layout.addWidget(self.deprem_stop_button)
         emergency_layout.addLayout(deprem_row_layout)
@@ -204,12 +348,12 @@ class SpecialSituationsWindow(QDialog):
         yangin_row_layout = QHBoxLayout()
         self.yangin_button = QPushButton("Yangın Sireni Çal")
         self.yangin_button.setStyleSheet("background-color: #ff9800; color: white; font-weight: bold;")
-        self.yangin_button.clicked.connect(lambda: self._play_emergency_siren("Yangın", os.path.join(self.sirenler_base_path, "yangın.mp3")))
+        self.yangin_button.clicked.connect(lambda: self._play_emergency_siren("yangin"))
         self.yangin_button.setMinimumHeight(30)
         yangin_row_layout.addWidget(self.yangin_button)
 
         self.yangin_stop_button = QPushButton("Durdur")
-        self.yangin_stop_button.clicked.connect(_stop_sound)
+        self.yangin_stop_button.clicked.connect(lambda: self.core.stop_sound("yangin"))
         self.yangin_stop_button.setMinimumHeight(30)
         yangin_row_layout.addWidget(self.yangin_stop_button)
         emergency_layout.addLayout(yangin_row_layout)
@@ -224,30 +368,167 @@ class SpecialSituationsWindow(QDialog):
         close_button.setMinimumHeight(30)
         layout.addWidget(close_button, alignment=Qt.AlignCenter)
 
+    # Zil çalıyor göstergesini ana pencere çekirdeğin manualPlayback sinyaliyle açar
+    def _report_playback_error(self, error_message):
+        if error_message:
+            QMessageBox.warning(self, "Ses Çalma Hatası", error_message)
+
     def _play_ten_kasim_siren(self):
-        _play_sound(self.ten_kasim_siren_path, self)
-        if self.parent():
-            self.parent()._show_bell_ringing_indicator()
+        self._report_playback_error(self.core.play_special_sound("ten_kasim"))
 
     def _play_manual_bell(self, bell_type):
-        _play_sound(self.bell_sound_paths.get(bell_type), self)
-        if self.parent():
-            self.parent()._show_bell_ringing_indicator()
+        self._report_playback_error(self.core.play_manual_bell(bell_type))
 
-    def _play_emergency_siren(self, siren_type, file_path):
-        _play_sound(file_path, self)
-        if self.parent():
-            self.parent()._show_bell_ringing_indicator()
+    def _play_emergency_siren(self, siren_name):
+        self._report_playback_error(self.core.play_special_sound(siren_name))
 
     def _play_istiklal_marsi(self):
-        _play_sound(self.istiklal_marsi_path, self)
-        if self.parent():
-            self.parent()._show_bell_ringing_indicator()
+        self._report_playback_error(self.core.play_special_sound("istiklal_marsi"))
 
     def _play_saygi_ti(self): # Yeni eklenen metod
-        _play_sound(self.saygi_ti_path, self)
-        if self.parent():
-            self.parent()._show_bell_ringing_indicator()
+        self._report_playback_error(self.core.play_special_sound("saygi_ti"))
+
+
+# --- Melodi Seçim Penceresi Sınıfı ---
+class MelodyPickerWindow(QDialog):
+    """Zil sesini melodi kütüphanesinden seçtirir. Liste bellekteki dizinden gelir, disk beklenmez.
+    clear_label verilirse atamayı kaldıran (selected_path "" olarak kabul edilen) bir düğme de gösterilir."""
+    COLUMNS = ["Ad", "Klasör", "Süre", "Biçim", "Durum"]
+
+    def __init__(self, library, title, current_path="", parent=None, clear_label=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setFixedSize(720, 460)
+
+        self.library = library
+        self.selected_path = current_path
+        self.clear_label = clear_label
+        self.row_paths = []
+
+        self.initUI()
+        self._refresh_table()
+
+        # Arka plan denetimi sürerken gelen güncellemeler tek bir yenilemede birleştirilir
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self._refresh_table)
+        self.library.entryChanged.connect(self._schedule_refresh)
+        self.finished.connect(lambda _: self.library.entryChanged.disconnect(self._schedule_refresh))
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(10)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setMinimumHeight(30)
+        self.filter_edit.setPlaceholderText("Ada veya klasöre göre süz")
+        self.filter_edit.textChanged.connect(self._refresh_table)
+        layout.addWidget(self.filter_edit)
+
+        self.sounds_table = QTableWidget(0, len(self.COLUMNS), self)
+        self.sounds_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.sounds_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.sounds_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.sounds_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.sounds_table.verticalHeader().hide()
+        self.sounds_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.sounds_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.sounds_table.cellDoubleClicked.connect(lambda *_: self._accept_selected())
+        layout.addWidget(self.sounds_table)
+
+        button_box = QHBoxLayout()
+        other_button = QPushButton("Diğer Dosya...")
+        other_button.setMinimumHeight(30)
+        other_button.clicked.connect(self._select_other_file)
+        test_button = QPushButton("Sına")
+        test_button.setMinimumHeight(30)
+        test_button.clicked.connect(self._test_selected)
+        select_button = QPushButton("Seç")
+        select_button.setMinimumHeight(30)
+        select_button.clicked.connect(self._accept_selected)
+        cancel_button = QPushButton("İptal")
+        cancel_button.setMinimumHeight(30)
+        cancel_button.clicked.connect(self.reject)
+        button_box.addWidget(other_button)
+        button_box.addWidget(test_button)
+        if self.clear_label:
+            clear_button = QPushButton(self.clear_label)
+            clear_button.setMinimumHeight(30)
+            clear_button.clicked.connect(self._accept_cleared)
+            button_box.addWidget(clear_button)
+        button_box.addStretch(1)
+        button_box.addWidget(select_button)
+        button_box.addWidget(cancel_button)
+        layout.addLayout(button_box)
+
+    def _schedule_refresh(self, _path):
+        self.refresh_timer.start(200)
+
+    def _refresh_table(self):
+        filter_text = self.filter_edit.text().strip().lower()
+        current_path = self._current_row_path() or self.selected_path
+        entries = [entry for entry in self.library.sorted_entries()
+                   if not filter_text or filter_text in entry.path.lower()]
+        self.row_paths = [entry.path for entry in entries]
+        self.sounds_table.setRowCount(len(entries))
+        for row, entry in enumerate(entries):
+            duration = f"{entry.duration_ms // 60000}:{entry.duration_ms // 1000 % 60:02d}" if entry.duration_ms else "-"
+            values = [entry.name, os.path.basename(entry.folder.rstrip("/")) if entry.folder else "(tek dosya)",
+                      duration, entry.codec or "-", entry.status_text()]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setToolTip(entry.path)
+                if entry.decodes_ok is False:
+                    item.setForeground(QColor("red"))
+                self.sounds_table.setItem(row, col, item)
+            if entry.path == current_path:
+                self.sounds_table.selectRow(row)
+
+    def _current_row_path(self):
+        row = self.sounds_table.currentRow()
+        if 0 <= row < len(self.row_paths) and self.sounds_table.selectionModel().hasSelection():
+            return self.row_paths[row]
+        return None
+
+    def _select_other_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, self.windowTitle(), os.path.expanduser("~"),
+                                                   "Ses Dosyaları (*.mp3 *.wav *.ogg);;Tüm Dosyalar (*)")
+        if file_path:
+            self.library.add_file(file_path) # Denetimi arka planda yapılır; sorun çıkarsa kayıttan sonra bildirilir
+            self.selected_path = file_path
+            self.accept()
+
+    def _test_selected(self):
+        path = self._current_row_path()
+        if path:
+            _play_sound(path, self)
+
+    def _accept_selected(self):
+        path = self._current_row_path()
+        if not path:
+            return
+        problem = self.library.problem_for(path)
+        if problem and QMessageBox.question(self, self.windowTitle(),
+                                            f"Bu ses dosyası çalınamayabilir ({problem}).\nYine de seçilsin mi?",
+                                            QMessageBox.Yes | QMessageBox.No, QMessageBox.No) != QMessageBox.Yes:
+            return
+        self.selected_path = path
+        self.accept()
+
+    def _accept_cleared(self):
+        self.selected_path = ""
+        self.accept()
+
+
+def _warn_sound_assignment_problems(parent_widget, core):
+    """Kaydedilen zil sesi atamalarında sorunu bilinen dosyalar varsa kullanıcıyı uyarır."""
+    problems = core.sound_assignment_problems()
+    if problems:
+        lines = [f"{name}: {os.path.basename(path)} ({problem})" for name, path, problem in problems]
+        QMessageBox.warning(parent_widget, "Zil Sesi Sorunu",
+                            "Aşağıdaki zil sesleri çalınamayabilir:\n\n" + "\n".join(lines))
 
 
 # --- Ayarlar Penceresi Sınıfı ---
@@ -255,12 +536,18 @@ class SettingsWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Ayarlar")
-        self.setFixedSize(550, 450)
+        self.setFixedSize(720, 580)
 
         self.bell_sound_paths = parent.bell_sound_paths if parent else {}
         self.school_name_text = parent.school_name_text if parent else ""
         self.school_logo_path = parent.school_logo_path if parent else ""
+        self.catch_up_window_secs = parent.core.catch_up_window_secs if parent else 0
+        self.bell_max_durations = dict(parent.core.bell_max_durations) if parent else {}
+        self.bell_priorities = dict(parent.core.bell_priorities) if parent else {}
+        self.control_api_settings = dict(parent.core.control_api_settings) if parent else {}
         self.bell_path_displays = {}
+        self.bell_max_duration_spins = {}
+        self.bell_priority_spins = {}
 
         self.initUI()
         self._load_settings_data()
@@ -302,12 +589,14 @@ class SettingsWindow(QDialog):
         bell_settings_group.setLayout(bell_settings_layout)
         bell_settings_layout.setSpacing(10)
 
-        bell_settings_layout.addWidget(QLabel("<b>Genel Zil Sesi Ayarları:</b>"), 0, 0, 1, 4, Qt.AlignCenter)
+        bell_settings_layout.addWidget(QLabel("<b>Genel Zil Sesi Ayarları:</b>"), 0, 0, 1, 6, Qt.AlignCenter)
 
         bell_settings_layout.addWidget(QLabel(""), 1, 0)
         bell_settings_layout.addWidget(QLabel("Seçilen Dosya Yolu"), 1, 1, Qt.AlignCenter)
         bell_settings_layout.addWidget(QLabel("Zil Seç"), 1, 2, Qt.AlignCenter)
         bell_settings_layout.addWidget(QLabel("Sına"), 1, 3, Qt.AlignCenter)
+        bell_settings_layout.addWidget(QLabel("En Uzun"), 1, 4, Qt.AlignCenter)
+        bell_settings_layout.addWidget(QLabel("Öncelik"), 1, 5, Qt.AlignCenter)
 
         bell_types = ["İçeri", "Öğretmenler", "Teneffüs"]
         for row_idx, bell_type in enumerate(bell_types):
@@ -331,16 +620,70 @@ class SettingsWindow(QDialog):
             test_button.clicked.connect(lambda _, bt=bell_type: self._test_bell_sound(bt))
             bell_settings_layout.addWidget(test_button, current_row, 3)
 
+            max_duration_spin = QSpinBox()
+            max_duration_spin.setRange(0, 600)
+            max_duration_spin.setSuffix(" sn")
+            max_duration_spin.setSpecialValueText("Sınırsız")
+            max_duration_spin.setMinimumHeight(30)
+            max_duration_spin.setToolTip("Zil sesi en fazla bu kadar çalar, bitmeden önce kısılarak durur. 0 sesi sonuna kadar çalar.")
+            self.bell_max_duration_spins[bell_type] = max_duration_spin
+            bell_settings_layout.addWidget(max_duration_spin, current_row, 4)
+
+            priority_spin = QSpinBox()
+            priority_spin.setRange(0, 9)
+            priority_spin.setMinimumHeight(30)
+            priority_spin.setToolTip("Aynı anda birden çok zil çalacaksa yalnızca önceliği en büyük olan çalar.")
+            self.bell_priority_spins[bell_type] = priority_spin
+            bell_settings_layout.addWidget(priority_spin, current_row, 5)
+
+
+        catch_up_row = len(bell_types) + 2
+        bell_settings_layout.addWidget(QLabel("Kaçan Zil Telafisi:"), catch_up_row, 0, Qt.AlignLeft | Qt.AlignVCenter)
+        self.catch_up_window_spin = QSpinBox()
+        self.catch_up_window_spin.setRange(0, 900)
+        self.catch_up_window_spin.setSuffix(" sn")
+        self.catch_up_window_spin.setMinimumHeight(30)
+        self.catch_up_window_spin.setToolTip("Program takıldığı için dakikası geçen zil, bu süreyi aşmadıysa yine de çalınır. 0 telafiyi kapatır.")
+        bell_settings_layout.addWidget(self.catch_up_window_spin, catch_up_row, 1, Qt.AlignLeft)
 
         bell_settings_layout.setColumnStretch(0, 0)
         bell_settings_layout.setColumnStretch(1, 1)
         bell_settings_layout.setColumnStretch(2, 0)
         bell_settings_layout.setColumnStretch(3, 0)
+        bell_settings_layout.setColumnStretch(4, 0)
+        bell_settings_layout.setColumnStretch(5, 0)
 
         layout.addWidget(bell_settings_group)
+
+        control_api_group = QFrame(self)
+        control_api_group.setFrameShape(QFrame.StyledPanel)
+        control_api_group.setContentsMargins(10, 10, 10, 10)
+        control_api_layout = QGridLayout(control_api_group)
+        control_api_group.setLayout(control_api_layout)
+        control_api_layout.setSpacing(10)
+
+        self.control_api_check = QCheckBox("Uzaktan Denetim Etkin")
+        self.control_api_check.setToolTip("Zil ve sirenler bu bilgisayardaki HTTP/JSON denetim arayüzünden (127.0.0.1) çaldırılabilir.")
+        control_api_layout.addWidget(self.control_api_check, 0, 0)
+        control_api_layout.addWidget(QLabel("Kapı:"), 0, 1, Qt.AlignRight | Qt.AlignVCenter)
+        self.control_api_port_spin = QSpinBox()
+        self.control_api_port_spin.setRange(1024, 65535)
+        self.control_api_port_spin.setMinimumHeight(30)
+        control_api_layout.addWidget(self.control_api_port_spin, 0, 2)
+        control_api_layout.addWidget(QLabel("Anahtar:"), 1, 0, Qt.AlignLeft | Qt.AlignVCenter)
+        self.control_api_token_edit = QLineEdit()
+        self.control_api_token_edit.setMinimumHeight(30)
+        self.control_api_token_edit.setPlaceholderText("Boş bırakılırsa anahtar istenmez")
+        control_api_layout.addWidget(self.control_api_token_edit, 1, 1, 1, 2)
+        control_api_layout.setColumnStretch(0, 1)
+
+        layout.addWidget(control_api_group)
         layout.addStretch(1)
 
         button_box = QHBoxLayout()
+        zones_button = QPushButton("Ses Bölgeleri")
+        zones_button.setMinimumHeight(40)
+        zones_button.clicked.connect(self._show_audio_zones_window)
         save_button = QPushButton("Kaydet")
         save_button.setMinimumHeight(40)
         save_button.clicked.connect(self._save_settings)
@@ -348,17 +691,30 @@ class SettingsWindow(QDialog):
         cancel_button.setMinimumHeight(40)
         cancel_button.clicked.connect(self.reject)
 
+        button_box.addWidget(zones_button)
         button_box.addStretch(1)
         button_box.addWidget(save_button)
         button_box.addWidget(cancel_button)
         layout.addLayout(button_box)
 
+    def _show_audio_zones_window(self):
+        zones_dialog = AudioZonesWindow(self.parent())
+        zones_dialog.exec_()
+
     def _load_settings_data(self):
         self.school_name_edit.setText(self.school_name_text)
         self.school_logo_display.setText(self.school_logo_path)
+        self.catch_up_window_spin.setValue(self.catch_up_window_secs)
+        self.control_api_check.setChecked(bool(self.control_api_settings.get("enabled")))
+        self.control_api_port_spin.setValue(self.control_api_settings.get("port", DEFAULT_CONTROL_PORT))
+        self.control_api_token_edit.setText(self.control_api_settings.get("token", ""))
         for bell_type, path_display in self.bell_path_displays.items():
             path = self.bell_sound_paths.get(bell_type, "")
             path_display.setText(path)
+        for bell_type, max_duration_spin in self.bell_max_duration_spins.items():
+            max_duration_spin.setValue(self.bell_max_durations.get(bell_type, 0))
+        for bell_type, priority_spin in self.bell_priority_spins.items():
+            priority_spin.setValue(self.bell_priorities.get(bell_type, 0))
 
 
     def _browse_school_logo(self):
@@ -367,20 +723,16 @@ class SettingsWindow(QDialog):
             self.school_logo_display.setText(file_path)
 
     def _select_bell_sound(self, bell_type):
-        default_dir = "/usr/share/Atam_Okul_Zili/melodiler"
-        if not os.path.isdir(default_dir):
-            default_dir = os.path.expanduser("~")
-
-        file_path, _ = QFileDialog.getOpenFileName(self, f"{bell_type} Zili Sesi Seç", default_dir, "Ses Dosyaları (*.mp3 *.wav *.ogg);;Tüm Dosyalar (*)")
-        if file_path:
-            self.bell_sound_paths[bell_type] = file_path
-            self.bell_path_displays[bell_type].setText(file_path)
-            pass
+        picker = MelodyPickerWindow(self.parent().core.melody_library, f"{bell_type} Zili Sesi Seç",
+                                    self.bell_sound_paths.get(bell_type, ""), self)
+        if picker.exec_() == QDialog.Accepted and picker.selected_path:
+            self.bell_sound_paths[bell_type] = picker.selected_path
+            self.bell_path_displays[bell_type].setText(picker.selected_path)
 
 
     def _test_bell_sound(self, bell_type):
         sound_path = self.bell_sound_paths.get(bell_type)
-        _play_sound(sound_path, self)
+        _play_sound(sound_path, self, channel=bell_type)
         if self.parent():
             self.parent()._show_bell_ringing_indicator()
 
@@ -390,94 +742,685 @@ class SettingsWindow(QDialog):
             parent.school_name_text = self.school_name_edit.text()
             parent.school_logo_path = self.school_logo_display.text()
             parent.bell_sound_paths = self.bell_sound_paths
+            parent.core.catch_up_window_secs = self.catch_up_window_spin.value()
+            parent.core.bell_max_durations.update({bell_type: spin.value() for bell_type, spin in self.bell_max_duration_spins.items()})
+            parent.core.bell_priorities.update({bell_type: spin.value() for bell_type, spin in self.bell_priority_spins.items()})
+            parent.core.control_api_settings = {"enabled": self.control_api_check.isChecked(),
+                                                "port": self.control_api_port_spin.value(),
+                                                "token": self.control_api_token_edit.text().strip()}
 
             parent.school_name_label.setText(parent.school_name_text)
             parent._load_logo(parent.school_logo_label, parent.school_logo_path)
 
             parent._save_all_data()
+            parent.core.preload_sounds()
+            parent.core.refresh_melody_library()
+            parent.core.apply_control_api()
+            parent.lesson_times_model.invalidate_conflicts() # Öncelik ve süreler çakışma denetimini etkiler
             QMessageBox.information(self, "Ayarlar", "Ayarlar başarıyla kaydedildi!")
+            _warn_sound_assignment_problems(self, parent.core)
         self.accept()
 
+# --- Ses Bölgeleri Penceresi Sınıfı ---
+class AudioZonesWindow(QDialog):
+    """Binalar/katlar için ses bölgelerini, çıkış aygıtlarını ve bölgeye özel zil seslerini düzenler."""
+    BELL_COLUMN_OFFSET = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Ses Bölgeleri")
+        self.setFixedSize(760, 380)
+
+        self.core = parent.core if parent else None
+        self.audio_zones = {zone: {"device": config.get("device", DEFAULT_DEVICE),
+                                   "bell_sound_paths": dict(config.get("bell_sound_paths", {}))}
+                            for zone, config in (self.core.audio_zones.items() if self.core else [])}
+        self.device_combos = {}
+
+        self.initUI()
+        self._refresh_table()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(15)
+
+        info_label = QLabel("Boş bırakılan zil sesleri için Ayarlar'daki genel zil sesi çalınır. "
+                            "Zil sesini değiştirmek için hücreye çift tıklayın; bölgeyi genel zil sesine döndürmek için açılan pencerede "
+                            "\"Genel Zile Dön\" düğmesini kullanın. Aygıt olarak \"null\" veya "
+                            "\"file:/yol/kayit.jsonl\" verilen bölgeler sesi donanıma göndermez, yalnızca kaydeder.")
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        self.zones_table = QTableWidget(0, self.BELL_COLUMN_OFFSET + len(BELL_TYPES), self)
+        self.zones_table.setHorizontalHeaderLabels(["Bölge", "Çıkış Aygıtı"] + [f"{bell_type} Zili" for bell_type in BELL_TYPES])
+        self.zones_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.zones_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.zones_table.verticalHeader().hide()
+        self.zones_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.zones_table.cellDoubleClicked.connect(self._select_zone_bell_sound)
+        layout.addWidget(self.zones_table)
+
+        button_box = QHBoxLayout()
+        add_button = QPushButton("Bölge Ekle")
+        add_button.setMinimumHeight(30)
+        add_button.clicked.connect(self._add_zone)
+        remove_button = QPushButton("Seçili Bölgeyi Sil")
+        remove_button.setMinimumHeight(30)
+        remove_button.clicked.connect(self._remove_selected_zone)
+        save_button = QPushButton("Kaydet")
+        save_button.setMinimumHeight(30)
+        save_button.clicked.connect(self._save_zones)
+        cancel_button = QPushButton("İptal")
+        cancel_button.setMinimumHeight(30)
+        cancel_button.clicked.connect(self.reject)
+        button_box.addWidget(add_button)
+        button_box.addWidget(remove_button)
+        button_box.addStretch(1)
+        button_box.addWidget(save_button)
+        button_box.addWidget(cancel_button)
+        layout.addLayout(button_box)
+
+    def _refresh_table(self):
+        self.device_combos = {}
+        self.zones_table.setRowCount(len(self.audio_zones))
+        devices = [DEFAULT_DEVICE] + available_output_devices() + [NULL_DEVICE]
+        for row, (zone, config) in enumerate(self.audio_zones.items()):
+            self.zones_table.setItem(row, 0, QTableWidgetItem(zone))
+
+            device_combo = QComboBox()
+            device_combo.setEditable(True) # "file:..." gibi listede olmayan aygıtlar yazılabilir
+            for device in devices:
+                device_combo.addItem(device or "Varsayılan aygıt", device)
+            current_index = device_combo.findData(config["device"])
+            if current_index >= 0:
+                device_combo.setCurrentIndex(current_index)
+            else:
+                device_combo.setEditText(config["device"])
+            self.zones_table.setCellWidget(row, 1, device_combo)
+            self.device_combos[zone] = device_combo
+
+            for col, bell_type in enumerate(BELL_TYPES, self.BELL_COLUMN_OFFSET):
+                path = config["bell_sound_paths"].get(bell_type, "")
+                item = QTableWidgetItem(os.path.basename(path) if path else "(genel zil)")
+                item.setToolTip(path)
+                self.zones_table.setItem(row, col, item)
+
+    def _combo_device(self, device_combo):
+        index = device_combo.currentIndex()
+        if index >= 0 and device_combo.itemText(index) == device_combo.currentText():
+            return device_combo.itemData(index)
+        return device_combo.currentText().strip()
+
+    def _collect_devices(self):
+        for zone, device_combo in self.device_combos.items():
+            self.audio_zones[zone]["device"] = self._combo_device(device_combo)
+
+    def _select_zone_bell_sound(self, row, col):
+        if col < self.BELL_COLUMN_OFFSET:
+            return
+        zone = self.zones_table.item(row, 0).text()
+        bell_type = BELL_TYPES[col - self.BELL_COLUMN_OFFSET]
+        picker = MelodyPickerWindow(self.core.melody_library, f"{zone} - {bell_type} Zili Sesi Seç",
+                                    self.audio_zones[zone]["bell_sound_paths"].get(bell_type, ""), self,
+                                    clear_label="Genel Zile Dön")
+        if picker.exec_() != QDialog.Accepted:
+            return # İptal edilirse mevcut atama korunur
+        self._collect_devices()
+        self.audio_zones[zone]["bell_sound_paths"][bell_type] = picker.selected_path
+        self._refresh_table()
+
+    def _add_zone(self):
+        zone, ok = QInputDialog.getText(self, "Bölge Ekle", "Bölge adı (ör. Ek Bina, Spor Salonu):")
+        zone = zone.strip()
+        if not ok or not zone:
+            return
+        if zone in self.audio_zones:
+            QMessageBox.warning(self, "Bölge Ekle", f"'{zone}' adlı bölge zaten var.")
+            return
+        self._collect_devices()
+        self.audio_zones[zone] = {"device": DEFAULT_DEVICE, "bell_sound_paths": {}}
+        self._refresh_table()
+
+    def _remove_selected_zone(self):
+        rows = {index.row() for index in self.zones_table.selectionModel().selectedRows()}
+        self._collect_devices()
+        for row in rows:
+            zone = self.zones_table.item(row, 0).text()
+            if zone == DEFAULT_ZONE:
+                QMessageBox.warning(self, "Bölge Sil", f"'{DEFAULT_ZONE}' bölgesi silinemez.")
+                continue
+            self.audio_zones.pop(zone, None)
+        self._refresh_table()
+
+    def _save_zones(self):
+        self._collect_devices()
+        if self.core:
+            self.core.set_audio_zones(self.audio_zones)
+            _warn_sound_assignment_problems(self, self.core)
+        self.accept()
+
+
+# --- Zil Gecikmesi İstatistikleri Penceresi Sınıfı ---
+class LatencyStatsWindow(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Zil Gecikmesi İstatistikleri")
+        self.setFixedSize(640, 420)
+
+        self.latency_tracker = parent.core.latency_tracker if parent else None
+        self.tick_engine = parent.core.tick_engine if parent else None
+
+        self.initUI()
+        self._refresh_stats()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(15)
+
+        stats_group = QFrame(self)
+        stats_group.setFrameShape(QFrame.StyledPanel)
+        stats_group.setContentsMargins(10, 10, 10, 10)
+        self.stats_layout = QGridLayout(stats_group)
+        stats_group.setLayout(self.stats_layout)
+        self.stats_layout.setSpacing(8)
+
+        headers = ["Ölçü (ms)", "Sayı", "Ortalama"] + [f"p{pct}" for pct in PERCENTILES] + ["En Büyük"]
+        for col_idx, header in enumerate(headers):
+            self.stats_layout.addWidget(QLabel(f"<b>{header}</b>"), 0, col_idx, Qt.AlignCenter)
+
+        self.stat_value_labels = {}
+        for row_idx, (metric, metric_title) in enumerate(METRIC_NAMES.items()):
+            self.stats_layout.addWidget(QLabel(metric_title), row_idx + 1, 0, Qt.AlignLeft | Qt.AlignVCenter)
+            for col_idx, key in enumerate(["count", "mean"] + [f"p{pct}" for pct in PERCENTILES] + ["max"]):
+                value_label = QLabel("-")
+                self.stats_layout.addWidget(value_label, row_idx + 1, col_idx + 1, Qt.AlignCenter)
+                self.stat_value_labels[(metric, key)] = value_label
+
+        layout.addWidget(stats_group)
+
+        self.failed_label = QLabel()
+        layout.addWidget(self.failed_label)
+
+        self.drift_label = QLabel()
+        self.drift_label.setWordWrap(True)
+        layout.addWidget(self.drift_label)
+
+        self.recent_samples_label = QLabel()
+        self.recent_samples_label.setWordWrap(True)
+        layout.addWidget(self.recent_samples_label)
+
+        self.metrics_file_label = QLabel()
+        self.metrics_file_label.setWordWrap(True)
+        self.metrics_file_label.setStyleSheet("color: gray;")
+        layout.addWidget(self.metrics_file_label)
+
+        layout.addStretch(1)
+
+        button_box = QHBoxLayout()
+        refresh_button = QPushButton("Yenile")
+        refresh_button.setMinimumHeight(30)
+        refresh_button.clicked.connect(self._refresh_stats)
+        close_button = QPushButton("Kapat")
+        close_button.setMinimumHeight(30)
+        close_button.clicked.connect(self.accept)
+        button_box.addStretch(1)
+        button_box.addWidget(refresh_button)
+        button_box.addWidget(close_button)
+        layout.addLayout(button_box)
+
+    def _refresh_stats(self):
+        if not self.latency_tracker:
+            return
+        for metric, stats in self.latency_tracker.summary().items():
+            for key in ["count", "mean"] + [f"p{pct}" for pct in PERCENTILES] + ["max"]:
+                self.stat_value_labels[(metric, key)].setText(str(stats.get(key, "-")))
+
+        self.failed_label.setText(f"Sesi başlamayan zil sayısı: {self.latency_tracker.failed_count}")
+        if self.tick_engine:
+            drift = self.tick_engine.drift_report()
+            self.drift_label.setText(
+                f"Saat tiki sapması: son {drift['last_drift_ms']} ms, ortalama {drift['mean_abs_drift_ms']} ms, "
+                f"en büyük {drift['max_drift_ms']} ms. Atlanan tik: {drift['skipped_ticks']} "
+                f"(en uzun takılma {drift['max_stall_ms']} ms), saat atlaması: {drift['clock_jumps']}")
+        recent = list(self.latency_tracker.samples)[-5:]
+        lines = [f"{sample['bell']}: {sample['total_delay_ms']} ms" for sample in reversed(recent)]
+        self.recent_samples_label.setText("<b>Son ziller:</b><br>" + ("<br>".join(lines) if lines else "Henüz ölçüm yok."))
+        self.metrics_file_label.setText(f"Ölçüm dosyası: {self.latency_tracker.metrics_file}")
+
+
+# --- Takvim İstisnaları Penceresi Sınıfı ---
+class CalendarWindow(QDialog):
+    """Tatil, sınav günü, yarım gün gibi tarihe özel istisnaları düzenler. Değişiklikler hemen uygulanır."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Zil Takvimi")
+        self.setFixedSize(720, 480)
+
+        self.core = parent.core if parent else None
+
+        self.initUI()
+        self._refresh_table()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(15)
+
+        self.overrides_table = QTableWidget(0, 4, self)
+        self.overrides_table.setHorizontalHeaderLabels(["Başlangıç", "Bitiş", "Uygulama", "Açıklama"])
+        self.overrides_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.overrides_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.overrides_table.verticalHeader().hide()
+        self.overrides_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        layout.addWidget(self.overrides_table)
+
+        form_group = QFrame(self)
+        form_group.setFrameShape(QFrame.StyledPanel)
+        form_layout = QGridLayout(form_group)
+        form_group.setLayout(form_layout)
+        form_layout.setSpacing(8)
+
+        form_layout.addWidget(QLabel("Başlangıç:"), 0, 0)
+        self.start_date_edit = QDateEdit(QDate.currentDate())
+        self.start_date_edit.setCalendarPopup(True)
+        self.start_date_edit.dateChanged.connect(lambda date: self.end_date_edit.setDate(max(date, self.end_date_edit.date())))
+        form_layout.addWidget(self.start_date_edit, 0, 1)
+
+        form_layout.addWidget(QLabel("Bitiş:"), 0, 2)
+        self.end_date_edit = QDateEdit(QDate.currentDate())
+        self.end_date_edit.setCalendarPopup(True)
+        form_layout.addWidget(self.end_date_edit, 0, 3)
+
+        self.skip_checkbox = QCheckBox("Zil çalmasın (tatil)")
+        self.skip_checkbox.toggled.connect(self._update_form_state)
+        form_layout.addWidget(self.skip_checkbox, 1, 0, 1, 2)
+
+        form_layout.addWidget(QLabel("Çizelge:"), 2, 0)
+        self.template_combo = QComboBox()
+        self.template_combo.addItem("Kendi günü", None)
+        for day in DAY_NAMES:
+            self.template_combo.addItem(f"{day} çizelgesi", day)
+        form_layout.addWidget(self.template_combo, 2, 1)
+
+        form_layout.addWidget(QLabel("Oturumlar:"), 2, 2)
+        self.sessions_combo = QComboBox()
+        self.sessions_combo.addItem("Tüm oturumlar", None)
+        for session in SESSIONS:
+            self.sessions_combo.addItem(f"Yalnızca {session}", [session])
+        form_layout.addWidget(self.sessions_combo, 2, 3)
+
+        form_layout.addWidget(QLabel("Kaydırma:"), 3, 0)
+        self.shift_spin = QSpinBox()
+        self.shift_spin.setRange(-180, 180)
+        self.shift_spin.setSuffix(" dk")
+        self.shift_spin.setToolTip("Tüm zil saatleri bu kadar ileri (+) ya da geri (-) alınır.")
+        form_layout.addWidget(self.shift_spin, 3, 1)
+
+        form_layout.addWidget(QLabel("Açıklama:"), 3, 2)
+        self.description_edit = QLineEdit()
+        self.description_edit.setPlaceholderText("Örn. Cumhuriyet Bayramı")
+        form_layout.addWidget(self.description_edit, 3, 3)
+
+        layout.addWidget(form_group)
+
+        button_box = QHBoxLayout()
+        add_button = QPushButton("Ekle")
+        add_button.setMinimumHeight(30)
+        add_button.clicked.connect(self._add_override)
+        remove_button = QPushButton("Seçileni Sil")
+        remove_button.setMinimumHeight(30)
+        remove_button.clicked.connect(self._remove_selected_override)
+        close_button = QPushButton("Kapat")
+        close_button.setMinimumHeight(30)
+        close_button.clicked.connect(self.accept)
+        button_box.addWidget(add_button)
+        button_box.addWidget(remove_button)
+        button_box.addStretch(1)
+        button_box.addWidget(close_button)
+        layout.addLayout(button_box)
+
+    def _update_form_state(self, skip):
+        for widget in (self.template_combo, self.sessions_combo, self.shift_spin):
+            widget.setEnabled(not skip)
+
+    def _refresh_table(self):
+        if not self.core:
+            return
+        overrides = self.core.calendar.overrides
+        self.overrides_table.setRowCount(len(overrides))
+        for row, override in enumerate(overrides):
+            values = [override.start.toString("dd.MM.yyyy"), override.end.toString("dd.MM.yyyy"),
+                      override.summary(), override.description]
+            for col, value in enumerate(values):
+                self.overrides_table.setItem(row, col, QTableWidgetItem(value))
+        self.overrides_table.resizeColumnsToContents()
+
+    def _add_override(self):
+        skip = self.skip_checkbox.isChecked()
+        try:
+            override = DateOverride(
+                self.start_date_edit.date(), self.end_date_edit.date(), skip=skip,
+                template_day=None if skip else self.template_combo.currentData(),
+                shift_minutes=0 if skip else self.shift_spin.value(),
+                sessions=None if skip else self.sessions_combo.currentData(),
+                description=self.description_edit.text().strip())
+        except ValueError as e:
+            QMessageBox.warning(self, "Geçersiz İstisna", str(e))
+            return
+        self.core.add_calendar_override(override)
+        log.info("Takvim istisnası eklendi: %s - %s %s", override.start.toString(DATE_FORMAT), override.end.toString(DATE_FORMAT), override.summary())
+        self._refresh_table()
+
+    def _remove_selected_override(self):
+        rows = sorted({index.row() for index in self.overrides_table.selectionModel().selectedRows()}, reverse=True)
+        for row in rows:
+            self.core.remove_calendar_override(row)
+        self._refresh_table()
+
+
+# --- Toplu Düzenleme Penceresi ---
+class ScheduleToolsWindow(QDialog):
+    """Çizelgeyi topluca düzenler ve CSV/iCalendar olarak içe ve dışa aktarır.
+    Her işlem çizelgenin bir kopyasında yapılır, sonra tek seferde uygulanıp kaydedilir."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Toplu Düzenleme")
+        self.setFixedSize(620, 520)
+
+        self.core = parent.core if parent else None
+        self.lesson_times_model = parent.lesson_times_model if parent else None
+
+        self.initUI()
+
+    def _day_combo(self, include_weekdays=True):
+        combo = QComboBox()
+        if include_weekdays:
+            combo.addItem("Hafta içi günleri", WEEKDAY_NAMES)
+            combo.addItem("Tüm günler", DAY_NAMES)
+        for day in DAY_NAMES:
+            combo.addItem(day, [day])
+        return combo
+
+    def _session_combo(self, include_all=True):
+        combo = QComboBox()
+        if include_all:
+            combo.addItem("Tüm oturumlar", SESSIONS)
+        for session in SESSIONS:
+            combo.addItem(session, [session])
+        return combo
+
+    def _minutes_spin(self, minimum, maximum, value):
+        spin = QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setValue(value)
+        spin.setSuffix(" dk")
+        return spin
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(10)
+
+        # --- Günü kopyala ---
+        copy_group = QFrame(self)
+        copy_group.setFrameShape(QFrame.StyledPanel)
+        copy_layout = QGridLayout(copy_group)
+        copy_layout.addWidget(QLabel("<b>Günü kopyala</b>"), 0, 0, 1, 4)
+        copy_layout.addWidget(QLabel("Kaynak:"), 1, 0)
+        self.copy_source_combo = self._day_combo(include_weekdays=False)
+        copy_layout.addWidget(self.copy_source_combo, 1, 1)
+        copy_layout.addWidget(QLabel("Hedef:"), 1, 2)
+        self.copy_target_combo = self._day_combo()
+        copy_layout.addWidget(self.copy_target_combo, 1, 3)
+        copy_button = QPushButton("Kopyala")
+        copy_button.clicked.connect(self._copy_day)
+        copy_layout.addWidget(copy_button, 1, 4)
+        layout.addWidget(copy_group)
+
+        # --- Kaydır ---
+        shift_group = QFrame(self)
+        shift_group.setFrameShape(QFrame.StyledPanel)
+        shift_layout = QGridLayout(shift_group)
+        shift_layout.addWidget(QLabel("<b>Zilleri kaydır</b>"), 0, 0, 1, 4)
+        self.shift_days_combo = self._day_combo()
+        shift_layout.addWidget(self.shift_days_combo, 1, 0)
+        self.shift_session_combo = self._session_combo()
+        shift_layout.addWidget(self.shift_session_combo, 1, 1)
+        self.shift_spin = self._minutes_spin(-180, 180, 10)
+        self.shift_spin.setToolTip("Zil saatleri bu kadar ileri (+) ya da geri (-) alınır.")
+        shift_layout.addWidget(self.shift_spin, 1, 2)
+        shift_button = QPushButton("Kaydır")
+        shift_button.clicked.connect(self._shift)
+        shift_layout.addWidget(shift_button, 1, 4)
+        layout.addWidget(shift_group)
+
+        # --- Oluştur ---
+        generate_group = QFrame(self)
+        generate_group.setFrameShape(QFrame.StyledPanel)
+        generate_layout = QGridLayout(generate_group)
+        generate_layout.addWidget(QLabel("<b>Oturum çizelgesi oluştur</b>"), 0, 0, 1, 4)
+        self.generate_days_combo = self._day_combo()
+        generate_layout.addWidget(self.generate_days_combo, 1, 0, 1, 2)
+        self.generate_session_combo = self._session_combo(include_all=False)
+        generate_layout.addWidget(self.generate_session_combo, 1, 2, 1, 2)
+        generate_layout.addWidget(QLabel("İlk ders:"), 2, 0)
+        self.first_lesson_edit = QTimeEdit(QTime(8, 30))
+        self.first_lesson_edit.setDisplayFormat("HH:mm")
+        generate_layout.addWidget(self.first_lesson_edit, 2, 1)
+        generate_layout.addWidget(QLabel("Ders sayısı:"), 2, 2)
+        self.lesson_count_spin = QSpinBox()
+        self.lesson_count_spin.setRange(1, len(LESSON_KEYS))
+        self.lesson_count_spin.setValue(7)
+        generate_layout.addWidget(self.lesson_count_spin, 2, 3)
+        generate_layout.addWidget(QLabel("Ders süresi:"), 3, 0)
+        self.lesson_length_spin = self._minutes_spin(1, 120, 40)
+        generate_layout.addWidget(self.lesson_length_spin, 3, 1)
+        generate_layout.addWidget(QLabel("Teneffüs:"), 3, 2)
+        self.break_length_spin = self._minutes_spin(0, 120, 10)
+        generate_layout.addWidget(self.break_length_spin, 3, 3)
+        generate_layout.addWidget(QLabel("Öğretmen zili:"), 4, 0)
+        self.teacher_lead_spin = self._minutes_spin(0, 30, DEFAULT_TEACHER_LEAD_SECS // 60)
+        self.teacher_lead_spin.setToolTip("Öğretmenler zili dersten bu kadar önce çalar; 0 ise çalmaz.")
+        generate_layout.addWidget(self.teacher_lead_spin, 4, 1)
+        generate_button = QPushButton("Oluştur")
+        generate_button.clicked.connect(self._generate)
+        generate_layout.addWidget(generate_button, 4, 4)
+        layout.addWidget(generate_group)
+
+        layout.addStretch(1)
+
+        button_box = QHBoxLayout()
+        import_button = QPushButton("İçe Aktar...")
+        import_button.setMinimumHeight(30)
+        import_button.clicked.connect(self._import)
+        export_button = QPushButton("Dışa Aktar...")
+        export_button.setMinimumHeight(30)
+        export_button.clicked.connect(self._export)
+        close_button = QPushButton("Kapat")
+        close_button.setMinimumHeight(30)
+        close_button.clicked.connect(self.accept)
+        button_box.addWidget(import_button)
+        button_box.addWidget(export_button)
+        button_box.addStretch(1)
+        button_box.addWidget(close_button)
+        layout.addLayout(button_box)
+
+    def _apply(self, schedule, description):
+        """Düzenlenmiş çizelgeyi tek seferde uygular: tek kayıt, tek derleme ve tablonun tek yenilenmesi."""
+        self.core.replace_lesson_times(schedule)
+        self.lesson_times_model.refresh()
+        log.info("Toplu düzenleme uygulandı: %s", description)
+
+    def _edit(self, description, edit):
+        schedule = self.core.lesson_times.copy()
+        try:
+            edit(schedule)
+        except ValueError as e:
+            QMessageBox.warning(self, "Toplu Düzenleme", str(e))
+            return
+        self._apply(schedule, description)
+
+    def _copy_day(self):
+        source_day = self.copy_source_combo.currentText()
+        target_days = self.copy_target_combo.currentData()
+        if QMessageBox.question(self, "Günü Kopyala",
+                                f"{self.copy_target_combo.currentText()} için girilmiş saatler {source_day} saatleriyle değiştirilecek. Devam edilsin mi?") != QMessageBox.Yes:
+            return
+        self._edit(f"{source_day} -> {', '.join(target_days)}", lambda schedule: schedule.copy_day(source_day, target_days))
+
+    def _shift(self):
+        days = self.shift_days_combo.currentData()
+        sessions = self.shift_session_combo.currentData()
+        minutes = self.shift_spin.value()
+        self._edit(f"{', '.join(days)} {', '.join(sessions)} {minutes:+d} dk",
+                   lambda schedule: schedule.shift(minutes * 60, days, sessions))
+
+    def _generate(self):
+        days = self.generate_days_combo.currentData()
+        session = self.generate_session_combo.currentData()[0]
+        if QMessageBox.question(self, "Çizelge Oluştur",
+                                f"{self.generate_days_combo.currentText()} {session} oturumunun saatleri yeniden oluşturulacak. Devam edilsin mi?") != QMessageBox.Yes:
+            return
+        first_lesson_secs = QTime(0, 0).secsTo(self.first_lesson_edit.time())
+        self._edit(f"{', '.join(days)} {session} oluşturuldu",
+                   lambda schedule: schedule.generate_session(
+                       days, session, first_lesson_secs, self.lesson_length_spin.value() * 60,
+                       self.break_length_spin.value() * 60, self.lesson_count_spin.value(),
+                       self.teacher_lead_spin.value() * 60))
+
+    def _import(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Çizelgeyi İçe Aktar", os.path.expanduser("~"),
+                                                   "Çizelge Dosyaları (*.csv *.ics);;Tüm Dosyalar (*)")
+        if not file_path:
+            return
+        try:
+            schedule = import_schedule(file_path, self.core.lesson_times)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "İçe Aktarma Hatası", f"{os.path.basename(file_path)} içe aktarılamadı:\n{e}")
+            return
+        self._apply(schedule, f"{file_path} içe aktarıldı")
+        QMessageBox.information(self, "İçe Aktarma", f"{os.path.basename(file_path)} içe aktarıldı.")
+
+    def _export(self):
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "Çizelgeyi Dışa Aktar",
+                                                                 os.path.join(os.path.expanduser("~"), "zil_cizelgesi.csv"),
+                                                                 "CSV (*.csv);;iCalendar (*.ics)")
+        if not file_path:
+            return
+        if not os.path.splitext(file_path)[1]:
+            file_path += ".ics" if "ics" in selected_filter else ".csv"
+        try:
+            export_schedule(self.core.lesson_times, file_path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Dışa Aktarma Hatası", f"{file_path} yazılamadı: {e}")
+            return
+        log.info("Çizelge dışa aktarıldı: %s", file_path)
+
+
 # --- Ana Program Sınıfı ---
 class OkulZiliProgrami(QWidget):
     # SIRENLER_BASE_PATH ve meb_logo_path sistem genelindeki yollara güncellendi
     # Bu yollar, .deb paketi kurulumunda `/usr/share/Atam_Okul_Zili/` altına yerleştirilmelidir.
-    SIRENLER_BASE_PATH = "/usr/share/Atam_Okul_Zili/sirenler/" 
+    SIRENLER_BASE_PATH = SIRENLER_BASE_PATH
     MEB_LOGO_SYSTEM_PATH = "/usr/share/Atam_Okul_Zili/meb_logo.png"
 
-    def __init__(self):
+    def __init__(self, core=None, startup_profile=None):
         super().__init__()
-        self.bell_sound_paths = {
-            "İçeri": "",
-            "Öğretmenler": "",
-            "Teneffüs": ""
-        }
-        self.school_name_text = "Ayarlardan Okul Adınızı Giriniz"
-        self.school_logo_path = ""
+        self.startup_profile = startup_profile if startup_profile is not None else StartupProfile(enabled=False)
+        # Zamanlama, kayıt ve çalma işleri arayüzsüz çekirdektedir; pencere yalnızca ön yüzdür
+        self.core = core if core is not None else OkulZiliCekirdegi(parent=self)
         self.meb_logo_path = self.MEB_LOGO_SYSTEM_PATH # Sistemdeki MEB logosu yolu kullanılıyor
 
-        # JSON dosyasının kaydedileceği uygulama veri dizini
-        self.app_data_dir = self._get_app_data_directory()
-        self.DATA_FILE = os.path.join(self.app_data_dir, "okul_zili_data.json")
-
-
-        self.sirenler_base_path = self.SIRENLER_BASE_PATH # Yeni sistem yolu kullanılıyor
-        self.ten_kasim_siren_path = os.path.join(self.SIRENLER_BASE_PATH, "10 KASIM siren ve İstiklal Marşı bileşik.mp3")
+        self.lesson_times_model = LessonTimesModel(self.core, self)
+        self.built_day_tabs = set() # Gün sekmeleri ilk gösterildiklerinde kurulur
 
-        self.lesson_times = {}
-        self.day_tabs_widgets = {}
-
-        self._initialize_data_structures()
-
-        self.bells_rung_today = set()
-        self.last_day_checked = QDate.currentDate()
+        # Saat tikinde yalnızca değeri değişen parçalar güncellenir
+        self._displayed_clock_minute = None
+        self._displayed_texts = {}
+        self._highlighted_tab_index = None
 
         self.initUI()
+        self.startup_profile.mark("window")
         self._load_all_data()
         self.initClock()
         self._set_current_day_tab_highlight() # Sekmeyi zorla değiştirmek yerine sadece vurgula
-
-        _player_instance.stateChanged.connect(self._handle_player_state_changed_for_debug)
-        _player_instance.mediaStatusChanged.connect(self._handle_player_media_status_changed_for_debug)
+        self.startup_profile.mark("ready_to_ring")
+
+        # Logolar ve zilin çalmasını beklemeyen işler ilk çizimden sonra yüklenir.
+        # Pencere hiç çizilmezse (ör. simge durumunda açılırsa) kısa bir süre sonra yine başlatılır.
+        self._first_paint_seen = False
+        self._startup_finished = False
+        QTimer.singleShot(STARTUP_FALLBACK_MSECS, self._finish_startup)
+
+        get_audio_router().stateChanged.connect(self._handle_player_state_changed_for_debug)
+        get_audio_router().mediaStatusChanged.connect(self._handle_player_media_status_changed_for_debug)
+        self.core.bellRang.connect(lambda *_: self._show_bell_ringing_indicator())
+        self.core.manualPlayback.connect(lambda _: self._show_bell_ringing_indicator())
+        self.core.playbackFailed.connect(lambda message: QMessageBox.warning(self, "Ses Çalma Hatası", message))
+        self.core.saveFailed.connect(self._show_save_error) # Yazıcı iş parçacığından kuyruklu gelir
+        # Arka plan denetiminin bulduğu sorunlu zil sesleri tek bir uyarıda toplanır
+        self.invalid_assignments = []
+        self.invalid_assignment_timer = QTimer(self)
+        self.invalid_assignment_timer.setSingleShot(True)
+        self.invalid_assignment_timer.timeout.connect(self._show_invalid_assignments)
+        self.core.assignmentInvalid.connect(self._queue_invalid_assignment)
+
+        # Zil seslerinin süreleri kütüphane taradıkça öğrenilir; örtüşme denetimi buna göre yenilenir
+        self.conflicts_refresh_timer = QTimer(self)
+        self.conflicts_refresh_timer.setSingleShot(True)
+        self.conflicts_refresh_timer.timeout.connect(lambda: self.lesson_times_model.invalidate_conflicts())
+        self.core.melody_library.entryChanged.connect(lambda _: self.conflicts_refresh_timer.start(500))
 
         self.blinking_timer = QTimer(self)
         self.blinking_timer.timeout.connect(self._toggle_indicator_visibility)
+        # Gösterge ses bitince söner; ses hiç başlamazsa kısa bir süre sonra kendiliğinden söner
         self.display_timer = QTimer(self)
-        self.display_timer.timeout.connect(self._hide_bell_ringing_indicator) # Hata veren satır
-
-    def _get_app_data_directory(self):
-        """İşletim sistemine göre uygulama veri dizinini döndürür."""
-        if platform.system() == "Windows":
-            # %APPDATA% dizini (C:\Users\<User>\AppData\Roaming)
-            app_data_path = os.path.join(os.getenv('APPDATA'), "ATAM Okul Zili")
-        elif platform.system() == "Darwin": # macOS
-            app_data_path = os.path.join(os.path.expanduser('~'), "Library", "Application Support", "ATAM Okul Zili")
-        else: # Linux ve diğer Unix benzeri sistemler
-            app_data_path = os.path.join(os.path.expanduser('~'), ".ATAM Okul Zili") # Gizli klasör önerisi
-        
-        # Dizinin mevcut olduğundan emin olun, yoksa oluşturun
-        os.makedirs(app_data_path, exist_ok=True)
-        return app_data_path
-
-    def _initialize_data_structures(self):
-        day_names_turkish = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-        bell_types_internal = ["İçeri", "Öğretmenler", "Teneffüs"]
-
-        for day in day_names_turkish:
-            self.lesson_times[day] = {
-                "Sabah": {},
-                "Öğle": {}
-            }
-            self.day_tabs_widgets[day] = {
-                "Sabah": {},
-                "Öğle": {}
-            }
-            # Ders sayısını 7'den 9'a çıkarıldı (range(1, 10))
-            for session in ["Sabah", "Öğle"]:
-                for i in range(1, 10): # 1. Ders'ten 9. Ders'e kadar
-                    lesson_key = f"{i}.Ders"
-                    self.lesson_times[day][session][lesson_key] = {bt: "" for bt in bell_types_internal}
-                    self.day_tabs_widgets[day][session][lesson_key] = {bt: None for bt in bell_types_internal}
+        self.display_timer.setSingleShot(True)
+        self.display_timer.timeout.connect(self._hide_bell_ringing_indicator_if_idle)
+        get_audio_router().stateChanged.connect(lambda *_: self._hide_bell_ringing_indicator_if_idle())
+
+    # Ayarlar ve zil saatleri çekirdekte tutulur; pencereler bu özellikler üzerinden erişir
+    @property
+    def bell_sound_paths(self):
+        return self.core.bell_sound_paths
+
+    @bell_sound_paths.setter
+    def bell_sound_paths(self, value):
+        self.core.bell_sound_paths = value
+
+    @property
+    def school_name_text(self):
+        return self.core.school_name_text
+
+    @school_name_text.setter
+    def school_name_text(self, value):
+        self.core.school_name_text = value
+
+    @property
+    def school_logo_path(self):
+        return self.core.school_logo_path
+
+    @school_logo_path.setter
+    def school_logo_path(self, value):
+        self.core.school_logo_path = value
+
+    @property
+    def sirenler_base_path(self):
+        return self.core.sirenler_base_path
+
+    @property
+    def lesson_times(self):
+        return self.core.lesson_times
+
+    @property
+    def DATA_FILE(self):
+        return self.core.DATA_FILE
 
     def initUI(self):
         self.setWindowTitle('ATAM Okul Zili')
@@ -499,7 +1442,6 @@ class OkulZiliProgrami(QWidget):
         self.meb_logo_label = QLabel()
         self.meb_logo_label.setFixedSize(140, 140)
         self.meb_logo_label.setAlignment(Qt.AlignCenter)
-        self._load_logo(self.meb_logo_label, self.meb_logo_path)
         top_header_grid_layout.addWidget(self.meb_logo_label, 0, 0, Qt.AlignLeft | Qt.AlignVCenter)
 
         meb_school_name_combined_layout = QVBoxLayout()
@@ -520,7 +1462,6 @@ class OkulZiliProgrami(QWidget):
         self.school_logo_label = QLabel()
         self.school_logo_label.setFixedSize(140, 140)
         self.school_logo_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self._load_logo(self.school_logo_label, self.school_logo_path)
         top_header_grid_layout.addWidget(self.school_logo_label, 0, 2, Qt.AlignRight | Qt.AlignVCenter)
 
         top_header_grid_layout.setColumnStretch(0, 0)
@@ -568,7 +1509,10 @@ class OkulZiliProgrami(QWidget):
         self.bell_ringing_indicator.setFont(QFont("Arial", 24, QFont.Bold))
         self.bell_ringing_indicator.setStyleSheet("color: red;")
         self.bell_ringing_indicator.setAlignment(Qt.AlignCenter)
-        self.bell_ringing_indicator.hide()
+        # Gösterge yerleşimde hep yer tutar; yanıp sönme yalnızca saydamlığı değiştirir, yeniden yerleşim yapılmaz
+        self.bell_ringing_opacity = QGraphicsOpacityEffect(self.bell_ringing_indicator)
+        self.bell_ringing_opacity.setOpacity(0.0)
+        self.bell_ringing_indicator.setGraphicsEffect(self.bell_ringing_opacity)
         top_header_grid_layout.addWidget(self.bell_ringing_indicator, 4, 0, 1, 3, Qt.AlignCenter)
 
         top_header_grid_layout.setRowStretch(0, 0)
@@ -582,12 +1526,12 @@ class OkulZiliProgrami(QWidget):
         self.tab_widget = QTabWidget()
         main_layout.addWidget(self.tab_widget)
 
-        day_names_turkish = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-        for day in day_names_turkish:
-            day_widget = QWidget()
-            self.tab_widget.addTab(day_widget, day)
-            self._setup_day_tab(day_widget, day)
-        
+        # Sekmeler boş açılır; içerikleri ilk gösterildiklerinde kurulur
+        for day in DAY_NAMES:
+            self.tab_widget.addTab(QWidget(), day)
+        self.tab_widget.currentChanged.connect(self._ensure_day_tab_built)
+        self._ensure_day_tab_built(self.tab_widget.currentIndex())
+
         # Tüm sekme çubuğunun genel fontunu ayarlayın
         self.tab_widget.tabBar().setFont(QFont("Arial", 10, QFont.Normal))
 
@@ -603,6 +1547,18 @@ class OkulZiliProgrami(QWidget):
 
         bottom_button_layout.addStretch(1)
 
+        self.schedule_tools_button = QPushButton("Toplu Düzenleme")
+        self.schedule_tools_button.clicked.connect(self.show_schedule_tools_window)
+        bottom_button_layout.addWidget(self.schedule_tools_button)
+
+        self.calendar_button = QPushButton("Takvim")
+        self.calendar_button.clicked.connect(self.show_calendar_window)
+        bottom_button_layout.addWidget(self.calendar_button)
+
+        self.stats_button = QPushButton("İstatistikler")
+        self.stats_button.clicked.connect(self.show_latency_stats_window)
+        bottom_button_layout.addWidget(self.stats_button)
+
         self.settings_button = QPushButton("Ayarlar")
         self.settings_button.clicked.connect(self.show_settings_window)
         bottom_button_layout.addWidget(self.settings_button)
@@ -613,13 +1569,13 @@ class OkulZiliProgrami(QWidget):
 
 
     def _load_logo(self, label, path):
-        print(f"DEBUG: _load_logo çağrıldı. path: {path}")
+        log.debug("_load_logo çağrıldı. path: %s", path)
         if not path or path.isspace():
             label.setText("LOGO YOK")
             label.setFont(QFont("SansSerif", 8))
             label.setStyleSheet("border: 1px solid gray; color: gray;")
             label.setAlignment(Qt.AlignCenter)
-            print(f"DEBUG: Logo yolu boş veya geçersiz.")
+            log.debug("Logo yolu boş veya geçersiz.")
             return
 
         pixmap = QPixmap(path)
@@ -628,265 +1584,149 @@ class OkulZiliProgrami(QWidget):
             label.setFont(QFont("SansSerif", 8))
             label.setStyleSheet("border: 1px solid gray; color: gray;")
             label.setAlignment(Qt.AlignCenter)
-            print(f"DEBUG: Logo yüklenemedi: {path} (dosya bulunamadı veya format hatası)")
+            log.warning("Logo yüklenemedi: %s (dosya bulunamadı veya format hatası)", path)
         else:
             scaled_pixmap = pixmap.scaled(label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
             label.setPixmap(scaled_pixmap)
             label.setStyleSheet("border: none;")
             label.setText("")
-            print(f"DEBUG: Logo başarıyla yüklendi: {path}")
+            log.debug("Logo başarıyla yüklendi: %s", path)
+
+    def _ensure_day_tab_built(self, tab_index):
+        if tab_index < 0 or tab_index in self.built_day_tabs:
+            return
+        self.built_day_tabs.add(tab_index)
+        self._setup_day_tab(self.tab_widget.widget(tab_index), DAY_NAMES[tab_index])
 
     def _setup_day_tab(self, tab_widget, day_name):
+        tab_layout = QVBoxLayout()
+        tab_widget.setLayout(tab_layout)
+        tab_layout.setContentsMargins(0, 0, 0, 0)
+        tab_layout.setSpacing(0)
         day_layout = QHBoxLayout()
-        tab_widget.setLayout(day_layout)
+        tab_layout.addLayout(day_layout, 1)
         day_layout.setContentsMargins(10, 10, 10, 10)
         day_layout.setSpacing(15)
 
-        sabah_frame = QFrame()
-        sabah_frame.setFrameShape(QFrame.StyledPanel)
-        sabah_frame.setContentsMargins(10, 10, 10, 10)
-        sabah_layout = QGridLayout(sabah_frame)
-        sabah_frame.setLayout(sabah_layout)
-        sabah_layout.setSpacing(1)
-
-        sabah_layout.addWidget(QLabel("<b>Sabah</b>"), 0, 0, 1, 4, Qt.AlignCenter)
-
-        sabah_layout.addWidget(QLabel(""), 1, 0)
-        sabah_layout.addWidget(QLabel("İçeri Zili"), 1, 1, Qt.AlignCenter)
-        sabah_layout.addWidget(QLabel("Öğretmenler Zili"), 1, 2, Qt.AlignCenter)
-        sabah_layout.addWidget(QLabel("Teneffüs Zili"), 1, 3, Qt.AlignCenter)
-
-        bell_types_internal = ["İçeri", "Öğretmenler", "Teneffüs"]
-        # Ders sayısını 7'den 9'a çıkarıldı (range(1, 10))
-        for i in range(1, 10): # 1. Ders'ten 9. Ders'e kadar
-            row = i + 1
-            lesson_key = f"{i}.Ders"
-            lesson_label = QLabel(f"<b>{i}.Ders</b>")
-            sabah_layout.addWidget(lesson_label, row, 0, Qt.AlignLeft | Qt.AlignVCenter)
-
-            for col_idx, bell_type_internal in enumerate(bell_types_internal):
-                time_entry = QLineEdit()
-                time_entry.setFixedWidth(60)
-                time_entry.setMinimumHeight(28)
-                time_entry.setInputMask("99:99")
-                time_entry.setAlignment(Qt.AlignCenter)
-                time_entry.setPlaceholderText("HH:MM")
-                time_entry.setToolTip("Saati silmek (DELETE) zili iptal eder.")
-
-                time_entry.textChanged.connect(
-                    lambda text, d=day_name, s="Sabah", l=lesson_key, bt=bell_type_internal:
-                        self._update_lesson_time(d, s, l, bt, text)
-                )
-
-                initial_time = self.lesson_times.get(day_name, {}).get("Sabah", {}).get(lesson_key, {}).get(bell_type_internal, "")
-                if initial_time:
-                    time_entry.setText(initial_time)
-
-                sabah_layout.addWidget(time_entry, row, col_idx + 1, Qt.AlignCenter)
-                self.day_tabs_widgets[day_name]["Sabah"][lesson_key][bell_type_internal] = time_entry
-
-        day_layout.addWidget(sabah_frame, 1)
-
-        ogle_frame = QFrame()
-        ogle_frame.setFrameShape(QFrame.StyledPanel)
-        ogle_frame.setContentsMargins(10, 10, 10, 10)
-        ogle_layout = QGridLayout(ogle_frame)
-        ogle_frame.setLayout(ogle_layout)
-        ogle_layout.setSpacing(1)
-
-        ogle_layout.addWidget(QLabel("<b>Öğle</b>"), 0, 0, 1, 4, Qt.AlignCenter)
-
-        ogle_layout.addWidget(QLabel(""), 1, 0)
-        ogle_layout.addWidget(QLabel("İçeri Zili"), 1, 1, Qt.AlignCenter)
-        ogle_layout.addWidget(QLabel("Öğretmenler Zili"), 1, 2, Qt.AlignCenter)
-        ogle_layout.addWidget(QLabel("Teneffüs Zili"), 1, 3, Qt.AlignCenter)
-
-        # Ders sayısını 7'den 9'a çıkarıldı (range(1, 10))
-        for i in range(1, 10): # 1. Ders'ten 9. Ders'e kadar
-            row = i + 1
-            lesson_key = f"{i}.Ders"
-            lesson_label = QLabel(f"<b>{i}.Ders</b>")
-            ogle_layout.addWidget(lesson_label, row, 0, Qt.AlignLeft | Qt.AlignVCenter)
-
-            for col_idx, bell_type_internal in enumerate(bell_types_internal):
-                time_entry = QLineEdit()
-                time_entry.setFixedWidth(60)
-                time_entry.setMinimumHeight(28)
-                time_entry.setInputMask("99:99")
-                time_entry.setAlignment(Qt.AlignCenter)
-                time_entry.setPlaceholderText("HH:MM")
-                time_entry.setToolTip("Saati silmek (DELETE) zili iptal eder.")
-
-                time_entry.textChanged.connect(
-                    lambda text, d=day_name, s="Öğle", l=lesson_key, bt=bell_type_internal:
-                        self._update_lesson_time(d, s, l, bt, text)
-                )
-
-                initial_time = self.lesson_times.get(day_name, {}).get("Öğle", {}).get(lesson_key, {}).get(bell_type_internal, "")
-                if initial_time:
-                    time_entry.setText(initial_time)
-
-                ogle_layout.addWidget(time_entry, row, col_idx + 1, Qt.AlignCenter)
-                self.day_tabs_widgets[day_name]["Öğle"][lesson_key][bell_type_internal] = time_entry
-
-        day_layout.addWidget(ogle_frame, 1)
-
-    def _update_lesson_time(self, day, session, lesson_key, bell_type, text):
-        self.lesson_times[day][session][lesson_key][bell_type] = text.strip()
+        for session in SESSIONS:
+            session_frame = QFrame()
+            session_frame.setFrameShape(QFrame.StyledPanel)
+            session_frame.setContentsMargins(10, 10, 10, 10)
+            session_layout = QVBoxLayout(session_frame)
+            session_frame.setLayout(session_layout)
+            session_layout.setSpacing(1)
+
+            session_layout.addWidget(QLabel(f"<b>{session}</b>"), 0, Qt.AlignCenter)
+
+            session_proxy = DaySessionProxyModel(day_name, session, tab_widget)
+            session_proxy.setSourceModel(self.lesson_times_model)
+            session_view = LessonTimesView()
+            session_view.setModel(session_proxy)
+            session_layout.addWidget(session_view)
+
+            day_layout.addWidget(session_frame, 1)
+
+        conflicts_label = QLabel()
+        conflicts_label.setWordWrap(True)
+        conflicts_label.setContentsMargins(10, 0, 10, 10)
+        conflicts_label.setStyleSheet("color: #a00000;")
+        tab_layout.addWidget(conflicts_label)
+        update_conflicts = lambda day: day == day_name and self._show_day_conflicts(conflicts_label, day_name)
+        self.lesson_times_model.conflictsChanged.connect(update_conflicts)
+        self._show_day_conflicts(conflicts_label, day_name)
+
+    def _show_day_conflicts(self, conflicts_label, day_name):
+        conflicts = self.lesson_times_model.conflicts(day_name)
+        lines = [conflict.message() for conflict in conflicts[:MAX_LISTED_CONFLICTS]]
+        if len(conflicts) > MAX_LISTED_CONFLICTS:
+            lines.append(f"... ve {len(conflicts) - MAX_LISTED_CONFLICTS} çakışma daha (renkli hücrelerin ipuçlarına bakın).")
+        conflicts_label.setText("\n".join(lines))
+        conflicts_label.setVisible(bool(lines))
 
     def initClock(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.updateTime)
-        self.timer.start(1000)
-
+        # Saat, çekirdeğin saniye sınırlarına hizalı tikleriyle güncellenir; zil denetimini çekirdek kendisi yapar
+        self.core.tick_engine.ticked.connect(self.updateTime)
         self.updateTime()
 
-    def updateTime(self):
-        current_datetime = QDateTime.currentDateTime()
-        current_time_str = current_datetime.toString("HH:mm")
+    def updateTime(self, current_datetime=None, force=False):
+        """Saat, tarih ve gün etiketlerini günceller. Dakika değişmediyse hiçbir şeye dokunmaz."""
+        if current_datetime is None:
+            current_datetime = get_clock().now()
+        clock_minute = current_datetime.toMSecsSinceEpoch() // 60000
+        if clock_minute == self._displayed_clock_minute and not force:
+            return
+        self._displayed_clock_minute = clock_minute
         current_date_obj = current_datetime.date()
 
-        day_names_turkish_list = ["Pazar", "Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi"]
-        current_day_index = current_date_obj.dayOfWeek() # QDate.dayOfWeek() Pazartesi=1, Pazar=7
-        current_day_name_turkish = day_names_turkish_list[current_day_index % 7] # 7 (Pazar) -> 0, 1 (Pazartesi) -> 1 ...
-
-        if current_date_obj != self.last_day_checked:
-            self.bells_rung_today.clear()
-            self.last_day_checked = current_date_obj
-            print("Yeni gün, çalınan ziller sıfırlandı.")
-            self._mark_past_bells_as_rung_for_day(current_day_name_turkish)
-
-        self.time_label.setText(current_time_str)
-        self.date_label.setText(current_date_obj.toString("dd.MM.yyyy"))
-        self.day_name_label.setText(current_day_name_turkish)
-
-        self._check_and_ring_bell(current_day_name_turkish, current_time_str)
-        self._set_current_day_tab_highlight() # Sadece vurgulama için çağır
-
-    def _set_current_day_tab_highlight(self):
-        """Mevcut günün sekmesini vurgular ve diğerlerini varsayılan renge döner."""
-        current_day_of_week_int = QDate.currentDate().dayOfWeek()
-        
-        # QDate.dayOfWeek() Pazartesi=1, Pazar=7 değerleri döndürürken,
-        # day_names_turkish_list_for_tabs listesi Pazartesi=0, Salı=1,... Pazar=6 şeklindedir.
-        # Bu nedenle doğru indeksi bulmak için dönüştürme gereklidir.
-        day_names_turkish_map_for_tab_index = {
-            1: "Pazartesi", 2: "Salı", 3: "Çarşamba", 4: "Perşembe",
-            5: "Cuma", 6: "Cumartesi", 7: "Pazar"
-        }
-        current_day_name_for_tab = day_names_turkish_map_for_tab_index.get(current_day_of_week_int)
-        
-        day_names_turkish_list_for_tabs = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-        current_tab_index = -1
-        try:
-            current_tab_index = day_names_turkish_list_for_tabs.index(current_day_name_for_tab)
-        except ValueError:
-            print(f"UYARI: '{current_day_name_for_tab}' için sekme indeksi bulunamadı.")
+        self._set_label_text(self.time_label, current_datetime.toString("HH:mm"))
+        self._set_label_text(self.date_label, current_date_obj.toString("dd.MM.yyyy"))
+        day_text = day_name_for_date(current_date_obj)
+        today_plan = self.core.today_plan
+        if today_plan is not None and today_plan.override is not None and today_plan.date == current_date_obj:
+            day_text += f" ({today_plan.override.description or today_plan.override.summary()})"
+        self._set_label_text(self.day_name_label, day_text)
+
+        self._set_current_day_tab_highlight(current_date_obj) # Sadece vurgulama için çağır
+
+    def _set_label_text(self, label, text):
+        """Metin değiştiyse etiketi günceller; aynı metin yeniden boyanmaz."""
+        if self._displayed_texts.get(label) != text:
+            self._displayed_texts[label] = text
+            label.setText(text)
+
+    def _set_current_day_tab_highlight(self, current_date=None):
+        """Mevcut günün sekmesini vurgular; vurgu yalnızca gün değiştiğinde yeniden boyanır."""
+        if current_date is None:
+            current_date = get_clock().now().date()
+        # QDate.dayOfWeek() Pazartesi=1 ... Pazar=7; sekmeler DAY_NAMES sırasıyla Pazartesi=0 ... Pazar=6
+        current_tab_index = current_date.dayOfWeek() - 1
+        if current_tab_index == self._highlighted_tab_index:
             return
 
-        for i in range(self.tab_widget.count()):
-            tab_bar = self.tab_widget.tabBar()
-            if i == current_tab_index:
-                tab_bar.setTabTextColor(i, QColor('darkgreen'))
-            else:
+        tab_bar = self.tab_widget.tabBar()
+        if self._highlighted_tab_index is not None:
+            tab_bar.setTabTextColor(self._highlighted_tab_index, QColor('black'))
+        else:
+            for i in range(self.tab_widget.count()):
                 tab_bar.setTabTextColor(i, QColor('black'))
-
-    def _check_and_ring_bell(self, day, current_time_str):
-        if day not in self.lesson_times:
-            return
-
-        day_schedule = self.lesson_times[day]
-        bell_types_internal = ["İçeri", "Öğretmenler", "Teneffüs"]
-
-        for session in ["Sabah", "Öğle"]:
-            if session not in day_schedule:
-                continue
-
-            for lesson_key in day_schedule[session]:
-                if lesson_key not in day_schedule[session]:
-                    continue
-
-                for bell_type in bell_types_internal:
-                    scheduled_time = day_schedule[session][lesson_key].get(bell_type, "").strip()
-
-                    if not scheduled_time:
-                        continue
-
-                    bell_identifier = (current_time_str, bell_type, day, session, lesson_key)
-
-                    if current_time_str == scheduled_time and bell_identifier not in self.bells_rung_today:
-                        print(f"DEBUG: Eşleşen zil bulundu: Gün={day}, Oturum={session}, Ders={lesson_key}, Zil Tipi={bell_type}, Planlanan Saat={scheduled_time}, Anlık Saat={current_time_str}")
-                        sound_path = self.bell_sound_paths.get(bell_type)
-                        if sound_path:
-                            _play_sound(sound_path, self)
-                            self._show_bell_ringing_indicator()
-                            self.bells_rung_today.add(bell_identifier)
-                        else:
-                            print(f"UYARI: '{bell_type}' için ses yolu tanımlanmamış. Zil çalmadı: {scheduled_time}")
-                            pass
-
-    def _mark_past_bells_as_rung_for_day(self, day_name_turkish):
-        current_time_obj = QTime.currentTime()
-
-        if day_name_turkish not in self.lesson_times:
-            return
-
-        day_schedule = self.lesson_times[day_name_turkish]
-        bell_types_internal = ["İçeri", "Öğretmenler", "Teneffüs"]
-
-        for session in ["Sabah", "Öğle"]:
-            if session not in day_schedule:
-                continue
-            for lesson_key in day_schedule[session]:
-                if lesson_key not in day_schedule[session]:
-                    continue
-                for bell_type in bell_types_internal:
-                    scheduled_time_str = day_schedule[session][lesson_key].get(bell_type, "").strip()
-                    if not scheduled_time_str:
-                        continue
-                    
-                    try:
-                        scheduled_time_obj = QTime.fromString(scheduled_time_str, "HH:mm")
-                        if scheduled_time_obj < current_time_obj:
-                            bell_identifier = (scheduled_time_str, bell_type, day_name_turkish, session, lesson_key)
-                            self.bells_rung_today.add(bell_identifier)
-                            print(f"DEBUG: Geçmiş zil işaretlendi (başlangıçta/gün değişiminde çalmayacak): {bell_identifier}")
-                    except Exception as e:
-                        print(f"UYARI: Zaman dönüşüm hatası for {scheduled_time_str}: {e}")
+        tab_bar.setTabTextColor(current_tab_index, QColor('darkgreen'))
+        self._highlighted_tab_index = current_tab_index
 
     def _show_bell_ringing_indicator(self):
-        print("DEBUG: _show_bell_ringing_indicator çağrıldı. Gösterge aktif ediliyor.")
+        log.debug("_show_bell_ringing_indicator çağrıldı. Gösterge aktif ediliyor.")
         self.blinking_timer.stop()
         self.display_timer.stop()
-        
-        self.bell_ringing_indicator.show()
-        self.bell_ringing_indicator.setVisible(True)
+
+        self.bell_ringing_opacity.setOpacity(1.0)
 
         self.blinking_timer.start(500)
 
-        self.display_timer.start(12000)
-    
+        self.display_timer.start(INDICATOR_MIN_DISPLAY_MSECS)
+
+    def _hide_bell_ringing_indicator_if_idle(self):
+        if self.blinking_timer.isActive() and not self.display_timer.isActive() and not is_playing():
+            self._hide_bell_ringing_indicator()
+
     def _hide_bell_ringing_indicator(self):
         """Zil çalıyor göstergesini gizler ve yanıp sönmeyi durdurur."""
-        print("DEBUG: _hide_bell_ringing_indicator çağrıldı. Gösterge gizleniyor.")
-        self.bell_ringing_indicator.hide()
+        log.debug("_hide_bell_ringing_indicator çağrıldı. Gösterge gizleniyor.")
+        self.bell_ringing_opacity.setOpacity(0.0)
         self.blinking_timer.stop() # Yanıp sönmeyi durdur
 
     def _toggle_indicator_visibility(self):
-        self.bell_ringing_indicator.setVisible(not self.bell_ringing_indicator.isVisible())
-        print(f"DEBUG: Gösterge görünürlüğü değiştirildi: {self.bell_ringing_indicator.isVisible()}")
+        self.bell_ringing_opacity.setOpacity(0.0 if self.bell_ringing_opacity.opacity() > 0 else 1.0)
 
 
-    def _handle_player_state_changed_for_debug(self, state):
+    def _handle_player_state_changed_for_debug(self, channel, state):
         state_map = {
             QMediaPlayer.StoppedState: "StoppedState",
             QMediaPlayer.PlayingState: "PlayingState",
             QMediaPlayer.PausedState: "PausedState"
         }
         current_state_name = state_map.get(state, f"Unknown State ({state})")
-        print(f"DEBUG: QMediaPlayer STATE CHANGED to {current_state_name}.")
+        log.debug("QMediaPlayer [%s] STATE CHANGED to %s.", channel, current_state_name)
 
-    def _handle_player_media_status_changed_for_debug(self, status):
+    def _handle_player_media_status_changed_for_debug(self, channel, status):
         status_map = {
             QMediaPlayer.NoMedia: "NoMedia",
             QMediaPlayer.LoadingMedia: "LoadingMedia",
@@ -899,19 +1739,32 @@ class OkulZiliProgrami(QWidget):
             QMediaPlayer.UnknownMediaStatus: "UnknownMediaStatus"
         }
         current_status_name = status_map.get(status, f"Unknown Status ({status})")
-        print(f"DEBUG: QMediaPlayer MEDIA STATUS CHANGED to {current_status_name}.")
+        log.debug("QMediaPlayer [%s] MEDIA STATUS CHANGED to %s.", channel, current_status_name)
 
 
     def show_special_situations_window(self):
         special_dialog = SpecialSituationsWindow(self)
         special_dialog.exec_()
 
+    def show_calendar_window(self):
+        calendar_dialog = CalendarWindow(self)
+        calendar_dialog.exec_()
+        self.updateTime(force=True)
+
+    def show_schedule_tools_window(self):
+        schedule_tools_dialog = ScheduleToolsWindow(self)
+        schedule_tools_dialog.exec_()
+
+    def show_latency_stats_window(self):
+        stats_dialog = LatencyStatsWindow(self)
+        stats_dialog.exec_()
+
     def show_settings_window(self):
         settings_dialog = SettingsWindow(self)
         if settings_dialog.exec_() == QDialog.Accepted:
-            print("Ayarlar kaydedildi ve ana pencere güncellendi.")
+            log.info("Ayarlar kaydedildi ve ana pencere güncellendi.")
         else:
-            print("Ayarlar iptal edildi.")
+            log.debug("Ayarlar iptal edildi.")
 
     def show_about_window(self):
         QMessageBox.information(self, "Hakkında",
@@ -920,66 +1773,72 @@ class OkulZiliProgrami(QWidget):
         )
 
     def _save_all_data(self):
-        data = {
-            "school_name": self.school_name_text,
-            "school_logo_path": self.school_logo_path,
-            "bell_sound_paths": self.bell_sound_paths,
-            "lesson_times": self.lesson_times,
-        }
+        # Yazma arka planda yapılır; hata olursa saveFailed sinyaliyle uyarı gösterilir
+        self.core.save_all_data()
+
+    def _queue_invalid_assignment(self, path, problem):
+        self.invalid_assignments.append(f"{path} ({problem})")
+        self.invalid_assignment_timer.start(500)
+
+    def _show_invalid_assignments(self):
+        lines, self.invalid_assignments = self.invalid_assignments, []
+        QMessageBox.warning(self, "Zil Sesi Sorunu",
+                            "Zil olarak atanan şu ses dosyaları çalınamayabilir:\n\n" + "\n".join(lines))
+
+    def _show_save_error(self, message):
+        QMessageBox.critical(self, "Kayıt Hatası", f"Veriler kaydedilirken bir hata oluştu: {message}")
+
+    def _load_all_data(self):
         try:
-            with open(self.DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-            print(f"Tüm veriler '{self.DATA_FILE}' dosyasına kaydedildi.")
+            self.core.load_all_data()
         except Exception as e:
-            QMessageBox.critical(self, "Kayıt Hatası", f"Veriler kaydedilirken bir hata oluştu: {e}")
+            QMessageBox.critical(self, "Yükleme Hatası", f"Veriler yüklenirken bir hata oluştu: {e}")
 
-    def _load_all_data(self):
-        if os.path.exists(self.DATA_FILE):
-            try:
-                with open(self.DATA_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                self.school_name_text = data.get("school_name", self.school_name_text)
-                self.school_logo_path = data.get("school_logo_path", self.school_logo_path)
-                self.bell_sound_paths = data.get("bell_sound_paths", self.bell_sound_paths)
-
-                loaded_lesson_times = data.get("lesson_times", {})
-                for day, sessions in self.lesson_times.items():
-                    for session, lessons in sessions.items():
-                        for lesson_key, bell_times in lessons.items():
-                            for bell_type in bell_times:
-                                self.lesson_times[day][session][lesson_key][bell_type] = \
-                                    loaded_lesson_times.get(day, {}).get(session, {}).get(lesson_key, {}).get(bell_type, "")
-
-                self.school_name_label.setText(self.school_name_text)
-                self._load_logo(self.school_logo_label, self.school_logo_path)
-
-                for day_name, sessions in self.day_tabs_widgets.items():
-                    for session_name, lessons in sessions.items():
-                        for lesson_key, bell_type_entries in lessons.items():
-                            for bell_type, line_edit_obj in bell_type_entries.items():
-                                if line_edit_obj:
-                                    time_value = self.lesson_times.get(day_name, {}).get(session_name, {}).get(lesson_key, {}).get(bell_type, "")
-                                    line_edit_obj.setText(time_value)
-
-                current_date_obj = QDate.currentDate()
-                day_names_turkish_list = ["Pazar", "Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi"]
-                current_day_index = current_date_obj.dayOfWeek()
-                current_day_name_turkish = day_names_turkish_list[current_day_index % 7]
-                self._mark_past_bells_as_rung_for_day(current_day_name_turkish)
-
-                print(f"Tüm veriler '{self.DATA_FILE}' dosyasından yüklendi.")
-            except Exception as e:
-                QMessageBox.critical(self, "Yükleme Hatası", f"Veriler yüklenirken bir hata oluştu: {e}")
-        else:
-            print(f"'{self.DATA_FILE}' dosyası bulunamadı, varsayılan veriler kullanılıyor.")
+        self.school_name_label.setText(self.school_name_text)
+        self.lesson_times_model.refresh()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_seen:
+            self._first_paint_seen = True
+            self.startup_profile.mark("first_paint")
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        """İlk çizimden sonra logoları yükler ve ses çözme, kütüphane taraması gibi arka plan işlerini başlatır."""
+        if self._startup_finished:
+            return
+        self._startup_finished = True
+        self._load_logo(self.meb_logo_label, self.meb_logo_path)
+        self._load_logo(self.school_logo_label, self.school_logo_path)
+        self.core.start_background_services()
+        self.startup_profile.mark("background_services")
+        self.startup_profile.watch_sounds(get_sound_cache(), self.core.assigned_sound_paths())
 
     def closeEvent(self, event):
         self._save_all_data()
+        self.core.flush_data()
+        self.core.release_instance_lock()
         event.accept()
 
 if __name__ == '__main__':
+    if "--daemon" in sys.argv:
+        # Arayüzsüz kip: zamanlayıcı çekirdeği pencere olmadan çalışır
+        from zil_cekirdegi import main
+        sys.exit(main(sys.argv[1:]))
+
+    setup_logging(get_app_data_directory(), debug="--debug" in sys.argv or None)
+    startup_profile = StartupProfile(enabled="--startup-profile" in sys.argv)
+    startup_profile.mark("imports")
     app = QApplication(sys.argv)
-    ex = OkulZiliProgrami()
+    try:
+        ex = OkulZiliProgrami(startup_profile=startup_profile)
+    except AlreadyRunningError as e:
+        # Aynı veriyle ikinci bir çekirdek kurulursa ziller iki kez çalar ve düzenlemeler kaybolur
+        QMessageBox.critical(None, "ATAM Okul Zili Zaten Çalışıyor",
+                             f"{e}\n\nZiller arka planda (arayüzsüz kipte) veya başka bir pencerede çalıyor. "
+                             "Çizelgeyi bu pencereden düzenlemek için önce o kopyayı kapatın, ör.:\n\n"
+                             "systemctl --user stop atam-okul-zili.service")
+        sys.exit(1)
     ex.show()
     sys.exit(app.exec_())
@@ -0,0 +1,72 @@
+"""Açılış süresi ölçümü (--startup-profile).
+
+Sürecin başladığı andan itibaren açılış aşamalarına kadar geçen süreler kaydedilir: pencerenin
+ilk çizimi, zilin çalmaya hazır olması (çizelge yüklendi, sıradaki zil kuruldu, ses bölgeleri
+hazır) ve zil seslerinin belleğe çözülmesi. Her aşama ulaşıldığında kayıtlara yazılır.
+"""
+
+import os
+import time
+
+from loglama import get_logger
+
+log = get_logger(__name__)
+
+PHASE_NAMES = {
+    "imports": "Modüller yüklendi",
+    "window": "Pencere kuruldu",
+    "ready_to_ring": "Zil çalmaya hazır",
+    "first_paint": "İlk çizim",
+    "background_services": "Arka plan işleri başladı",
+    "bell_sounds_decoded": "Zil sesleri belleğe çözüldü",
+}
+
+
+def process_start_monotonic():
+    """Sürecin başladığı an (time.monotonic cinsinden); /proc okunamazsa None."""
+    try:
+        with open("/proc/self/stat", 'r') as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19]) # 22. alan: açılıştan sonraki saat tiki
+        with open("/proc/uptime", 'r') as f:
+            uptime_secs = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return time.monotonic() - (uptime_secs - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+class StartupProfile:
+    """Açılış aşamalarının sürecin başlangıcından itibaren geçen sürelerini (ms) tutar.
+    Kapalıyken mark() hiçbir şey yapmaz."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.start = (process_start_monotonic() or time.monotonic()) if enabled else None
+        self.marks = {} # aşama -> ms
+
+    def mark(self, phase):
+        """Aşamaya ilk ulaşıldığı anı kaydeder."""
+        if not self.enabled or phase in self.marks:
+            return
+        self.marks[phase] = elapsed_ms = (time.monotonic() - self.start) * 1000
+        log.info("Açılış: %s +%d ms", PHASE_NAMES.get(phase, phase), elapsed_ms)
+
+    def watch_sounds(self, cache, paths):
+        """Verilen ses dosyalarının tümü önbelleğe çözüldüğünde (veya çözülemediğinde)
+        "bell_sounds_decoded" aşamasını işaretler."""
+        if not self.enabled:
+            return
+        waiting = {path for path in paths if path and cache.get(path) is None and cache.is_pending(path)}
+
+        def on_sound_done(path, *_):
+            waiting.discard(path)
+            if not waiting:
+                cache.soundReady.disconnect(on_sound_done)
+                cache.decodeFailed.disconnect(on_sound_done)
+                self.mark("bell_sounds_decoded")
+
+        if not waiting:
+            self.mark("bell_sounds_decoded")
+            return
+        cache.soundReady.connect(on_sound_done)
+        cache.decodeFailed.connect(on_sound_done)
+
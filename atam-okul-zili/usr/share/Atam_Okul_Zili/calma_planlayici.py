@@ -0,0 +1,176 @@
+"""Öncelikli çalma planlayıcısı.
+
+Zil, siren ve marş istekleri doğrudan oynatıcıya gitmez; planlayıcı her bölgede o an çalan isteğin
+önceliğine bakarak yeni isteği hemen çalar (gerekirse çalanı keser), sıraya alır ya da bırakır:
+
+    acil durum (deprem, yangın) > tören (İstiklal Marşı, saygı duruşu, 10 Kasım) > zil > deneme
+
+Daha öncelikli bir ses çalarken gelen zil, o ses bitince (bekleme süresi aşılmadıysa) çalar; deneme
+sesleri ve acil durumda gelen tören sesleri bırakılır. Eşit öncelikli yeni istek eskisinin yerini alır.
+submit() beklemeden döner; sıradaki istekler oynatıcı boşaldığında kendiliğinden başlatılır.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import time
+
+from loglama import get_logger
+from ses_oynatici import get_audio_router, play_sound, stop_sound, is_playing, ALL_ZONES, DEFAULT_ZONE
+
+log = get_logger(__name__)
+
+PRIORITY_TEST = 0
+PRIORITY_BELL = 1
+PRIORITY_CEREMONY = 2
+PRIORITY_EMERGENCY = 3
+PRIORITY_NAMES = {PRIORITY_TEST: "test", PRIORITY_BELL: "bell", PRIORITY_CEREMONY: "ceremony",
+                  PRIORITY_EMERGENCY: "emergency"}
+
+# Daha öncelikli bir ses çalarken gelen isteğin en fazla bekletileceği süre; 0 isteği bırakır
+QUEUE_MAX_WAIT_SECS = {PRIORITY_TEST: 0, PRIORITY_BELL: 180, PRIORITY_CEREMONY: 0, PRIORITY_EMERGENCY: 0}
+# Bu öncelikteki ses başlayınca sırada bekleyen daha düşük öncelikli istekler bırakılır
+CLEARS_QUEUE = {PRIORITY_EMERGENCY}
+
+STARTED = "started"
+QUEUED = "queued"
+DROPPED = "dropped"
+FAILED = "failed"
+
+
+class PlaybackRequest:
+    """Planlayıcıya verilen bir çalma isteği ve sonucu (status, hata mesajı)."""
+    __slots__ = ("path", "priority", "channel", "zone", "label", "submitted", "status", "error")
+
+    def __init__(self, path, priority, channel=None, zone=DEFAULT_ZONE, label=""):
+        self.path = path
+        self.priority = priority
+        self.channel = channel
+        self.zone = zone
+        self.label = label
+        self.submitted = time.monotonic()
+        self.status = None
+        self.error = None
+
+    def summary(self):
+        return {"label": self.label, "priority": PRIORITY_NAMES[self.priority], "file": self.path}
+
+
+class PlaybackScheduler(QObject):
+    """Bölge başına çalan isteği ve bekleyen istekleri tutar; oynatıcı boşalınca sıradakini başlatır."""
+    requestStarted = pyqtSignal(object) # PlaybackRequest; sıradan başlatılanlar dahil
+    requestDropped = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._active = {} # bölge -> çalan PlaybackRequest
+        self._queued = {} # bölge -> {öncelik: PlaybackRequest}; her öncelikten yalnızca son istek bekler
+        self._starting = False
+        get_audio_router().stateChanged.connect(self._on_router_state_changed)
+
+    def submit(self, path, priority, channel=None, zone=DEFAULT_ZONE, label=""):
+        """İsteği önceliğe göre hemen çalar, sıraya alır veya bırakır; beklemeden PlaybackRequest döndürür."""
+        request = PlaybackRequest(path, priority, channel, zone, label or path)
+        zones = get_audio_router().zones() if zone == ALL_ZONES else [zone]
+        started = queued = False
+        errors = [] # Bir bölgenin çıkışı bozuksa diğer bölgeler yine denenir
+        for target_zone in zones:
+            active = self._active.get(target_zone)
+            if active is not None and not is_playing(target_zone):
+                self._active.pop(target_zone) # Bitişi sinyalle bildirilmemiş ses
+                active = None
+            if active is None or priority >= active.priority:
+                error_message = self._start(request, target_zone)
+                if error_message:
+                    log.warning("'%s', '%s' bölgesinde çalınamadı: %s", request.label, target_zone, error_message)
+                    errors.append(error_message if len(zones) == 1 else f"{target_zone}: {error_message}")
+                    continue
+                started = True
+            elif QUEUE_MAX_WAIT_SECS[priority] > 0:
+                self._queued.setdefault(target_zone, {})[priority] = request
+                queued = True
+                log.info("'%s' sıraya alındı; '%s' bölgesinde daha öncelikli '%s' çalıyor.", request.label, target_zone, active.label)
+            else:
+                log.info("'%s' çalınmadı; '%s' bölgesinde daha öncelikli '%s' çalıyor.", request.label, target_zone, active.label)
+        request.status = STARTED if started else QUEUED if queued else FAILED if errors else DROPPED
+        if errors:
+            request.error = "\n".join(errors) # Bölgelerin bir kısmında çalsa bile hata bildirilir
+        if request.status == DROPPED:
+            request.error = "Daha öncelikli bir ses çaldığı için çalınmadı."
+            self.requestDropped.emit(request)
+        return request
+
+    def stop(self, label=None, zone=None):
+        """Çalan ve bekleyen istekleri durdurur. label verilirse yalnızca o sesi, zone verilirse yalnızca o bölgeyi."""
+        zones = [zone] if zone is not None else set(self._active) | set(self._queued)
+        for target_zone in zones:
+            queued = self._queued.get(target_zone, {})
+            for priority, request in list(queued.items()):
+                if label is None or request.label == label:
+                    del queued[priority]
+            active = self._active.get(target_zone)
+            if label is None or (active is not None and active.label == label):
+                self._active.pop(target_zone, None)
+                stop_sound(target_zone)
+                self._start_next(target_zone)
+
+    def active_request(self, zone=DEFAULT_ZONE):
+        return self._active.get(zone)
+
+    def report(self):
+        """Bölge başına çalan ve bekleyen isteklerin özeti."""
+        zones = set(self._active) | {zone for zone, queued in self._queued.items() if queued}
+        return {zone: {"playing": self._active[zone].summary() if zone in self._active else None,
+                       "queued": [request.summary() for _, request in sorted(self._queued.get(zone, {}).items(), reverse=True)]}
+                for zone in sorted(zones)}
+
+    def _start(self, request, zone):
+        active = self._active.get(zone)
+        if active is not None and active is not request:
+            log.info("'%s', '%s' bölgesinde '%s' sesini kesiyor.", request.label, zone, active.label)
+        self._starting = True # Oynatıcının önceki sesi durdururken yaydığı sinyaller sırayı ilerletmesin
+        try:
+            error_message = play_sound(request.path, channel=request.channel, zone=zone)
+        finally:
+            self._starting = False
+        if error_message:
+            return error_message
+        self._active[zone] = request
+        if request.priority in CLEARS_QUEUE:
+            queued = self._queued.get(zone, {})
+            for priority in [priority for priority in queued if priority < request.priority]:
+                log.info("'%s' sırasından çıkarıldı: '%s' çalıyor.", queued.pop(priority).label, request.label)
+        self.requestStarted.emit(request)
+        return None
+
+    def _start_next(self, zone):
+        queued = self._queued.get(zone, {})
+        while queued:
+            request = queued.pop(max(queued))
+            waited_secs = time.monotonic() - request.submitted
+            if waited_secs > QUEUE_MAX_WAIT_SECS[request.priority]:
+                log.warning("'%s' %d sn bekledi, bekleme süresi aşıldığı için çalınmadı.", request.label, waited_secs)
+                self.requestDropped.emit(request)
+                continue
+            log.info("Sırada bekleyen '%s', %d sn gecikmeyle '%s' bölgesinde çalınıyor.", request.label, waited_secs, zone)
+            error_message = self._start(request, zone)
+            if error_message is None:
+                return
+            log.warning("%s", error_message)
+
+    def _on_router_state_changed(self, _channel, _state):
+        if self._starting:
+            return
+        for zone in list(self._active):
+            if not is_playing(zone):
+                self._active.pop(zone)
+                self._start_next(zone)
+
+
+_playback_scheduler = None
+
+def get_playback_scheduler():
+    """Paylaşılan çalma planlayıcısını döndürür, ilk çağrıda oluşturur."""
+    global _playback_scheduler
+    if _playback_scheduler is None:
+        _playback_scheduler = PlaybackScheduler()
+    return _playback_scheduler
@@ -0,0 +1,298 @@
+"""Zil çizelgesinin CSV ve iCalendar (.ics) olarak dışa ve içe aktarılması.
+
+CSV'de her satır bir günün bir oturumundaki bir derstir; sütunlar zil tipleridir (tablodaki düzen):
+
+    Gün,Oturum,Ders,İçeri,Öğretmenler,Teneffüs
+    Pazartesi,Sabah,1.Ders,08:30,08:28,09:10
+
+Ayırıcı olarak virgül, noktalı virgül (Türkçe Excel) veya sekme kabul edilir. iCalendar dosyasında
+her zil, haftalık yinelenen bir dakikalık bir etkinliktir; yuvası X-ATAM-SLOT özelliğinde (takvim
+uygulaması bunu silerse başlıkta) saklanır. BYDAY ile birden çok güne yinelenen etkinlikler de okunur.
+
+Dosyalar satır satır okunur ve yazılır. İçe aktarmada dosyada geçen günler dosyadakilerle değiştirilir,
+diğer günlere dokunulmaz. Hatalı satır varsa hiçbir şey uygulanmaz; bütün hatalar satır numaralarıyla
+ScheduleImportError içinde bildirilir.
+"""
+
+import csv
+import datetime
+import os
+
+from ders_cizelgesi import (Schedule, DAY_NAMES, SESSIONS, LESSON_KEYS, BELL_TYPES, NO_BELL,
+                            time_str_to_seconds)
+
+CSV_DAY_COLUMN = "Gün"
+CSV_SESSION_COLUMN = "Oturum"
+CSV_LESSON_COLUMN = "Ders"
+CSV_HEADER = [CSV_DAY_COLUMN, CSV_SESSION_COLUMN, CSV_LESSON_COLUMN] + BELL_TYPES
+CSV_DELIMITERS = ",;\t"
+
+ICAL_PRODID = "-//ATAM Okul Zili//Zil Cizelgesi//TR"
+ICAL_SLOT_PROPERTY = "X-ATAM-SLOT" # oturum/ders/zil tipi
+ICAL_UID_DOMAIN = "atam-okul-zili"
+ICAL_LINE_OCTETS = 75 # RFC 5545: daha uzun satırlar katlanır
+ICAL_WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"] # DAY_NAMES sırasıyla
+
+MAX_REPORTED_ERRORS = 10 # Hata iletisinde gösterilen en fazla satır
+
+
+class ScheduleImportError(ValueError):
+    """İçe aktarılan dosyadaki hatalar; errors, satır numaralı hata iletilerinin listesidir."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        lines = errors[:MAX_REPORTED_ERRORS]
+        if len(errors) > MAX_REPORTED_ERRORS:
+            lines.append(f"... ve {len(errors) - MAX_REPORTED_ERRORS} hata daha.")
+        super().__init__("\n".join(lines))
+
+
+def _event_summary(session, lesson_key, bell_type):
+    return f"{bell_type} Zili - {session} {lesson_key}"
+
+_SUMMARY_SLOTS = {_event_summary(session, lesson_key, bell_type): (session, lesson_key, bell_type)
+                  for session in SESSIONS for lesson_key in LESSON_KEYS for bell_type in BELL_TYPES}
+
+
+# --- CSV ---
+def write_csv(schedule, path):
+    """Çizelgeyi CSV olarak yazar; Excel'in Türkçe karakterleri tanıması için UTF-8 BOM eklenir."""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for day in DAY_NAMES:
+            for session in SESSIONS:
+                for lesson_key in LESSON_KEYS:
+                    writer.writerow([day, session, lesson_key] +
+                                    [schedule.get_text(day, session, lesson_key, bell_type) for bell_type in BELL_TYPES])
+
+def read_csv(path, base=None):
+    """CSV dosyasını base çizelgesinin (verilmezse boş çizelge) bir kopyasına uygular ve döndürür."""
+    errors = []
+    rows = {} # (gün, oturum, ders) -> {zil tipi: saniye}
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        header_line = f.readline()
+        delimiter = max(CSV_DELIMITERS, key=header_line.count)
+        header = next(csv.reader([header_line], delimiter=delimiter), [])
+        columns = {name.strip(): col for col, name in enumerate(header)}
+        # Eksik zil sütunu olsaydı içe aktarılan günlerin o tipteki zilleri sessizce silinirdi
+        missing = [name for name in CSV_HEADER if name not in columns]
+        if missing:
+            raise ScheduleImportError([f"1. satır: başlık {', '.join(CSV_HEADER)} sütunlarını içermeli; "
+                                       f"eksik: {', '.join(missing)}."])
+
+        for line_number, row in enumerate(csv.reader(f, delimiter=delimiter), start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            if len(row) < len(header):
+                errors.append(f"{line_number}. satır: {len(header)} sütun olmalı, {len(row)} var.")
+                continue
+            day, session, lesson_key = (row[columns[name]].strip() for name in (CSV_DAY_COLUMN, CSV_SESSION_COLUMN, CSV_LESSON_COLUMN))
+            key_error = _slot_key_error(day, session, lesson_key)
+            if key_error:
+                errors.append(f"{line_number}. satır: {key_error}")
+                continue
+            if (day, session, lesson_key) in rows:
+                errors.append(f"{line_number}. satır: {day} {session} {lesson_key} birden çok kez yazılmış.")
+                continue
+            bell_seconds = {}
+            for bell_type in BELL_TYPES:
+                text = row[columns[bell_type]].strip()
+                second = time_str_to_seconds(text) if text else NO_BELL
+                if second is None:
+                    errors.append(f"{line_number}. satır: {bell_type} saati geçersiz: '{text}'")
+                bell_seconds[bell_type] = second
+            rows[(day, session, lesson_key)] = bell_seconds
+
+    if errors:
+        raise ScheduleImportError(errors)
+    if not rows:
+        raise ScheduleImportError(["Dosyada zil satırı bulunamadı."])
+    schedule = base.copy() if base is not None else Schedule()
+    schedule.clear(days=sorted({day for day, _, _ in rows}, key=DAY_NAMES.index))
+    for (day, session, lesson_key), bell_seconds in rows.items():
+        for bell_type, second in bell_seconds.items():
+            schedule.set_seconds(day, session, lesson_key, bell_type, second)
+    return schedule
+
+def _slot_key_error(day, session, lesson_key):
+    if day not in DAY_NAMES:
+        return f"bilinmeyen gün: '{day}'"
+    if session not in SESSIONS:
+        return f"bilinmeyen oturum: '{session}'"
+    if lesson_key not in LESSON_KEYS:
+        return f"bilinmeyen ders: '{lesson_key}'"
+    return None
+
+
+# --- iCalendar ---
+def _escape_text(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _unescape_text(text):
+    result = []
+    chars = iter(text)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, "")
+            char = "\n" if char in "nN" else char
+        result.append(char)
+    return "".join(result)
+
+def _fold(line):
+    """Satırı en fazla ICAL_LINE_OCTETS baytlık parçalara böler; UTF-8 karakterleri bölünmez."""
+    parts = []
+    current = ""
+    limit = ICAL_LINE_OCTETS
+    for char in line:
+        if len((current + char).encode('utf-8')) > limit:
+            parts.append(current)
+            current = ""
+            limit = ICAL_LINE_OCTETS - 1 # Devam satırları boşlukla başlar
+        current += char
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+def write_ical(schedule, path, reference_date=None):
+    """Her zili, reference_date'in (verilmezse bugünün) haftasından başlayıp haftalık yinelenen bir
+    etkinlik olarak yazar. Saatler yerel (saat dilimsiz) saattir."""
+    reference_date = reference_date or datetime.date.today()
+    week_start = reference_date - datetime.timedelta(days=reference_date.weekday())
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        def write(line):
+            f.write(_fold(line) + "\r\n")
+
+        for line in ("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{ICAL_PRODID}", "CALSCALE:GREGORIAN"):
+            write(line)
+        for day_index, day in enumerate(DAY_NAMES):
+            date = week_start + datetime.timedelta(days=day_index)
+            for second, session, lesson_key, bell_type in schedule.day_entries(day):
+                start = datetime.datetime.combine(date, datetime.time()) + datetime.timedelta(seconds=second)
+                write("BEGIN:VEVENT")
+                write(f"UID:{ICAL_WEEKDAYS[day_index]}-{SESSIONS.index(session)}-{LESSON_KEYS.index(lesson_key)}-"
+                      f"{BELL_TYPES.index(bell_type)}@{ICAL_UID_DOMAIN}")
+                write(f"DTSTAMP:{stamp}")
+                write(f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}")
+                write("DURATION:PT1M")
+                write(f"RRULE:FREQ=WEEKLY;BYDAY={ICAL_WEEKDAYS[day_index]}")
+                write(f"SUMMARY:{_escape_text(_event_summary(session, lesson_key, bell_type))}")
+                write(f"{ICAL_SLOT_PROPERTY}:{_escape_text(f'{session}/{lesson_key}/{bell_type}')}")
+                write("END:VEVENT")
+        write("END:VCALENDAR")
+
+def _unfolded_lines(f):
+    """Katlanmış satırları birleştirerek (satır numarası, satır) üretir."""
+    line_number, current = 0, None
+    for physical_number, line in enumerate(f, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield line_number, current
+        line_number, current = physical_number, line
+    if current is not None:
+        yield line_number, current
+
+def _parse_property(line):
+    """"AD;PARAMETRE=DEĞER:değer" satırını (AD, {PARAMETRE: DEĞER}, değer) olarak ayırır."""
+    name_part, _, value = line.partition(":")
+    name, *params = name_part.split(";")
+    return name.upper(), dict(param.partition("=")[::2] for param in params), value
+
+def _event_bells(event):
+    """VEVENT özelliklerinden (gün listesi, saniye, (oturum, ders, zil tipi)) çıkarır; geçersizse ValueError."""
+    if "DTSTART" not in event:
+        raise ValueError("DTSTART yok.")
+    params, value = event["DTSTART"]
+    if params.get("VALUE", "").upper() == "DATE" or "T" not in value:
+        raise ValueError(f"Tüm gün süren etkinlik zil olamaz: {value}")
+    try:
+        start = datetime.datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise ValueError(f"DTSTART okunamadı: {value}") from None
+    if value.endswith("Z"): # UTC saat yerel saate çevrilir
+        start = start.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+
+    rule = dict(part.partition("=")[::2] for part in event.get("RRULE", ({}, ""))[1].upper().split(";") if part)
+    frequency = rule.get("FREQ", "WEEKLY")
+    if frequency not in ("WEEKLY", "DAILY"):
+        raise ValueError(f"Yalnızca haftalık veya günlük yinelenen etkinlikler okunur: FREQ={frequency}")
+    if "BYDAY" in rule:
+        codes = [code[-2:] for code in rule["BYDAY"].split(",")]
+        unknown = [code for code in codes if code not in ICAL_WEEKDAYS]
+        if unknown:
+            raise ValueError(f"Bilinmeyen BYDAY günü: {','.join(unknown)}")
+        days = [DAY_NAMES[ICAL_WEEKDAYS.index(code)] for code in codes]
+    else:
+        days = DAY_NAMES if frequency == "DAILY" else [DAY_NAMES[start.weekday()]]
+
+    slot = None
+    if ICAL_SLOT_PROPERTY in event:
+        parts = _unescape_text(event[ICAL_SLOT_PROPERTY][1]).split("/")
+        if len(parts) == 3 and parts[0] in SESSIONS and parts[1] in LESSON_KEYS and parts[2] in BELL_TYPES:
+            slot = tuple(parts)
+    if slot is None and "SUMMARY" in event:
+        slot = _SUMMARY_SLOTS.get(_unescape_text(event["SUMMARY"][1]).strip())
+    if slot is None:
+        raise ValueError(f"Zilin oturumu, dersi ve tipi belirlenemedi ({ICAL_SLOT_PROPERTY} veya "
+                         f"'{_event_summary('Sabah', '1.Ders', 'İçeri')}' biçiminde başlık gerekir).")
+    return days, start.hour * 3600 + start.minute * 60 + start.second, slot
+
+def read_ical(path, base=None):
+    """iCalendar dosyasındaki zilleri base çizelgesinin (verilmezse boş çizelge) bir kopyasına uygular."""
+    errors = []
+    bells = {} # (gün, oturum, ders, zil tipi) -> saniye
+    event = None
+    event_line = 0
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for line_number, line in _unfolded_lines(f):
+            name, params, value = _parse_property(line)
+            if name == "BEGIN" and value.upper() == "VEVENT":
+                event, event_line = {}, line_number
+            elif name == "END" and value.upper() == "VEVENT" and event is not None:
+                try:
+                    days, second, slot = _event_bells(event)
+                except ValueError as e:
+                    errors.append(f"{event_line}. satır: {e}")
+                else:
+                    for day in days:
+                        if (day,) + slot in bells:
+                            errors.append(f"{event_line}. satır: {day} {' '.join(slot)} zili birden çok kez tanımlanmış.")
+                        bells[(day,) + slot] = second
+                event = None
+            elif event is not None and name not in event:
+                event[name] = (params, value)
+
+    if errors:
+        raise ScheduleImportError(errors)
+    if not bells:
+        raise ScheduleImportError(["Dosyada zil etkinliği bulunamadı."])
+    schedule = base.copy() if base is not None else Schedule()
+    schedule.clear(days=sorted({key[0] for key in bells}, key=DAY_NAMES.index))
+    for (day, session, lesson_key, bell_type), second in bells.items():
+        schedule.set_seconds(day, session, lesson_key, bell_type, second)
+    return schedule
+
+
+# --- Dosya türüne göre ---
+IMPORT_FORMATS = {".csv": read_csv, ".ics": read_ical}
+EXPORT_FORMATS = {".csv": write_csv, ".ics": write_ical}
+
+def import_schedule(path, base=None):
+    """Dosya uzantısına (.csv, .ics) göre çizelgeyi okur. Okunamayan dosyada OSError veya ScheduleImportError fırlatır."""
+    reader = IMPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ScheduleImportError([f"Desteklenmeyen dosya türü: {os.path.basename(path)} (.csv veya .ics olmalı)"])
+    try:
+        return reader(path, base)
+    except UnicodeDecodeError:
+        raise ScheduleImportError([f"{os.path.basename(path)} UTF-8 metin dosyası değil."]) from None
+
+def export_schedule(schedule, path):
+    """Dosya uzantısına (.csv, .ics) göre çizelgeyi yazar."""
+    writer = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if writer is None:
+        raise ValueError(f"Desteklenmeyen dosya türü: {os.path.basename(path)} (.csv veya .ics olmalı)")
+    writer(schedule, path)
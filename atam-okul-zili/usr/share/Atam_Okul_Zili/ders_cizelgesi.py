@@ -0,0 +1,282 @@
+"""Haftalık zil çizelgesi.
+
+Çizelge 7 gün × 2 oturum × 9 ders × 3 zil tipi = 378 yuvadan oluşur. Her yuva, gün içindeki
+saniyeyi tutan sabit boyutlu bir tamsayı dizisinde saklanır; zil yoksa NO_BELL değeri bulunur.
+Saatler yalnızca girişte bir kez ayrıştırılır; karşılaştırma ve aramalar tamsayı işlemidir.
+Saatler "HH:MM" veya saniye hassasiyetinde "HH:MM:SS" olarak girilir; tam dakikalar yine "HH:MM"
+olarak yazıldığından eski kayıtlar aynen okunur ve aynen yazılır. JSON'daki iç içe sözlük biçimine
+ve geri dönüşüm kayıpsızdır (geçersiz veya boş saatler boş kalır).
+
+Aynı anda çalacak ziller önceliğe göre tek zile indirgenir (select_bell); find_conflicts bu
+çakışmaları ve bir önceki zil bitmeden başlayan zilleri düzenleyicide gösterilmek üzere bulur.
+"""
+
+from array import array
+
+DAY_NAMES = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+WEEKDAY_NAMES = DAY_NAMES[:5] # Hafta içi günleri
+SESSIONS = ["Sabah", "Öğle"]
+LESSON_KEYS = [f"{i}.Ders" for i in range(1, 10)] # 1. Ders'ten 9. Ders'e kadar
+BELL_TYPES = ["İçeri", "Öğretmenler", "Teneffüs"]
+
+NO_BELL = -1
+SECONDS_PER_DAY = 24 * 60 * 60
+DEFAULT_BELL_PRIORITIES = {"İçeri": 3, "Öğretmenler": 2, "Teneffüs": 1} # Aynı anda çalan zillerden büyük olan çalar
+DEFAULT_TEACHER_LEAD_SECS = 2 * 60 # Çizelge oluşturulurken Öğretmenler zili dersten bu kadar önce çalar
+
+_DAY_INDEX = {day: i for i, day in enumerate(DAY_NAMES)}
+_SESSION_INDEX = {session: i for i, session in enumerate(SESSIONS)}
+_LESSON_INDEX = {lesson_key: i for i, lesson_key in enumerate(LESSON_KEYS)}
+_BELL_INDEX = {bell_type: i for i, bell_type in enumerate(BELL_TYPES)}
+
+SLOTS_PER_SESSION = len(LESSON_KEYS) * len(BELL_TYPES)
+SLOTS_PER_DAY = len(SESSIONS) * SLOTS_PER_SESSION
+SLOT_COUNT = len(DAY_NAMES) * SLOTS_PER_DAY
+
+
+def time_str_to_seconds(time_str):
+    """"HH:MM" veya "HH:MM:SS" biçimindeki saati gün içindeki saniyeye çevirir. Geçersizse None döner.
+    Saniyesi boş bırakılmış maskeli giriş ("08:30:") "08:30" sayılır."""
+    parts = time_str.strip().rstrip(":").split(":")
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        return None
+    hour, minute = int(parts[0]), int(parts[1])
+    second = int(parts[2]) if len(parts) == 3 else 0
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return (hour * 60 + minute) * 60 + second
+
+def seconds_to_time_str(second_of_day):
+    """Gün içindeki saniyeyi tam dakikalarda "HH:MM", diğerlerinde "HH:MM:SS" olarak yazar."""
+    minute_of_day, second = divmod(second_of_day, 60)
+    time_str = f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+    return f"{time_str}:{second:02d}" if second else time_str
+
+def slot_index(day, session, lesson_key, bell_type):
+    """(gün, oturum, ders, zil tipi) adlarına karşılık gelen dizi konumunu döndürür."""
+    return (((_DAY_INDEX[day] * len(SESSIONS) + _SESSION_INDEX[session]) * len(LESSON_KEYS)
+             + _LESSON_INDEX[lesson_key]) * len(BELL_TYPES) + _BELL_INDEX[bell_type])
+
+def _session_start(day, session):
+    return (_DAY_INDEX[day] * len(SESSIONS) + _SESSION_INDEX[session]) * SLOTS_PER_SESSION
+
+def slot_names(index):
+    """Dizi konumuna karşılık gelen (gün, oturum, ders, zil tipi) adlarını döndürür."""
+    index, bell_idx = divmod(index, len(BELL_TYPES))
+    index, lesson_idx = divmod(index, len(LESSON_KEYS))
+    day_idx, session_idx = divmod(index, len(SESSIONS))
+    return DAY_NAMES[day_idx], SESSIONS[session_idx], LESSON_KEYS[lesson_idx], BELL_TYPES[bell_idx]
+
+
+class Schedule:
+    """Haftalık zil saatlerini saniye cinsinden sabit boyutlu bir dizide tutar."""
+    __slots__ = ("_seconds",)
+
+    def __init__(self, seconds=None):
+        if seconds is None:
+            self._seconds = array('i', [NO_BELL]) * SLOT_COUNT
+        else:
+            self._seconds = array('i', seconds)
+            if len(self._seconds) != SLOT_COUNT:
+                raise ValueError(f"Çizelge {SLOT_COUNT} yuva içermeli, {len(self._seconds)} verildi.")
+
+    def get_seconds(self, day, session, lesson_key, bell_type):
+        """Yuvadaki gün içi saniyeyi, zil yoksa NO_BELL döndürür."""
+        return self._seconds[slot_index(day, session, lesson_key, bell_type)]
+
+    def set_seconds(self, day, session, lesson_key, bell_type, second_of_day):
+        self._seconds[slot_index(day, session, lesson_key, bell_type)] = second_of_day
+
+    def get_text(self, day, session, lesson_key, bell_type):
+        """Yuvadaki saati "HH:MM" veya "HH:MM:SS", zil yoksa boş metin olarak döndürür."""
+        second = self.get_seconds(day, session, lesson_key, bell_type)
+        return "" if second == NO_BELL else seconds_to_time_str(second)
+
+    def set_text(self, day, session, lesson_key, bell_type, text):
+        """Saati metinden ayrıştırıp yazar. Boş ya da geçersiz metin zili iptal eder.
+        Yazılan değerin metin karşılığını döndürür."""
+        second = time_str_to_seconds(text)
+        self.set_seconds(day, session, lesson_key, bell_type, NO_BELL if second is None else second)
+        return "" if second is None else seconds_to_time_str(second)
+
+    def day_entries(self, day):
+        """Günün dolu yuvalarını (saniye, oturum, ders, zil tipi) olarak tablo sırasıyla üretir."""
+        start = _DAY_INDEX[day] * SLOTS_PER_DAY
+        seconds = self._seconds
+        for index in range(start, start + SLOTS_PER_DAY):
+            second = seconds[index]
+            if second != NO_BELL:
+                _, session, lesson_key, bell_type = slot_names(index)
+                yield second, session, lesson_key, bell_type
+
+    def copy(self):
+        return Schedule(self._seconds)
+
+    # Toplu düzenlemeler dizinin dilimleri üzerinde çalışır; tam haftalık bir değişiklik bile anlıktır.
+    # Geçersiz bir düzenlemede ValueError fırlatılır ve çizelgeye dokunulmaz.
+    def clear(self, days=None, sessions=None):
+        """Verilen günlerin (hepsi için None) oturumlarındaki zilleri siler."""
+        for start in self._session_starts(days, sessions):
+            self._seconds[start:start + SLOTS_PER_SESSION] = array('i', [NO_BELL]) * SLOTS_PER_SESSION
+
+    def copy_day(self, source_day, target_days, sessions=None):
+        """Kaynak günün zil saatlerini hedef günlere (ör. WEEKDAY_NAMES) kopyalar."""
+        for session in SESSIONS if sessions is None else sessions:
+            source = _session_start(source_day, session)
+            for day in target_days:
+                if day != source_day:
+                    target = _session_start(day, session)
+                    self._seconds[target:target + SLOTS_PER_SESSION] = self._seconds[source:source + SLOTS_PER_SESSION]
+
+    def shift(self, shift_secs, days=None, sessions=None):
+        """Verilen günlerin oturumlarındaki bütün zilleri shift_secs kadar ileri (+) veya geri (-) alır.
+        Gün sınırının dışına taşacak bir zil varsa hiçbir zil kaydırılmaz."""
+        starts = self._session_starts(days, sessions)
+        seconds = self._seconds
+        for start in starts:
+            for index in range(start, start + SLOTS_PER_SESSION):
+                second = seconds[index]
+                if second != NO_BELL and not 0 <= second + shift_secs < SECONDS_PER_DAY:
+                    day, session, lesson_key, bell_type = slot_names(index)
+                    raise ValueError(f"{day} {session} {lesson_key} {bell_type} zili ({seconds_to_time_str(second)}) "
+                                     f"gün sınırının dışına taşıyor.")
+        for start in starts:
+            for index in range(start, start + SLOTS_PER_SESSION):
+                if seconds[index] != NO_BELL:
+                    seconds[index] += shift_secs
+
+    def generate_session(self, days, session, first_lesson_secs, lesson_secs, break_secs,
+                         lesson_count=len(LESSON_KEYS), teacher_lead_secs=DEFAULT_TEACHER_LEAD_SECS):
+        """Oturumun zillerini ilk dersin başlangıcından, ders ve teneffüs sürelerinden üretir. Her derste
+        Öğretmenler zili dersten teacher_lead_secs önce (0 ise hiç), İçeri zili ders başında, Teneffüs zili
+        ders bitiminde çalar. lesson_count'tan sonraki derslerin zilleri silinir."""
+        if not 1 <= lesson_count <= len(LESSON_KEYS):
+            raise ValueError(f"Ders sayısı 1 ile {len(LESSON_KEYS)} arasında olmalı.")
+        if lesson_secs <= 0 or break_secs < 0 or teacher_lead_secs < 0:
+            raise ValueError("Ders süresi sıfırdan büyük, teneffüs ve öğretmen zili süreleri negatif olmamalı.")
+        if first_lesson_secs - teacher_lead_secs < 0:
+            raise ValueError("İlk öğretmen zili gece yarısından önceye düşüyor.")
+        last_end_secs = first_lesson_secs + lesson_count * lesson_secs + (lesson_count - 1) * break_secs
+        if last_end_secs >= SECONDS_PER_DAY:
+            raise ValueError(f"Son ders ({lesson_count}.) gece yarısından sonra bitiyor.")
+
+        session_seconds = array('i', [NO_BELL]) * SLOTS_PER_SESSION
+        for lesson_idx in range(lesson_count):
+            start = first_lesson_secs + lesson_idx * (lesson_secs + break_secs)
+            slot = lesson_idx * len(BELL_TYPES)
+            session_seconds[slot + _BELL_INDEX["İçeri"]] = start
+            session_seconds[slot + _BELL_INDEX["Teneffüs"]] = start + lesson_secs
+            if teacher_lead_secs:
+                session_seconds[slot + _BELL_INDEX["Öğretmenler"]] = start - teacher_lead_secs
+        for day in days:
+            target = _session_start(day, session)
+            self._seconds[target:target + SLOTS_PER_SESSION] = session_seconds
+
+    def _session_starts(self, days, sessions):
+        return [_session_start(day, session) for day in (DAY_NAMES if days is None else days)
+                for session in (SESSIONS if sessions is None else sessions)]
+
+    def __eq__(self, other):
+        return isinstance(other, Schedule) and self._seconds == other._seconds
+
+    @classmethod
+    def from_json(cls, lesson_times):
+        """JSON'daki {gün: {oturum: {ders: {zil tipi: "HH:MM[:SS]"}}}} biçiminden çizelge oluşturur."""
+        schedule = cls()
+        for day, sessions in lesson_times.items():
+            if day not in _DAY_INDEX:
+                continue
+            for session, lessons in sessions.items():
+                if session not in _SESSION_INDEX:
+                    continue
+                for lesson_key, bell_times in lessons.items():
+                    if lesson_key not in _LESSON_INDEX:
+                        continue
+                    for bell_type, text in bell_times.items():
+                        if bell_type in _BELL_INDEX:
+                            schedule.set_text(day, session, lesson_key, bell_type, text)
+        return schedule
+
+    def to_json(self):
+        """Çizelgeyi JSON'daki iç içe sözlük biçimine çevirir; boş yuvalar "" olarak yazılır."""
+        lesson_times = {}
+        index = 0
+        seconds = self._seconds
+        for day in DAY_NAMES:
+            lesson_times[day] = {}
+            for session in SESSIONS:
+                lesson_times[day][session] = {}
+                for lesson_key in LESSON_KEYS:
+                    bell_times = {}
+                    for bell_type in BELL_TYPES:
+                        second = seconds[index]
+                        bell_times[bell_type] = "" if second == NO_BELL else seconds_to_time_str(second)
+                        index += 1
+                    lesson_times[day][session][lesson_key] = bell_times
+        return lesson_times
+
+
+def compile_day_timeline(schedule, day):
+    """Bir günün zil saatlerini (saniye, oturum, ders, zil tipi) girdilerinden oluşan,
+    zamana göre sıralı bir listeye derler."""
+    timeline = list(schedule.day_entries(day))
+    timeline.sort(key=lambda entry: entry[0]) # Aynı andaki ziller tablo sırasını korur
+    return timeline
+
+
+def select_bell(entries, priorities):
+    """Aynı anda çalacak (saniye, oturum, ders, zil tipi) girdilerinden çalınacak olanı seçer.
+    Önceliği büyük olan, eşitlikte daha geç planlanan, o da eşitse tabloda önce gelen kazanır."""
+    return max(entries, key=lambda entry: (priorities.get(entry[3], 0), entry[0]))
+
+
+class ScheduleConflict:
+    """Bir gündeki zil çakışması. entries, çakışan (saniye, oturum, ders, zil tipi) girdileridir;
+    ringing çakışmada çalacak girdi, play_secs önceki zilin çalma süresidir (yalnızca OVERLAP)."""
+    __slots__ = ("kind", "day", "entries", "ringing", "play_secs")
+
+    COLLISION = "collision" # Aynı anda birden çok zil; yalnızca biri çalar
+    OVERLAP = "overlap" # Zil, önceki zilin sesi bitmeden başlar ve onu keser
+
+    def __init__(self, kind, day, entries, ringing, play_secs=None):
+        self.kind = kind
+        self.day = day
+        self.entries = entries
+        self.ringing = ringing
+        self.play_secs = play_secs
+
+    def message(self):
+        def describe(entry):
+            return f"{entry[1]} {entry[2]} {entry[3]}"
+        if self.kind == self.COLLISION:
+            others = ", ".join(describe(entry) for entry in self.entries if entry is not self.ringing)
+            return (f"{seconds_to_time_str(self.ringing[0])}: {describe(self.ringing)} zili ile aynı anda "
+                    f"{others} zili var; yalnızca {self.ringing[3]} zili çalar.")
+        earlier, later = self.entries
+        return (f"{seconds_to_time_str(later[0])} {describe(later)} zili, {seconds_to_time_str(earlier[0])} "
+                f"{describe(earlier)} zilinin sesi ({self.play_secs} sn) bitmeden başlar ve onu keser.")
+
+
+def find_conflicts(schedule, day, priorities, play_secs=None):
+    """Günün aynı anda çalan ve bir önceki zilin sesi bitmeden başlayan zillerini bulur.
+    play_secs: {zil tipi: çalma süresi (sn)}; verilmeyen zil tipleri için örtüşme denetlenmez."""
+    timeline = compile_day_timeline(schedule, day)
+    play_secs = play_secs or {}
+    conflicts = []
+    previous = None
+    start = 0
+    while start < len(timeline):
+        end = start + 1
+        while end < len(timeline) and timeline[end][0] == timeline[start][0]:
+            end += 1
+        group = timeline[start:end]
+        ringing = select_bell(group, priorities)
+        if len(group) > 1:
+            conflicts.append(ScheduleConflict(ScheduleConflict.COLLISION, day, group, ringing))
+        if previous is not None:
+            duration = play_secs.get(previous[3])
+            if duration and ringing[0] - previous[0] < duration:
+                conflicts.append(ScheduleConflict(ScheduleConflict.OVERLAP, day, [previous, ringing], ringing, duration))
+        previous = ringing
+        start = end
+    return conflicts
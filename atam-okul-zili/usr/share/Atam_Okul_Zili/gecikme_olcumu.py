@@ -0,0 +1,137 @@
+"""Zil gecikmesi ölçümü.
+
+Her planlı zil için üç an kaydedilir: zilin çalması gereken an (planlanan), çekirdeğin zili
+eşleştirdiği an ve sesin gerçekten başladığı an. Sonuçlar yüzdeliklere toplanır ve makinece
+okunabilir bir JSON dosyasına yazılır.
+"""
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import json
+import math
+import os
+from collections import deque
+
+from loglama import get_logger
+from saat import get_clock
+
+log = get_logger(__name__)
+
+METRICS_FILE_NAME = "zil_gecikme_olcumleri.json"
+MAX_SAMPLES = 1000
+SAVE_DELAY_MSECS = 5000 # Ölçüm dosyası her zilde değil, ilk değişiklikten bu kadar sonra bir kez yazılır
+PERCENTILES = (50, 90, 95, 99)
+METRIC_NAMES = {
+    "match_delay_ms": "Planlanan → Eşleşme",
+    "start_delay_ms": "Eşleşme → Ses Başlangıcı",
+    "total_delay_ms": "Planlanan → Ses Başlangıcı",
+}
+
+
+def percentile(sorted_values, pct):
+    """Sıralı listede en yakın sıra yöntemiyle yüzdelik değeri döndürür."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class BellLatencyTracker(QObject):
+    """Planlı zillerin gecikmesini ölçer. Ses kanalı başladığında örnek tamamlanır."""
+    sampleRecorded = pyqtSignal(dict)
+
+    def __init__(self, metrics_file=None, parent=None):
+        super().__init__(parent)
+        self.metrics_file = metrics_file
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self.failed_count = 0
+        self.report_providers = {} # ad -> ek rapor üreten çağrılabilir (ör. tik sapması)
+        self._pending = {} # kanal adı -> tamamlanmamış örnek
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.timeout.connect(self.save_metrics_file)
+        self._load_metrics_file()
+
+    def begin(self, channel, label, due_msecs):
+        """Zil eşleştiği anda çağrılır. due_msecs, zilin planlandığı an (Unix epoch, ms)."""
+        if channel in self._pending:
+            self.failed_count += 1 # Önceki zilin sesi hiç başlamadı
+        self._pending[channel] = {
+            "bell": label,
+            "due_ms": due_msecs,
+            "matched_ms": get_clock().now().toMSecsSinceEpoch(),
+        }
+
+    def cancel(self, channel):
+        """Zil sesi çalınamadığında bekleyen örneği başarısız sayar."""
+        if self._pending.pop(channel, None) is not None:
+            self.failed_count += 1
+            self.schedule_save()
+
+    def on_audio_started(self, channel):
+        sample = self._pending.pop(channel, None)
+        if sample is None:
+            return # Elle veya sınama için çalınan sesler ölçülmez
+        sample["started_ms"] = get_clock().now().toMSecsSinceEpoch()
+        sample["match_delay_ms"] = sample["matched_ms"] - sample["due_ms"]
+        sample["start_delay_ms"] = sample["started_ms"] - sample["matched_ms"]
+        sample["total_delay_ms"] = sample["started_ms"] - sample["due_ms"]
+        self.samples.append(sample)
+        self.schedule_save()
+        self.sampleRecorded.emit(sample)
+
+    def summary(self):
+        """Her ölçü için sayı, ortalama, yüzdelikler ve en büyük değeri döndürür."""
+        result = {}
+        for metric in METRIC_NAMES:
+            values = sorted(sample[metric] for sample in self.samples)
+            stats = {"count": len(values)}
+            if values:
+                stats["mean"] = round(sum(values) / len(values), 1)
+                for pct in PERCENTILES:
+                    stats[f"p{pct}"] = percentile(values, pct)
+                stats["max"] = values[-1]
+            result[metric] = stats
+        return result
+
+    def schedule_save(self):
+        """Ölçüm dosyasının yazılmasını erteler; aynı zilin bölgeleri ve art arda gelen ziller tek yazmada toplanır.
+        Zamanlayıcı yeniden kurulmaz, böylece sürekli çalan ziller yazmayı süresiz geciktirmez."""
+        if not self.save_timer.isActive():
+            self.save_timer.start(SAVE_DELAY_MSECS)
+
+    def flush(self):
+        """Ertelenmiş yazma varsa hemen yapar (ör. program kapanırken)."""
+        if self.save_timer.isActive():
+            self.save_timer.stop()
+            self.save_metrics_file()
+
+    def save_metrics_file(self):
+        if not self.metrics_file:
+            return
+        data = {
+            "generated_at": get_clock().now().toString("yyyy-MM-ddTHH:mm:ss"),
+            "failed_count": self.failed_count,
+            "summary": self.summary(),
+            **{name: provider() for name, provider in self.report_providers.items()},
+            "samples": list(self.samples),
+        }
+        temp_path = self.metrics_file + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.metrics_file)
+        except OSError as e:
+            log.warning("Gecikme ölçümleri kaydedilemedi: %s", e)
+
+    def _load_metrics_file(self):
+        """Önceki çalışmalardan kalan örnekleri yükler; böylece istatistikler yeniden başlatmada kaybolmaz."""
+        if not self.metrics_file or not os.path.exists(self.metrics_file):
+            return
+        try:
+            with open(self.metrics_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.samples.extend(data.get("samples", []))
+            self.failed_count = data.get("failed_count", 0)
+        except (OSError, ValueError) as e:
+            log.warning("Gecikme ölçümleri okunamadı: %s", e)
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""Zil ve sirenleri uzaktan çaldırmak için yerel HTTP/JSON denetim arayüzü.
+
+Sunucu kendi asyncio döngüsüyle ayrı bir iş parçacığında çalışır; bağlantıları ve istek ayrıştırmayı
+Qt olay döngüsünü meşgul etmeden yürütür. Komutlar çekirdeğe kuyruklu bir Qt sinyaliyle, yani
+oynatıcıların yaşadığı ana iş parçacığında çalıştırılmak üzere iletilir. Bekleyen komut sayısı ve
+her komutun bekleme süresi sınırlıdır; ana iş parçacığı yanıt vermezse istek 504 ile döner.
+
+    GET  /status                 çalma durumu, bugünün planı ve sıradaki zil
+    GET  /schedule               bugünün zil çizelgesi
+    GET  /next-bell              sıradaki zil
+    POST /bell/<zil tipi>        zili tüm bölgelerde çalar (ör. /bell/Teneff%C3%BCs)
+    POST /special/<ses>          ten_kasim, istiklal_marsi, saygi_ti, deprem, yangin
+    POST /stop                   tüm sesleri durdurur
+
+Anahtar tanımlıysa her istekte `Authorization: Bearer <anahtar>` başlığı gerekir. Her bağlantıda
+tek istek işlenir (Connection: close).
+
+Yük testi:
+
+    python3 kontrol_api.py load-test --port 8765 --clients 50 --requests 20
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import hmac
+import json
+import sys
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from ders_cizelgesi import BELL_TYPES, seconds_to_time_str
+from loglama import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+COMMAND_TIMEOUT_SECS = 2.0 # Ana iş parçacığının bir komutu çalıştırması için beklenen en uzun süre
+REQUEST_READ_TIMEOUT_SECS = 5.0
+MAX_PENDING_COMMANDS = 64 # Aşılırsa yeni istekler kuyruğa alınmadan 503 ile reddedilir
+MAX_HEADER_LINES = 64
+MAX_BODY_BYTES = 64 * 1024
+READ_CACHE_SECS = 0.2 # Eşzamanlı durum sorguları ana iş parçacığına bu süre içinde bir kez gider
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+                409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+                504: "Gateway Timeout"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def bell_entry_to_json(entry):
+    """Derlenmiş çizelge kaydını (saniye, oturum, ders, zil tipi) JSON sözlüğüne çevirir."""
+    if entry is None:
+        return None
+    second, session, lesson_key, bell_type = entry
+    return {"time": seconds_to_time_str(second), "session": session, "lesson": lesson_key, "bell_type": bell_type}
+
+
+class _MainThreadDispatcher(QObject):
+    """Başka iş parçacıklarından gelen çağrıları kendi (ana) iş parçacığında çalıştırır."""
+    _invoke = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = 0
+        self._lock = threading.Lock()
+        # Gönderen başka iş parçacığında olduğundan bağlantı kuyrukludur
+        self._invoke.connect(self._run)
+
+    def submit(self, function):
+        """Fonksiyonu ana iş parçacığı kuyruğuna ekler; sonucu taşıyan Future döndürür."""
+        with self._lock:
+            if self.pending >= MAX_PENDING_COMMANDS:
+                raise ApiError(503, "Çok fazla bekleyen komut var, daha sonra yeniden deneyin.")
+            self.pending += 1
+        future = concurrent.futures.Future()
+        self._invoke.emit((function, future, time.monotonic()))
+        return future
+
+    def _run(self, job):
+        function, future, submitted = job
+        with self._lock:
+            self.pending -= 1
+        if not future.set_running_or_notify_cancel():
+            return # İstemci zaman aşımına uğradı; komut artık çalıştırılmaz
+        queued_ms = (time.monotonic() - submitted) * 1000
+        try:
+            future.set_result((function(), queued_ms))
+        except Exception as e:
+            future.set_exception(e)
+
+
+class ControlApiServer:
+    """Çekirdeğe bağlı denetim sunucusu. start() ana iş parçacığından çağrılmalıdır."""
+
+    def __init__(self, core, port, token="", host=DEFAULT_HOST):
+        self.core = core
+        self.host = host
+        self.port = port
+        self.token = token or ""
+        self._dispatcher = None
+        self._thread = None
+        self._loop = None
+        self._stopped = None
+        self._ready = threading.Event()
+        self._start_error = None
+        self._read_cache = {}
+
+    def start(self):
+        """Sunucuyu başlatır; kapı dinlenemezse hata mesajını döndürür."""
+        self._dispatcher = _MainThreadDispatcher()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._serve()), name="kontrol-api", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error:
+            return self._start_error
+        log.info("Denetim arayüzü http://%s:%d adresinde dinleniyor.", self.host, self.port)
+        return None
+
+    def stop(self, timeout=2.0):
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        log.info("Denetim arayüzü durduruldu.")
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        except OSError as e:
+            self._start_error = f"{self.host}:{self.port} dinlenemedi: {e}"
+            self._ready.set()
+            return
+        self.port = server.sockets[0].getsockname()[1] # Kapı 0 verildiyse seçilen kapı
+        self._ready.set()
+        async with server:
+            await self._stopped.wait()
+
+    async def _handle_client(self, reader, writer):
+        status, payload = 200, None
+        try:
+            method, target, headers = await asyncio.wait_for(self._read_request(reader), REQUEST_READ_TIMEOUT_SECS)
+            payload = await self._dispatch(method, urlsplit(target).path, headers)
+        except ApiError as e:
+            status, payload = e.status, {"ok": False, "error": str(e)}
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            status, payload = 400, {"ok": False, "error": "Geçersiz veya eksik istek."}
+        except Exception as e:
+            log.exception("Denetim isteği işlenemedi")
+            status, payload = 500, {"ok": False, "error": str(e)}
+
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write((f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Error')}\r\n"
+                      "Content-Type: application/json; charset=utf-8\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Connection: close\r\n\r\n").encode("ascii") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _ = request_line.split(" ", 2)
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise ApiError(400, "Başlık sayısı sınırı aşıldı.")
+
+        content_length = int(headers.get("content-length", 0))
+        if content_length > MAX_BODY_BYTES:
+            raise ApiError(413, "İstek gövdesi çok büyük.")
+        if content_length:
+            await reader.readexactly(content_length) # Komutlar gövde kullanmaz; bağlantı için okunup atılır
+        return method.upper(), target, headers
+
+    def _check_token(self, headers):
+        if not self.token:
+            return
+        scheme, _, supplied = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.encode(), self.token.encode()):
+            raise ApiError(401, "Geçersiz anahtar")
+
+    async def _dispatch(self, method, path, headers):
+        self._check_token(headers)
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+
+        if method == "GET":
+            builders = {"status": self._status, "schedule": self._schedule, "next-bell": self._next_bell}
+            if len(parts) != 1 or parts[0] not in builders:
+                raise ApiError(404, f"Bilinmeyen adres: {path}")
+            cached = self._read_cache.get(parts[0])
+            if cached is not None and time.monotonic() - cached[0] < READ_CACHE_SECS:
+                return cached[1]
+            payload = await self._call_in_main_thread(builders[parts[0]])
+            self._read_cache[parts[0]] = (time.monotonic(), payload)
+            return payload
+
+        if method != "POST":
+            raise ApiError(405, f"Desteklenmeyen yöntem: {method}")
+        command = self._command_for(parts, path)
+        self._read_cache.clear() # Komut sonrası durum sorgusu eski sonucu görmemeli
+        return await self._call_in_main_thread(command)
+
+    def _command_for(self, parts, path):
+        from zil_cekirdegi import SPECIAL_SOUND_FILES
+
+        if parts == ["stop"]:
+            return lambda: self._run_command(lambda: self.core.stop_all_sounds(), "stop")
+        if len(parts) == 2 and parts[0] == "bell":
+            bell_type = parts[1]
+            if bell_type not in BELL_TYPES:
+                raise ApiError(404, f"Bilinmeyen zil tipi: {bell_type}")
+            return lambda: self._run_command(lambda: self.core.play_manual_bell(bell_type), bell_type)
+        if len(parts) == 2 and parts[0] == "special":
+            name = parts[1]
+            if name not in SPECIAL_SOUND_FILES:
+                raise ApiError(404, f"Bilinmeyen özel ses: {name}")
+            return lambda: self._run_command(lambda: self.core.play_special_sound(name), name)
+        raise ApiError(404, f"Bilinmeyen adres: {path}")
+
+    async def _call_in_main_thread(self, function):
+        future = self._dispatcher.submit(function)
+        try:
+            result, queued_ms = await asyncio.wait_for(asyncio.wrap_future(future), COMMAND_TIMEOUT_SECS)
+        except asyncio.TimeoutError:
+            raise ApiError(504, "Zil programı zamanında yanıt vermedi.")
+        result["queued_ms"] = round(queued_ms, 2)
+        return result
+
+    # Aşağıdakiler ana iş parçacığında çalışır
+    def _run_command(self, action, name):
+        error_message = action()
+        if error_message:
+            raise ApiError(409, error_message)
+        return {"ok": True, "command": name}
+
+    def _status(self):
+        report = self.core.status_report()
+        report["next_bell"] = bell_entry_to_json(report["next_bell"])
+        report["ok"] = True
+        return report
+
+    def _schedule(self):
+        next_index = self.core.next_bell_index
+        bells = []
+        for index, entry in enumerate(self.core.today_timeline):
+            bell = bell_entry_to_json(entry)
+            bell["passed"] = index < next_index
+            bells.append(bell)
+        report = self.core.status_report()
+        return {"ok": True, "date": report["date"], "day": report["day"], "template_day": report["template_day"],
+                "override": report["override"], "bells": bells}
+
+    def _next_bell(self):
+        return {"ok": True, "next_bell": bell_entry_to_json(self.core.next_bell())}
+
+
+# --- Yük Testi ---
+async def _timed_request(host, port, method, path, token):
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    headers = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: 0\r\n"
+    if token:
+        headers += f"Authorization: Bearer {token}\r\n"
+    writer.write((headers + "\r\n").encode("utf-8"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b" ", 2)[1])
+    return status, (time.perf_counter() - started) * 1000
+
+async def _load_test(args):
+    latencies = []
+    statuses = {}
+
+    async def client():
+        for _ in range(args.requests):
+            try:
+                status, elapsed_ms = await _timed_request(args.host, args.port, args.method, args.path, args.token)
+            except (OSError, IndexError, ValueError):
+                status, elapsed_ms = "bağlantı hatası", None
+            statuses[status] = statuses.get(status, 0) + 1
+            if elapsed_ms is not None:
+                latencies.append(elapsed_ms)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    total_secs = time.perf_counter() - started
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] if latencies else 0
+    print(f"{args.clients} istemci x {args.requests} istek: {args.method} {args.path}")
+    print(f"Süre: {total_secs:.2f} sn, {sum(statuses.values()) / total_secs:.0f} istek/sn")
+    print("Yanıtlar: " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str)))
+    print(f"Gecikme (ms): p50={percentile(50):.1f} p95={percentile(95):.1f} p99={percentile(99):.1f} en fazla={percentile(100):.1f}")
+    return 0 if set(statuses) <= {200} else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ATAM Okul Zili denetim arayüzü araçları.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    load_test = subparsers.add_parser("load-test", help="Çalışan denetim arayüzüne eşzamanlı istekler gönderir.")
+    load_test.add_argument("--host", default=DEFAULT_HOST)
+    load_test.add_argument("--port", type=int, required=True)
+    load_test.add_argument("--token", default="")
+    load_test.add_argument("--clients", type=int, default=50, help="Eşzamanlı istemci sayısı.")
+    load_test.add_argument("--requests", type=int, default=20, help="İstemci başına istek sayısı.")
+    load_test.add_argument("--method", default="GET")
+    load_test.add_argument("--path", default="/status")
+    args = parser.parse_args(argv)
+    return asyncio.run(_load_test(args))
+
+if __name__ == '__main__':
+    sys.exit(main())
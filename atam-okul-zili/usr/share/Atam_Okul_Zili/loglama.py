@@ -0,0 +1,105 @@
+"""Seviyeli ve tamponlu kayıt (log) altyapısı.
+
+Modüller `get_logger(__name__)` ile kayıtçı alır. Kayıtlar çağıranı bekletmeden bir kuyruğa
+bırakılır; konsola ve dönen (boyutu sınırlı) log dosyasına arka plandaki bir iş parçacığı yazar.
+Son kayıtlar ayrıca bellekte halka tamponda tutulur. DEBUG kapalıyken hata ayıklama çağrıları
+yalnızca bir seviye karşılaştırmasına mal olur; bu yüzden DEBUG iletileri f-string ile değil,
+%-biçimli argümanlarla verilmelidir.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from collections import deque
+
+LOGGER_NAME = "atam_okul_zili"
+LOG_FILE_NAME = "atam_okul_zili.log"
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+RING_BUFFER_SIZE = 500
+DEBUG_ENV_VAR = "ATAM_OKUL_ZILI_DEBUG"
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_root_logger = logging.getLogger(LOGGER_NAME)
+_root_logger.setLevel(logging.DEBUG if os.getenv(DEBUG_ENV_VAR) else logging.INFO)
+_root_logger.propagate = False
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+class RingBufferHandler(logging.Handler):
+    """Son kayıtları biçimlenmiş metin olarak sınırlı bir bellek tamponunda tutar."""
+
+    def __init__(self, capacity=RING_BUFFER_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(self.format(record))
+
+    def recent(self, count=None):
+        records = list(self.records)
+        return records if count is None else records[-count:]
+
+
+ring_buffer = RingBufferHandler()
+ring_buffer.setFormatter(logging.Formatter(LOG_FORMAT))
+_root_logger.addHandler(ring_buffer)
+
+
+def get_logger(name):
+    """Uygulama kayıtçısının alt kayıtçısını döndürür (ör. "atam_okul_zili.zil_cekirdegi")."""
+    return _root_logger.getChild(name)
+
+def set_debug_enabled(enabled):
+    _root_logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+
+def setup_logging(log_dir=None, debug=None, console=True):
+    """Konsol ve dönen dosya çıkışlarını arka plan iş parçacığına bağlar. Birden fazla çağrılırsa
+    yalnızca ilki etkilidir. Kurulumdan önceki kayıtlar yalnızca halka tampona düşer."""
+    global _listener, _queue_handler
+    if debug is not None:
+        set_debug_enabled(debug)
+    with _lock:
+        if _listener is not None:
+            return
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = []
+        if console:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+        if log_dir:
+            try:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    os.path.join(log_dir, LOG_FILE_NAME), maxBytes=LOG_FILE_MAX_BYTES,
+                    backupCount=LOG_FILE_BACKUP_COUNT, encoding="utf-8")
+                file_handler.setFormatter(formatter)
+                handlers.append(file_handler)
+            except OSError as e:
+                print(f"UYARI: Log dosyası açılamadı: {e}", file=sys.stderr)
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _root_logger.addHandler(_queue_handler)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Kuyruktaki kayıtları yazıp arka plan iş parçacığını durdurur."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            _root_logger.removeHandler(_queue_handler)
+            _listener.stop()
+            _listener = None
+            _queue_handler = None
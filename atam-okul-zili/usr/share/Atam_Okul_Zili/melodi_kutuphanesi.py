@@ -0,0 +1,289 @@
+"""Melodi kütüphanesi: zil olarak seçilebilecek ses dosyalarının SQLite dizini.
+
+Melodi, siren ve kullanıcı klasörlerindeki ses dosyaları ile zil olarak atanmış diğer dosyalar
+dizinde tutulur. Her kayıt süre, biçim, boyut, içerik özeti ve dosyanın sorunsuz çözülüp
+çözülmediği bilgisini taşır. Dizin arka plandaki bir iş parçacığında, yalnızca boyutu veya
+değişiklik zamanı değişen dosyalar yeniden işlenerek güncellenir. Çözülebilirlik denetimi ses
+analizi (ses_analizi) süreç havuzunda yapılır; başarılı analiz dosyanın süresini de verir.
+
+Arayüz, kayıtların bellekteki kopyasını okur; böylece zil seçimi diski beklemez ve bozuk bir
+dosya zil anında değil, atandığı anda fark edilir.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import wave
+
+from loglama import get_logger
+from ses_analizi import get_sound_analyzer
+
+log = get_logger(__name__)
+
+LIBRARY_DB_FILE_NAME = "melodi_kutuphanesi.sqlite3"
+MELODILER_BASE_PATH = "/usr/share/Atam_Okul_Zili/melodiler/"
+USER_SOUNDS_DIR_NAME = "Zil Sesleri"
+SOUND_FILE_EXTENSIONS = (".mp3", ".wav", ".ogg")
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sounds (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,           -- dizinlenen klasör; tek tek eklenen dosyalarda boş
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    codec TEXT,
+    duration_ms INTEGER,
+    decodes_ok INTEGER,             -- 1: sorunsuz, 0: bozuk/eksik, NULL: henüz denetlenmedi
+    error TEXT
+)
+"""
+COLUMNS = ("path", "folder", "size", "mtime_ns", "sha256", "codec", "duration_ms", "decodes_ok", "error")
+
+
+def sniff_codec(path):
+    """Dosya başlığından ses biçimini tahmin eder; tanınmazsa None döndürür."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(64)
+    except OSError:
+        return None
+    if header.startswith(b"ID3") or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "wav"
+    if header.startswith(b"OggS"):
+        return "opus" if b"OpusHead" in header else "vorbis"
+    if header.startswith(b"fLaC"):
+        return "flac"
+    return None
+
+def _wav_duration_ms(path):
+    try:
+        with wave.open(path, 'rb') as wav_file:
+            return wav_file.getnframes() * 1000 // wav_file.getframerate()
+    except (OSError, EOFError, RuntimeError, wave.Error): # bozuk başlıkta wave RuntimeError da fırlatabilir
+        return None
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LibraryEntry:
+    """Dizindeki bir ses dosyasının kaydı."""
+    __slots__ = COLUMNS
+
+    def __init__(self, **values):
+        for column in COLUMNS:
+            setattr(self, column, values.get(column))
+        if self.decodes_ok is not None:
+            self.decodes_ok = bool(self.decodes_ok)
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def status_text(self):
+        if self.decodes_ok is None:
+            return "Denetleniyor"
+        return "Sorunsuz" if self.decodes_ok else (self.error or "Bozuk")
+
+    def as_row(self):
+        return tuple(getattr(self, column) for column in COLUMNS)
+
+
+class _IndexWorker(threading.Thread):
+    """SQLite bağlantısına sahip tek iş parçacığı; tarama ve güncellemeleri sırayla yürütür."""
+
+    def __init__(self, db_path, on_entry, on_scan_finished):
+        super().__init__(name="melodi-kutuphanesi", daemon=True)
+        self.db_path = db_path
+        self.commands = queue.Queue()
+        self._on_entry = on_entry
+        self._on_scan_finished = on_scan_finished
+
+    def run(self):
+        try:
+            connection = sqlite3.connect(self.db_path)
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS sounds")
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.execute(SCHEMA)
+            connection.commit()
+        except sqlite3.Error as e:
+            log.error("Melodi kütüphanesi açılamadı: %s (%s)", self.db_path, e)
+            return
+
+        for row in connection.execute(f"SELECT {', '.join(COLUMNS)} FROM sounds"):
+            self._on_entry(LibraryEntry(**dict(zip(COLUMNS, row))))
+
+        while True:
+            command, args = self.commands.get()
+            if command == "stop":
+                break
+            try:
+                if command == "scan":
+                    self._scan(connection, *args)
+                elif command == "set_decode_result":
+                    self._set_decode_result(connection, *args)
+                connection.commit()
+            except Exception: # İş parçacığı düşerse dizin bir daha güncellenmez
+                log.exception("Melodi kütüphanesi güncellenemedi")
+        connection.close()
+
+    def _scan(self, connection, folders, extra_files):
+        """Klasörleri ve tek tek eklenen dosyaları tarar; yalnızca değişen dosyaları yeniden işler."""
+        known = {row[0]: row for row in connection.execute(f"SELECT {', '.join(COLUMNS)} FROM sounds")}
+        seen = set()
+        files = []
+        for folder in folders:
+            if not os.path.isdir(folder):
+                continue
+            for dir_entry in sorted(os.scandir(folder), key=lambda e: e.name):
+                if dir_entry.is_file() and dir_entry.name.lower().endswith(SOUND_FILE_EXTENSIONS):
+                    files.append((dir_entry.path, folder))
+        folder_paths = {path for path, _ in files}
+        files.extend((path, "") for path in extra_files if path and path not in folder_paths)
+        # Artık atanmamış ve diskten silinmiş tek dosyalar tam taramada kütüphaneden çıkarılır
+        dropped = {path for path, row in known.items()
+                   if folders and row[1] == "" and path not in extra_files and not os.path.exists(path)}
+        files.extend((path, "") for path, row in known.items()
+                     if row[1] == "" and path not in extra_files and path not in dropped)
+
+        unchecked = []
+        for path, folder in files:
+            if path in seen:
+                continue
+            seen.add(path)
+            entry = self._index_file(connection, path, folder, known.get(path))
+            if entry is not None:
+                self._on_entry(entry)
+            if (entry or LibraryEntry(**dict(zip(COLUMNS, known[path])))).decodes_ok is None:
+                unchecked.append(path)
+
+        # Dizinlenen klasörlerden silinmiş dosyalar kütüphaneden çıkarılır
+        scanned_folders = set(folders)
+        for path, row in known.items():
+            if (row[1] in scanned_folders and path not in seen) or path in dropped:
+                connection.execute("DELETE FROM sounds WHERE path = ?", (path,))
+                self._on_entry(LibraryEntry(path=path, folder=row[1], decodes_ok=False, error="Dosya silinmiş"))
+        self._on_scan_finished(unchecked)
+
+    def _index_file(self, connection, path, folder, row):
+        """Dosya değiştiyse kaydını yeniler ve yeni kaydı döndürür; değişmediyse None."""
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            if row is not None and row[7] == 0 and row[8] == "Dosya bulunamadı":
+                return None
+            entry = LibraryEntry(path=path, folder=folder, decodes_ok=False, error="Dosya bulunamadı")
+        else:
+            if row is not None and row[2] == stat_result.st_size and row[3] == stat_result.st_mtime_ns and row[1] == folder:
+                return None
+            codec = sniff_codec(path)
+            entry = LibraryEntry(path=path, folder=folder, size=stat_result.st_size, mtime_ns=stat_result.st_mtime_ns,
+                                 sha256=_sha256(path), codec=codec,
+                                 duration_ms=_wav_duration_ms(path) if codec == "wav" else None)
+            if codec is None:
+                entry.decodes_ok, entry.error = False, "Tanınmayan ses biçimi"
+        connection.execute(f"INSERT OR REPLACE INTO sounds ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                           entry.as_row())
+        return entry
+
+    def _set_decode_result(self, connection, path, decodes_ok, duration_ms, error):
+        connection.execute("UPDATE sounds SET decodes_ok = ?, duration_ms = COALESCE(?, duration_ms), error = ? WHERE path = ?",
+                           (int(decodes_ok), duration_ms, error, path))
+        row = connection.execute(f"SELECT {', '.join(COLUMNS)} FROM sounds WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            self._on_entry(LibraryEntry(**dict(zip(COLUMNS, row))))
+
+
+class MelodyLibrary(QObject):
+    """Ses dosyası dizini. Kayıtların bellekteki kopyası ana iş parçacığında tutulur."""
+    entryChanged = pyqtSignal(str) # dosya yolu
+    scanFinished = pyqtSignal()
+    _entryReceived = pyqtSignal(object) # iş parçacığından kuyruklu gelir
+    _scanCompleted = pyqtSignal(object)
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.entries = {} # yol -> LibraryEntry
+        self.folders = []
+        self._entryReceived.connect(self._on_entry_received)
+        self._scanCompleted.connect(self._on_scan_completed)
+        self._analyzer = get_sound_analyzer()
+        self._analyzer.analysisReady.connect(self._on_analysis_ready)
+        self._analyzer.analysisFailed.connect(self._on_analysis_failed)
+        # İş parçacığı ilk taramada başlar; dizinin okunması program açılışını geciktirmez
+        self._worker = _IndexWorker(db_path, self._entryReceived.emit, self._scanCompleted.emit)
+
+    def refresh(self, folders, extra_files=()):
+        """Klasörleri ve ek dosyaları arka planda yeniden tarar."""
+        self.folders = [folder for folder in folders if folder]
+        self._send("scan", list(self.folders), sorted(set(extra_files)))
+
+    def add_file(self, path):
+        """Klasörler dışındaki bir dosyayı dizine ekletir."""
+        self._send("scan", [], [path])
+
+    def stop(self):
+        if self._worker.is_alive():
+            self._worker.commands.put(("stop", ()))
+
+    def _send(self, command, *args):
+        if self._worker.ident is None: # Henüz başlatılmadı
+            self._worker.start()
+        self._worker.commands.put((command, args))
+
+    def entry(self, path):
+        return self.entries.get(path)
+
+    def sorted_entries(self):
+        return sorted(self.entries.values(), key=lambda entry: (entry.folder == "", entry.folder, entry.name.lower()))
+
+    def problem_for(self, path):
+        """Atanan ses dosyasının bilinen sorununu, sorun yoksa veya henüz denetlenmediyse None döndürür."""
+        if not path:
+            return None
+        if not os.path.exists(path):
+            return "Dosya bulunamadı"
+        entry = self.entries.get(path)
+        if entry is not None and entry.decodes_ok is False:
+            return entry.error or "Ses dosyası çözülemiyor"
+        return None
+
+    def _on_entry_received(self, entry):
+        if entry.error == "Dosya silinmiş":
+            self.entries.pop(entry.path, None)
+        else:
+            self.entries[entry.path] = entry
+        self.entryChanged.emit(entry.path)
+
+    def _on_scan_completed(self, unchecked_paths):
+        for path in unchecked_paths:
+            if self._analyzer.result_for(path) is not None:
+                self._on_analysis_ready(path)
+            elif self._analyzer.failure_for(path) is not None:
+                self._on_analysis_failed(path, self._analyzer.failure_for(path))
+        if self._analyzer.available:
+            self._analyzer.analyze(unchecked_paths)
+        self.scanFinished.emit()
+
+    def _on_analysis_ready(self, path):
+        entry = self.entries.get(path)
+        if entry is not None and entry.decodes_ok is not True:
+            result = self._analyzer.result_for(path)
+            self._send("set_decode_result", path, True, result.get("duration_ms") if result else None, None)
+
+    def _on_analysis_failed(self, path, message):
+        if path in self.entries:
+            self._send("set_decode_result", path, False, None, f"Çözülemiyor: {message}")
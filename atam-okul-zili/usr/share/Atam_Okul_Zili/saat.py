@@ -0,0 +1,48 @@
+"""Değiştirilebilir saat.
+
+Zamanlama kodu şimdiki anı doğrudan QDateTime.currentDateTime() yerine get_clock().now() ile okur.
+Varsayılan saat sistem saatidir. Benzetimde (zil_benzetimi) elle ilerletilen bir saat takılarak
+günler ve haftalar gerçek zamanda beklemeden oynatılabilir.
+"""
+
+from PyQt5.QtCore import QDateTime
+
+
+class SystemClock:
+    """Sistem saati."""
+
+    def now(self):
+        return QDateTime.currentDateTime()
+
+
+class ManualClock:
+    """Yalnızca set() ve advance() ile ilerleyen saat.
+
+    Zaman, başlangıç anındaki UTC farkıyla sabit farklı olarak tutulur: yaz saati geçişleri
+    uygulanmaz, buna karşılık yerel saat hesabı yapılmadığı için ilerletmek çok daha hızlıdır.
+    """
+
+    def __init__(self, start):
+        self._offset_secs = start.offsetFromUtc()
+        self.set(start)
+
+    def now(self):
+        return QDateTime(self._now)
+
+    def set(self, current_datetime):
+        self._now = current_datetime.toOffsetFromUtc(self._offset_secs)
+
+    def advance(self, secs):
+        self._now = self._now.addSecs(secs)
+
+
+_clock = SystemClock()
+
+def get_clock():
+    """Şimdiki anın okunduğu saati döndürür."""
+    return _clock
+
+def set_clock(clock):
+    """Saati değiştirir; None verilirse sistem saatine dönülür."""
+    global _clock
+    _clock = clock if clock is not None else SystemClock()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""Ses dosyalarının ses yüksekliği ve sessizlik analizi.
+
+Melodi ve siren dosyalarının ses yükseklikleri birbirinden çok farklıdır; çoğunun başında birkaç
+saniyelik sessizlik vardır ve bu sessizlik zilin duyulmasını doğrudan geciktirir. Her dosya bir kez
+PCM'e çözülür ve NumPy ile vektörel olarak şunlar ölçülür: tepe ve RMS düzeyi, ITU-R BS.1770'e
+benzer K-ağırlıklı ve kapılı ses yüksekliği (LUFS) ile baştaki ve sondaki sessizlik. Dosyalar ayrı
+süreçlerde paralel analiz edilir. Sonuçlar içerik özetine (SHA-256) göre diskte saklanır; aynı ses
+başka bir yolda (ör. ağdan dağıtılan kopya) yeniden analiz edilmez.
+
+Çalma katmanı sonuçtan bir kazanç ve başlangıç ofseti türetir (playback_adjustment).
+Toplu analiz için:
+
+    python3 /usr/share/Atam_Okul_Zili/ses_analizi.py /usr/share/Atam_Okul_Zili/melodiler
+"""
+
+import sys
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import argparse
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import wave
+
+from loglama import get_logger
+from veri_deposu import write_file_atomic
+
+try:
+    import numpy as np
+except ImportError: # Analiz kapalı kalır; sesler olduğu gibi çalınır
+    np = None
+
+log = get_logger(__name__)
+
+ANALYSIS_VERSION = 1 # Ölçüm yöntemi değişince artırılır; eski sonuçlar yeniden hesaplanır
+ANALYSIS_CACHE_FILE_NAME = "ses_analizi.json"
+DEFAULT_ANALYSIS_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+SAVE_DEBOUNCE_MSECS = 1000
+DECODE_TIMEOUT_MSECS = 60000
+SAMPLE_RATE = 44100
+
+TARGET_LOUDNESS_LUFS = -16.0 # Tüm sesler bu yüksekliğe getirilir
+MAX_PEAK_DBFS = -1.0 # Kazanç tepe düzeyini bunun üzerine çıkaramaz
+MAX_GAIN_DB = 12.0 # Çok kısık dosyalarda gürültünün aşırı yükseltilmesini önler
+SILENCE_THRESHOLD_DBFS = -50.0
+SILENCE_FRAME_MS = 10
+MAX_START_OFFSET_MS = 10000 # Bundan uzun sessizlik kasıtlı sayılır, atlanmaz
+
+# ITU-R BS.1770 K-ağırlıklama süzgeçlerinin analog parametreleri (örnekleme hızından bağımsız)
+_SHELF_GAIN_DB, _SHELF_FREQ, _SHELF_Q = 3.999843853973347, 1681.974450955533, 0.7071752369554196
+_HIGHPASS_FREQ, _HIGHPASS_Q = 38.13547087602444, 0.5003270373238773
+_GATE_BLOCK_MS, _GATE_STEP_MS = 400, 100
+_ABSOLUTE_GATE_LUFS, _RELATIVE_GATE_LU = -70.0, -10.0
+
+_worker_app = None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _to_db(value):
+    return 20 * math.log10(value) if value > 0 else float("-inf")
+
+
+# --- Çözme ---
+def decode_pcm(path):
+    """Dosyayı (örnek sayısı, kanal) biçiminde int16 NumPy dizisine çözer; (dizi, örnekleme hızı) döndürür.
+    WAV dosyaları doğrudan okunur, diğer biçimler QAudioDecoder ile 44.1 kHz stereo PCM'e çözülür."""
+    if path.lower().endswith(".wav"):
+        samples = _decode_wav(path)
+        if samples is not None:
+            return samples
+    return _decode_with_qt(path)
+
+def _decode_wav(path):
+    with wave.open(path, 'rb') as wav_file:
+        channels, sample_width, sample_rate = wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()
+        raw = wav_file.readframes(wav_file.getnframes())
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, np.uint8).astype(np.int16) - 128) << 8
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, "<i2")
+    elif sample_width == 4:
+        samples = (np.frombuffer(raw, "<i4") >> 16).astype(np.int16)
+    else:
+        return None # 24 bit gibi biçimler Qt ile çözülür
+    return samples.reshape(-1, channels), sample_rate
+
+def _decode_with_qt(path):
+    from PyQt5.QtCore import QCoreApplication, QEventLoop
+    from PyQt5.QtMultimedia import QAudioDecoder
+    from ses_oynatici import pcm_format
+
+    global _worker_app
+    if QCoreApplication.instance() is None:
+        _worker_app = QCoreApplication([]) # Çalışan süreçte olay döngüsü için uygulama nesnesi yoktur
+    loop = QEventLoop()
+    chunks = []
+    errors = []
+    decoder = QAudioDecoder()
+    decoder.setAudioFormat(pcm_format())
+    decoder.setSourceFilename(path)
+
+    def read_buffer():
+        audio_buffer = decoder.read()
+        if audio_buffer.isValid():
+            chunks.append(audio_buffer.constData().asstring(audio_buffer.byteCount()))
+
+    def fail(_=None):
+        errors.append(decoder.errorString() or "zaman aşımı")
+        loop.quit()
+
+    decoder.bufferReady.connect(read_buffer)
+    decoder.finished.connect(loop.quit)
+    decoder.error.connect(fail)
+    QTimer.singleShot(DECODE_TIMEOUT_MSECS, fail)
+    decoder.start()
+    loop.exec_()
+    decoder.stop()
+    if errors:
+        raise RuntimeError(f"{path} çözülemedi: {errors[0]}")
+    return np.frombuffer(b"".join(chunks), "<i2").reshape(-1, 2), SAMPLE_RATE
+
+
+# --- Ölçüm ---
+def _k_weighting_power_response(frequencies, sample_rate):
+    """K-ağırlıklama süzgeç zincirinin verilen frekanslardaki güç kazancı (|H|²)."""
+    z = np.exp(-1j * 2 * np.pi * frequencies / sample_rate) # z⁻¹
+
+    w0 = 2 * np.pi * _SHELF_FREQ / sample_rate
+    a = 10 ** (_SHELF_GAIN_DB / 40)
+    alpha = np.sin(w0) / (2 * _SHELF_Q)
+    cos_w0, sqrt_a = np.cos(w0), np.sqrt(a)
+    shelf = ((a * ((a + 1) + (a - 1) * cos_w0 + 2 * sqrt_a * alpha)
+              - 2 * a * ((a - 1) + (a + 1) * cos_w0) * z
+              + a * ((a + 1) + (a - 1) * cos_w0 - 2 * sqrt_a * alpha) * z ** 2)
+             / (((a + 1) - (a - 1) * cos_w0 + 2 * sqrt_a * alpha)
+                + 2 * ((a - 1) - (a + 1) * cos_w0) * z
+                + ((a + 1) - (a - 1) * cos_w0 - 2 * sqrt_a * alpha) * z ** 2))
+
+    w0 = 2 * np.pi * _HIGHPASS_FREQ / sample_rate
+    alpha = np.sin(w0) / (2 * _HIGHPASS_Q)
+    cos_w0 = np.cos(w0)
+    highpass = (((1 + cos_w0) / 2 - (1 + cos_w0) * z + (1 + cos_w0) / 2 * z ** 2)
+                / ((1 + alpha) - 2 * cos_w0 * z + (1 - alpha) * z ** 2))
+    return np.abs(shelf * highpass) ** 2
+
+def _integrated_loudness(x, sample_rate):
+    """Kapılı K-ağırlıklı ses yüksekliği (LUFS). 100 ms'lik alt blokların K-ağırlıklı enerjisi
+    FFT ve Parseval eşitliğiyle hesaplanır; 400 ms'lik örtüşen bloklar dört alt bloğun ortalamasıdır."""
+    step = sample_rate * _GATE_STEP_MS // 1000
+    sub_block_count = len(x) // step
+    blocks_per_gate = _GATE_BLOCK_MS // _GATE_STEP_MS
+    if sub_block_count < blocks_per_gate:
+        return float("-inf")
+
+    power_response = _k_weighting_power_response(np.fft.rfftfreq(step, 1 / sample_rate), sample_rate)
+    bin_weights = np.full(len(power_response), 2.0) # Tek taraflı spektrumda iç kutuplar iki kez sayılır
+    bin_weights[0] = 1.0
+    if step % 2 == 0:
+        bin_weights[-1] = 1.0
+    bin_weights *= power_response / step ** 2
+
+    sub_block_energy = np.empty((sub_block_count, x.shape[1]))
+    chunk = 600 # Bellek kullanımını sınırlamak için alt bloklar dakikalık parçalarla işlenir
+    for start in range(0, sub_block_count, chunk):
+        end = min(start + chunk, sub_block_count)
+        frames = x[start * step:end * step].reshape(end - start, step, x.shape[1])
+        spectrum = np.fft.rfft(frames, axis=1)
+        sub_block_energy[start:end] = np.einsum("bfc,f->bc", np.abs(spectrum) ** 2, bin_weights)
+
+    cumulative = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(sub_block_energy, axis=0)])
+    block_energy = (cumulative[blocks_per_gate:] - cumulative[:-blocks_per_gate]) / blocks_per_gate
+    block_power = block_energy.sum(axis=1) # Sol/sağ kanal ağırlıkları 1'dir
+    with np.errstate(divide="ignore"):
+        block_loudness = -0.691 + 10 * np.log10(block_power)
+
+    gated = block_loudness > _ABSOLUTE_GATE_LUFS
+    if not gated.any():
+        return float("-inf")
+    relative_gate = -0.691 + 10 * np.log10(block_power[gated].mean()) + _RELATIVE_GATE_LU
+    gated &= block_loudness > relative_gate
+    return float(-0.691 + 10 * np.log10(block_power[gated].mean()))
+
+def _silence_bounds_ms(x, sample_rate):
+    """Eşiği aşan ilk ve son çerçevenin başlangıç ve bitişini ms olarak döndürür; ses tamamen sessizse None."""
+    frame = sample_rate * SILENCE_FRAME_MS // 1000
+    frame_count = len(x) // frame
+    if frame_count == 0:
+        return None
+    frame_peaks = np.abs(x[:frame_count * frame]).reshape(frame_count, -1).max(axis=1)
+    loud = np.flatnonzero(frame_peaks > 10 ** (SILENCE_THRESHOLD_DBFS / 20))
+    if len(loud) == 0:
+        return None
+    return int(loud[0]) * SILENCE_FRAME_MS, (int(loud[-1]) + 1) * SILENCE_FRAME_MS
+
+def measure_samples(samples, sample_rate):
+    """int16 örneklerden ses düzeyi ölçümlerini hesaplar."""
+    x = samples.astype(np.float32) / 32768.0
+    duration_ms = len(x) * 1000 // sample_rate
+    if len(x) == 0:
+        return {"duration_ms": 0, "peak_dbfs": None, "rms_dbfs": None, "loudness_lufs": None,
+                "leading_silence_ms": 0, "trailing_silence_ms": 0}
+
+    peak_dbfs = _to_db(float(np.abs(x).max()))
+    rms_dbfs = _to_db(float(np.sqrt(np.mean(np.square(x, dtype=np.float64)))))
+    loudness = _integrated_loudness(x, sample_rate)
+    bounds = _silence_bounds_ms(x, sample_rate)
+    leading_ms, trailing_ms = (bounds[0], max(0, duration_ms - bounds[1])) if bounds else (duration_ms, 0)
+
+    def finite(value):
+        return round(value, 2) if math.isfinite(value) else None # Tamamen sessiz dosya
+
+    return {
+        "duration_ms": duration_ms,
+        "peak_dbfs": finite(peak_dbfs),
+        "rms_dbfs": finite(rms_dbfs),
+        "loudness_lufs": finite(loudness),
+        "leading_silence_ms": leading_ms,
+        "trailing_silence_ms": trailing_ms,
+    }
+
+def analyze_file(path, known_sha256=()):
+    """Dosyayı çözüp ölçer. Süreç havuzunda çalışır; sonuç içerik özetini de taşır.
+    İçeriği daha önce analiz edilmişse çözmeden yalnızca özeti döndürür."""
+    sha256 = file_sha256(path)
+    if sha256 in known_sha256:
+        return {"sha256": sha256}
+    samples, sample_rate = decode_pcm(path)
+    result = measure_samples(samples, sample_rate)
+    result["sha256"] = sha256
+    result["version"] = ANALYSIS_VERSION
+    return result
+
+def playback_adjustment(result):
+    """Analiz sonucundan (kazanç dB, başlangıç ofseti ms) türetir. Kazanç hedef yüksekliğe göre
+    hesaplanır ve tepe düzeyini MAX_PEAK_DBFS üzerine çıkarmayacak şekilde sınırlanır."""
+    if not result:
+        return 0.0, 0
+    gain_db = 0.0
+    if result.get("loudness_lufs") is not None:
+        gain_db = min(TARGET_LOUDNESS_LUFS - result["loudness_lufs"], MAX_GAIN_DB)
+        if result.get("peak_dbfs") is not None:
+            gain_db = min(gain_db, MAX_PEAK_DBFS - result["peak_dbfs"])
+    offset_ms = result.get("leading_silence_ms", 0)
+    if offset_ms > MAX_START_OFFSET_MS or offset_ms >= result.get("duration_ms", 0):
+        offset_ms = 0
+    return round(gain_db, 2), offset_ms
+
+
+# --- Önbellek ---
+def _file_signature(path):
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+
+class AnalysisCache:
+    """Analiz sonuçlarını içerik özetine göre, dosya yolu → özet eşlemesini imzaya göre saklar."""
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.files = {} # yol -> {"signature": [mtime_ns, boyut], "sha256": özet}
+        self.results = {} # özet -> ölçümler
+        self.dirty = False
+        if file_path:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning("Ses analizi önbelleği okunamadı: %s", e)
+            return
+        self.files = data.get("files", {})
+        self.results = {sha: result for sha, result in data.get("results", {}).items()
+                        if result.get("version") == ANALYSIS_VERSION}
+
+    def save(self):
+        if not self.file_path or not self.dirty:
+            return
+        try:
+            write_file_atomic(self.file_path, json.dumps({"files": self.files, "results": self.results},
+                                                         ensure_ascii=False, indent=1))
+            self.dirty = False
+        except OSError as e:
+            log.warning("Ses analizi önbelleği yazılamadı: %s", e)
+
+    def lookup(self, path):
+        """Dosya değişmediyse analiz sonucunu döndürür, aksi halde None."""
+        known = self.files.get(path)
+        if known is None or known["signature"] != _file_signature(path):
+            return None
+        return self.results.get(known["sha256"])
+
+    def store(self, path, signature, result):
+        """Sonucu kaydeder; yalnızca özet taşıyan sonuç, aynı içeriğin kayıtlı ölçümlerine bağlanır."""
+        self.files[path] = {"signature": signature, "sha256": result["sha256"]}
+        self.results.setdefault(result["sha256"], result)
+        self.dirty = True
+
+
+def _process_pool(max_workers):
+    # Qt iş parçacıkları çalışırken fork güvenli olmadığı için süreçler sıfırdan başlatılır.
+    # Havuz süreçleri program kapanırken beklenmeden sonlandırılır.
+    return multiprocessing.get_context("spawn").Pool(max_workers)
+
+
+class SoundAnalyzer(QObject):
+    """Analiz edilmemiş dosyaları süreç havuzuna gönderir, sonuçları önbelleğe yazar ve bildirir.
+    Havuz yalnızca bekleyen iş varken açık tutulur."""
+    analysisReady = pyqtSignal(str) # dosya yolu
+    analysisFailed = pyqtSignal(str, str) # dosya yolu, hata
+    _jobFinished = pyqtSignal(str, object, object) # yol, imza, sonuç ya da istisna; havuz iş parçacığından kuyruklu gelir
+
+    def __init__(self, cache_file=None, max_workers=DEFAULT_ANALYSIS_WORKERS, parent=None):
+        super().__init__(parent)
+        self.cache = AnalysisCache(cache_file)
+        self.max_workers = max_workers
+        self._pool = None
+        self._in_flight = set()
+        self._failed = {} # yol -> (imza, hata); değişmedikçe yeniden denenmez
+        self._jobFinished.connect(self._on_job_finished)
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.timeout.connect(self.cache.save)
+
+    @property
+    def available(self):
+        return np is not None
+
+    def set_cache_file(self, cache_file):
+        if cache_file != self.cache.file_path:
+            self.cache = AnalysisCache(cache_file)
+            self._save_timer.timeout.disconnect()
+            self._save_timer.timeout.connect(self.cache.save)
+
+    def result_for(self, path):
+        return self.cache.lookup(path) if path else None
+
+    def failure_for(self, path):
+        """Dosya değişmediyse son analiz hatasını döndürür."""
+        failure = self._failed.get(path)
+        if failure is not None and failure[0] == _file_signature(path):
+            return failure[1]
+        return None
+
+    def analyze(self, paths):
+        """Sonucu olmayan dosyaları arka planda analiz ettirir."""
+        if not self.available:
+            return
+        for path in paths:
+            if not path or path in self._in_flight or self.result_for(path) is not None:
+                continue
+            signature = _file_signature(path)
+            if signature is None or self._failed.get(path, (None,))[0] == signature:
+                continue
+            if self._pool is None:
+                self._pool = _process_pool(self.max_workers)
+            self._in_flight.add(path)
+            self._pool.apply_async(analyze_file, (path, frozenset(self.cache.results)),
+                                   callback=lambda r, p=path, s=signature: self._jobFinished.emit(p, s, r),
+                                   error_callback=lambda e, p=path, s=signature: self._jobFinished.emit(p, s, e))
+
+    def _on_job_finished(self, path, signature, result):
+        self._in_flight.discard(path)
+        if not self._in_flight and self._pool is not None:
+            self._pool.close() # Boşta süreç bırakılmaz; sonraki analizde havuz yeniden açılır
+            self._pool = None
+        if isinstance(result, Exception):
+            self._failed[path] = (signature, str(result) or type(result).__name__)
+            log.warning("Ses analiz edilemedi: %s (%s)", path, result)
+            self.analysisFailed.emit(path, self._failed[path][1])
+            return
+        self.cache.store(path, signature, result)
+        self._save_timer.start(SAVE_DEBOUNCE_MSECS)
+        log.debug("Ses analiz edildi: %s %s", path, result)
+        self.analysisReady.emit(path)
+
+    def flush(self):
+        self._save_timer.stop()
+        self.cache.save()
+
+    def shutdown(self):
+        self.flush()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+            self._in_flight.clear()
+
+
+_sound_analyzer = None
+
+def get_sound_analyzer():
+    """Paylaşılan ses analizcisini döndürür, ilk çağrıda oluşturur."""
+    global _sound_analyzer
+    if _sound_analyzer is None:
+        _sound_analyzer = SoundAnalyzer()
+    return _sound_analyzer
+
+
+# --- Komut Satırı ---
+def main(argv=None):
+    from ses_oynatici import list_sound_files
+
+    parser = argparse.ArgumentParser(description="Ses dosyalarının ses yüksekliğini ve baştaki sessizliği analiz eder.")
+    parser.add_argument("paths", nargs="+", help="Ses dosyaları veya dizinleri.")
+    parser.add_argument("--cache", help="Sonuçların saklanacağı önbellek dosyası.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_ANALYSIS_WORKERS, help="Paralel süreç sayısı.")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("HATA: Analiz için NumPy gereklidir (python3-numpy).", file=sys.stderr)
+        return 1
+
+    files = []
+    for path in args.paths:
+        files.extend(list_sound_files(path) if os.path.isdir(path) else [path])
+    cache = AnalysisCache(args.cache)
+    pending = [path for path in files if cache.lookup(path) is None]
+
+    failures = 0
+    if pending:
+        with _process_pool(args.workers) as pool:
+            known_sha256 = frozenset(cache.results)
+            jobs = [(path, pool.apply_async(analyze_file, (path, known_sha256))) for path in pending]
+            for path, job in jobs:
+                try:
+                    cache.store(path, _file_signature(path), job.get())
+                except Exception as e:
+                    failures += 1
+                    print(f"UYARI: {path} analiz edilemedi: {e}", file=sys.stderr)
+        cache.save()
+
+    def fmt(value, suffix=""):
+        return "-" if value is None else f"{value:.1f}{suffix}"
+
+    print(f"{'Dosya':40} {'Tepe':>8} {'RMS':>8} {'LUFS':>8} {'Baş ses.':>9} {'Kazanç':>8}")
+    for path in files:
+        result = cache.lookup(path)
+        if result is None:
+            continue
+        gain_db, offset_ms = playback_adjustment(result)
+        print(f"{os.path.basename(path)[:40]:40} {fmt(result['peak_dbfs']):>8} {fmt(result['rms_dbfs']):>8} "
+              f"{fmt(result['loudness_lufs']):>8} {offset_ms:>7}ms {gain_db:>+7.1f}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,834 @@
+"""ATAM Okul Zili ses çalma katmanı.
+
+Zil ve siren sesleri arka planda bir kez PCM'e çözülüp bellekte tutulur; böylece zil anında
+dosya açıp MP3 çözmek gerekmez ve ses neredeyse gecikmesiz başlar. Önbellekte olmayan sesler
+eskisi gibi QMediaPlayer ile diskten çalınır.
+
+Sesler bölgelere (ör. ana bina, ek bina, spor salonu) ayrılmış çıkışlardan çalınır. Her bölgenin
+kendi oynatıcı havuzu ve çıkış aygıtı vardır; bölgeler birbirini beklemeden aynı anda çalabilir.
+Aygıt yerine "null" ya da "file:<yol>" verilen bölgeler sesi donanıma göndermez, yalnızca kaydeder.
+
+Her ses arka planda analiz edilir (ses_analizi); sonuç hazır olduğunda ses ortak yüksekliğe getirilir
+ve baştaki sessizlik atlanarak çalınır.
+
+Kanallara en uzun çalma süresi verilebilir (ör. zil olarak atanmış şarkılar). Böyle bir kanalın sesi
+yalnızca bu süre kadar çözülür ve süre dolmadan önce kısılarak durdurulur.
+"""
+
+from PyQt5.QtCore import (QObject, QBuffer, QByteArray, QIODevice, QUrl, QTimer, QElapsedTimer, Qt,
+                          pyqtSignal)
+from PyQt5.QtMultimedia import (QMediaPlayer, QMediaContent, QAudioDecoder, QAudioFormat,
+                                QAudioOutput, QAudio, QAudioDeviceInfo)
+
+import json
+import os
+from collections import OrderedDict, deque
+
+from loglama import get_logger
+from saat import get_clock
+from ses_analizi import get_sound_analyzer, playback_adjustment, np, MAX_START_OFFSET_MS
+
+log = get_logger(__name__)
+
+SOUND_FILE_EXTENSIONS = (".mp3", ".wav", ".ogg")
+DEFAULT_CACHE_BYTES = 96 * 1024 * 1024 # 44.1 kHz stereo 16 bit için yaklaşık 9 dakikalık ses
+DEFAULT_DECODE_WORKERS = 2
+
+DEFAULT_ZONE = "Varsayılan" # Bölge tanımlanmamış kurulumlarda tüm sesler buradan çalar
+ALL_ZONES = "*" # Özel durum sesleri (siren, marş) tüm bölgelerde çalar
+DEFAULT_DEVICE = "" # Sistemin varsayılan ses çıkışı
+NULL_DEVICE = "null"
+FILE_DEVICE_PREFIX = "file:"
+VIRTUAL_SINK_HISTORY = 1000
+FADE_OUT_MSECS = 3000 # Süresi sınırlı sesler, süre dolmadan bu kadar önce kısılmaya başlar
+FADE_STEP_MSECS = 50
+
+
+def pcm_format():
+    """Önbellekteki tüm seslerin çözüldüğü ortak PCM biçimi."""
+    audio_format = QAudioFormat()
+    audio_format.setSampleRate(44100)
+    audio_format.setChannelCount(2)
+    audio_format.setSampleSize(16)
+    audio_format.setCodec("audio/pcm")
+    audio_format.setByteOrder(QAudioFormat.LittleEndian)
+    audio_format.setSampleType(QAudioFormat.SignedInt)
+    return audio_format
+
+def list_sound_files(directory):
+    """Dizindeki ses dosyalarının tam yollarını ada göre sıralı döndürür."""
+    if not directory or not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(SOUND_FILE_EXTENSIONS)]
+
+def available_output_devices():
+    """Sistemdeki ses çıkış aygıtlarının adlarını döndürür."""
+    return [device.deviceName() for device in QAudioDeviceInfo.availableDevices(QAudio.AudioOutput)]
+
+def zone_channel_name(zone, channel):
+    """Bölgedeki kanalın sinyallerde ve gecikme ölçümünde kullanılan adı."""
+    return channel if zone == DEFAULT_ZONE else f"{zone}/{channel}"
+
+def is_virtual_device(device):
+    return device == NULL_DEVICE or device.startswith(FILE_DEVICE_PREFIX)
+
+def _file_signature(path):
+    """Önbellek geçerliliği için dosyanın (değişiklik zamanı, boyut) bilgisini döndürür."""
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+class DecodedSound:
+    """Bellekte tutulan, çözülmüş bir ses dosyası.
+
+    Analiz sonucu uygulandıysa çalma baştaki sessizliğin bittiği start_offset_bytes konumundan
+    başlar; kısma çıkışın volume değeriyle yapılır, yükseltme ise veriye bir kez uygulanır.
+    complete False ise dosyanın yalnızca baştaki bir bölümü çözülmüştür.
+    """
+    __slots__ = ("path", "signature", "audio_format", "data", "start_offset_bytes", "volume", "adjusted", "complete")
+
+    def __init__(self, path, signature, audio_format, data, start_offset_bytes=0, volume=1.0, adjusted=False,
+                 complete=True):
+        self.path = path
+        self.signature = signature
+        self.audio_format = audio_format
+        self.data = data # QByteArray; QBuffer'a kopyalanmadan verilir
+        self.start_offset_bytes = start_offset_bytes
+        self.volume = volume
+        self.adjusted = adjusted
+        self.complete = complete
+
+    @property
+    def duration_ms(self):
+        return self.audio_format.durationForBytes(self.data.size()) // 1000
+
+    @property
+    def playback_duration_ms(self):
+        return self.audio_format.durationForBytes(self.data.size() - self.start_offset_bytes) // 1000
+
+    def covers(self, max_duration_ms):
+        """Çözülen bölüm, en fazla max_duration_ms (None: sınırsız) çalmaya yetiyorsa True döndürür."""
+        return self.complete or (max_duration_ms is not None and self.playback_duration_ms >= max_duration_ms)
+
+
+def adjusted_sound(sound, result):
+    """Analiz sonucundaki kazanç ve başlangıç ofsetini uygulanmış yeni bir DecodedSound döndürür."""
+    gain_db, offset_ms = playback_adjustment(result)
+    data, volume = sound.data, 10 ** (gain_db / 20)
+    if volume > 1.0 and np is not None:
+        # Çıkış seviyesi 1'in üzerine çıkarılamadığı için yükseltme örneklere uygulanır
+        samples = np.frombuffer(bytes(data), "<i2").astype(np.float32) * volume
+        data = QByteArray(np.clip(np.rint(samples), -32768, 32767).astype("<i2").tobytes())
+    volume = min(volume, 1.0)
+    offset_bytes = min(sound.audio_format.bytesForDuration(offset_ms * 1000), data.size())
+    return DecodedSound(sound.path, sound.signature, sound.audio_format, data, offset_bytes, volume, adjusted=True,
+                        complete=sound.complete)
+
+
+class PcmSoundCache(QObject):
+    """Ses dosyalarını arka planda PCM'e çözen ve boyutu sınırlı bir LRU önbellekte tutan sınıf.
+
+    Dosyanın yolu veya değişiklik zamanı/boyutu değişirse kayıt geçersiz sayılır ve yeniden çözülür.
+    Yalnızca süresi sınırlı kanallarca istenen dosyaların baştaki gereken bölümü çözülür.
+    """
+    soundReady = pyqtSignal(str) # dosya yolu
+    decodeFailed = pyqtSignal(str, str) # dosya yolu, hata mesajı
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, max_workers=DEFAULT_DECODE_WORKERS, parent=None):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self._entries = OrderedDict() # yol -> DecodedSound, en son kullanılan sonda
+        self._total_bytes = 0
+        self._pinned = set() # Zil sesleri; siren sesleri yüzünden önbellekten atılmaz
+        self._uncacheable = {} # yol -> imza; bütçeye sığmayan veya çözülemeyen dosyalar
+        self._queue = deque()
+        self._active_jobs = {} # yol -> çözme işi
+        self._decode_limits = {} # yol -> çözülecek en uzun çalma süresi (ms); None tamamını çözer
+        self._analyzer = None
+
+    def attach_analyzer(self, analyzer):
+        """Çözülen sesleri analiz ettirir; sonucu gelen kayıtlar ayarlanmış haliyle değiştirilir."""
+        self._analyzer = analyzer
+        analyzer.analysisReady.connect(self._on_analysis_ready)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, path):
+        """Geçerli önbellek kaydını döndürür. Kayıt yoksa veya dosya değiştiyse None döner."""
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        if _file_signature(path) != entry.signature:
+            self._drop(path)
+            self.request(path, pin=path in self._pinned)
+            return None
+        self._entries.move_to_end(path)
+        return entry
+
+    def request(self, path, pin=False, max_duration_ms=None):
+        """Dosyanın arka planda çözülmesini sıraya alır. Zaten geçerliyse bir şey yapmaz.
+        max_duration_ms verilirse dosyanın yalnızca bu kadar çalmaya yetecek bölümü çözülür."""
+        if not path:
+            return
+        if pin:
+            self._pinned.add(path)
+        # Aynı dosyayı isteyen kanallardan en uzun süreye ihtiyaç duyanınki geçerlidir
+        if path not in self._decode_limits:
+            self._decode_limits[path] = max_duration_ms
+        elif self._decode_limits[path] is not None:
+            self._decode_limits[path] = None if max_duration_ms is None else max(self._decode_limits[path], max_duration_ms)
+        signature = _file_signature(path)
+        if signature is None or path in self._active_jobs or path in self._queue:
+            return
+        if self._uncacheable.get(path) == signature:
+            return
+        entry = self._entries.get(path)
+        if entry is not None and entry.signature == signature and entry.covers(self._decode_limits[path]):
+            return
+        if self._analyzer is not None:
+            self._analyzer.analyze([path])
+        self._queue.append(path)
+        self._start_next_decodes()
+
+    def is_pending(self, path):
+        """Dosya çözülmek üzere sırada bekliyor veya çözülüyorsa True döndürür."""
+        return path in self._active_jobs or path in self._queue
+
+    def unpin_all(self):
+        """Sabitlemeleri ve çözme süresi sınırlarını bırakır; ön yükleme bunları yeniden kurar."""
+        self._pinned.clear()
+        self._decode_limits.clear()
+
+    def _start_next_decodes(self):
+        while self._queue and len(self._active_jobs) < self.max_workers:
+            path = self._queue.popleft()
+            decoder = QAudioDecoder(self)
+            decoder.setAudioFormat(pcm_format())
+            decoder.setSourceFilename(path)
+            limit_ms = self._decode_limits.get(path)
+            self._active_jobs[path] = {
+                "decoder": decoder,
+                "signature": _file_signature(path),
+                "data": QByteArray(),
+                # Baştaki sessizlik atlanabileceği için sınıra en uzun atlama payı eklenir
+                "limit_bytes": pcm_format().bytesForDuration((limit_ms + MAX_START_OFFSET_MS) * 1000) if limit_ms else 0,
+            }
+            decoder.bufferReady.connect(lambda p=path: self._on_buffer_ready(p))
+            decoder.finished.connect(lambda p=path: self._on_decode_finished(p))
+            decoder.error.connect(lambda _, p=path: self._on_decode_error(p))
+            decoder.start()
+
+    def _on_buffer_ready(self, path):
+        job = self._active_jobs.get(path)
+        if job is None:
+            return
+        audio_buffer = job["decoder"].read()
+        if not audio_buffer.isValid():
+            return
+        job["data"].append(audio_buffer.constData().asstring(audio_buffer.byteCount()))
+        if job["limit_bytes"] and job["data"].size() >= job["limit_bytes"]:
+            # Gereken bölüm çözüldü; dosyanın geri kalanı için çözücü meşgul edilmez
+            job["data"].truncate(job["limit_bytes"])
+            self._on_decode_finished(path, complete=False)
+        elif job["data"].size() > self.max_bytes:
+            # Bütçeden büyük dosya hiç önbelleğe alınmaz; diskten çalınmaya devam eder
+            self._finish_job(path)
+            self._uncacheable[path] = job["signature"]
+
+    def _on_decode_finished(self, path, complete=True):
+        job = self._finish_job(path)
+        if job is None:
+            return
+        entry = DecodedSound(path, job["signature"], pcm_format(), job["data"], complete=complete)
+        result = self._analyzer.result_for(path) if self._analyzer is not None else None
+        if result is not None:
+            entry = adjusted_sound(entry, result)
+        self._drop(path)
+        self._make_room(entry.data.size())
+        if self._total_bytes + entry.data.size() > self.max_bytes:
+            self._uncacheable[path] = job["signature"]
+            return
+        self._entries[path] = entry
+        self._total_bytes += entry.data.size()
+        log.debug("Ses önbelleğe alındı: %s (%s ms%s)", path, entry.duration_ms, "" if complete else ", bölüm")
+        self.soundReady.emit(path)
+        if path in self._decode_limits and not entry.covers(self._decode_limits[path]):
+            # Çözme sürerken daha uzun bölüm isteyen bir kanal eklendi
+            self._queue.append(path)
+            self._start_next_decodes()
+
+    def _on_analysis_ready(self, path):
+        entry = self._entries.get(path)
+        if entry is None or entry.adjusted:
+            return
+        # Yeni kayıt nesnesi, kanalların sesi yeniden hazırlamasını sağlar
+        self._entries[path] = adjusted_sound(entry, self._analyzer.result_for(path))
+        self.soundReady.emit(path)
+
+    def _on_decode_error(self, path):
+        job = self._finish_job(path)
+        if job is None:
+            return
+        self._uncacheable[path] = job["signature"]
+        self.decodeFailed.emit(path, job["decoder"].errorString())
+
+    def _finish_job(self, path):
+        job = self._active_jobs.pop(path, None)
+        if job is not None:
+            job["decoder"].stop()
+            job["decoder"].deleteLater()
+        self._start_next_decodes()
+        return job
+
+    def _make_room(self, needed_bytes):
+        """En uzun süredir kullanılmayan, sabitlenmemiş kayıtları yer açılana kadar atar."""
+        for path in list(self._entries):
+            if self._total_bytes + needed_bytes <= self.max_bytes:
+                break
+            if path not in self._pinned:
+                self._drop(path)
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= entry.data.size()
+
+
+# --- Sanal Çıkışlar ---
+class VirtualSink:
+    """Donanım gerektirmeyen çıkış: çalınan sesleri bellekte, istenirse JSON satırları olarak dosyada kaydeder."""
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.records = deque(maxlen=VIRTUAL_SINK_HISTORY)
+
+    def record(self, zone, channel, sound_path, duration_ms, volume=1.0):
+        entry = {
+            "time": get_clock().now().toString(Qt.ISODateWithMs), # Benzetimde benzetim saati
+            "zone": zone,
+            "channel": channel,
+            "file": sound_path,
+            "duration_ms": duration_ms,
+            "volume": round(volume, 3),
+        }
+        self.records.append(entry)
+        if self.file_path:
+            try:
+                with open(self.file_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                log.warning("Sanal çıkış kaydı yazılamadı: %s", e)
+
+
+class VirtualAudioOutput(QObject):
+    """QAudioOutput yerine geçen sanal çıkış. Sesin süresi boyunca çalıyor görünür."""
+    stateChanged = pyqtSignal(int) # QAudio.State
+
+    def __init__(self, sink, zone, channel, sound_path, duration_ms, parent=None):
+        super().__init__(parent)
+        self._sink = sink
+        self._zone = zone
+        self._channel = channel
+        self._sound_path = sound_path
+        self._duration_ms = duration_ms
+        self._volume = 1.0
+        self._state = QAudio.StoppedState
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(lambda: self._set_state(QAudio.IdleState))
+
+    def start(self, device=None):
+        self._sink.record(self._zone, self._channel, self._sound_path, self._duration_ms, self._volume)
+        self._set_state(QAudio.ActiveState)
+        self._idle_timer.start(self._duration_ms)
+
+    def stop(self):
+        self._idle_timer.stop()
+        if self._state != QAudio.StoppedState:
+            self._set_state(QAudio.StoppedState)
+
+    def state(self):
+        return self._state
+
+    def setVolume(self, volume):
+        self._volume = volume
+
+    def volume(self):
+        return self._volume
+
+    def _set_state(self, state):
+        self._state = state
+        self.stateChanged.emit(state)
+
+
+# --- Oynatıcı Havuzu ---
+class SoundChannel(QObject):
+    """Tek bir ses kaynağına (bir zil tipi veya bir siren) ayrılmış, önceden hazırlanıp bekletilen oynatıcı.
+
+    Ses önbellekteyse QAudioOutput ile bellekten, değilse yüklenmiş bir QMediaPlayer ile çalınır.
+    Her iki durumda da çalma anında yapılacak tek iş play() olur. QMediaPlayer (ve medya arka ucu)
+    yalnızca diskten çalma gerektiğinde kurulur; ses çözülmekteyse kanal çözümün bitmesini bekler. Kanalın en uzun çalma süresi
+    varsa ses, süre dolmadan FADE_OUT_MSECS önce kısılmaya başlar ve süre dolunca durur.
+    """
+    stateChanged = pyqtSignal(str, int) # kanal adı, QMediaPlayer.State
+    mediaStatusChanged = pyqtSignal(str, int) # kanal adı, QMediaPlayer.MediaStatus
+    audioStarted = pyqtSignal(str) # kanal adı; ses çıkışı gerçekten başladığında
+
+    def __init__(self, name, cache, pool):
+        super().__init__(pool)
+        self.name = zone_channel_name(pool.zone, name)
+        self.file_path = ""
+        self._channel_name = name
+        self._pool = pool
+        self._cache = cache
+        self._sound = None
+        self._buffer = None
+        self._output = None
+        self._output_playing = False
+        self._awaiting_start = False
+        self._player_start_ms = 0 # Diskten çalmada atlanacak baştaki sessizlik
+        self._player_volume = 100
+
+        self._fade_start_timer = QTimer(self)
+        self._fade_start_timer.setSingleShot(True)
+        self._fade_start_timer.timeout.connect(self._start_fade_out)
+        self._fade_timer = QTimer(self)
+        self._fade_timer.setInterval(FADE_STEP_MSECS)
+        self._fade_timer.timeout.connect(self._fade_step)
+        self._fade_clock = QElapsedTimer()
+
+        self._player = None # Diskten çalma gerektiğinde kurulur
+        self._player_file_path = ""
+
+    def _media_player(self):
+        if self._player is None:
+            self._player = QMediaPlayer(self)
+            self._player.stateChanged.connect(self._on_player_state_changed)
+            self._player.mediaStatusChanged.connect(self._on_player_media_status_changed)
+        return self._player
+
+    @property
+    def max_duration_ms(self):
+        """Kanalın en uzun çalma süresi; None ise ses sonuna kadar çalar."""
+        return self._pool.max_durations.get(self._channel_name)
+
+    def is_ready(self, file_path):
+        """Kanal bu dosya için hazır bekliyorsa True döndürür."""
+        if file_path != self.file_path:
+            return False
+        sound = self._cache.get(file_path)
+        if sound is not None:
+            return sound is self._sound and sound.covers(self.max_duration_ms)
+        if self._pool.virtual_sink is not None:
+            return self._output is not None
+        if not file_path or self._player_file_path != file_path:
+            return False
+        return self._player.mediaStatus() in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia)
+
+    def prepare(self, file_path):
+        """Sesi çalmaya hazır hale getirir. Çalmakta olan kanala dokunulmaz."""
+        if self.is_playing() or self.is_ready(file_path):
+            return
+        self.file_path = file_path
+        self._release_output()
+        self._sound = self._cache.get(file_path) if file_path else None
+        if self._sound is not None and not self._sound.covers(self.max_duration_ms):
+            self._sound = None # Önbellekteki bölüm bu kanala yetmiyor; daha uzun bölüm çözülene kadar diskten çalınır
+
+        if self._sound is not None:
+            self._release_player_media()
+            self._buffer = QBuffer(self)
+            self._buffer.setData(self._sound.data)
+            self._buffer.open(QIODevice.ReadOnly)
+            self._output = self._create_output(self._sound.audio_format, self._bounded_duration_ms(self._sound.playback_duration_ms))
+            self._output.setVolume(self._sound.volume)
+            self._output.stateChanged.connect(self._on_output_state_changed)
+            self.mediaStatusChanged.emit(self.name, QMediaPlayer.BufferedMedia)
+        elif file_path and self._pool.virtual_sink is not None:
+            # Sanal çıkış çözülmüş veri gerektirmez; süre bilinmediği için ses hemen biter
+            self._output = self._create_output(pcm_format(), 0)
+            self._output.stateChanged.connect(self._on_output_state_changed)
+            self._cache.request(file_path, max_duration_ms=self.max_duration_ms)
+        elif file_path:
+            self._cache.request(file_path, max_duration_ms=self.max_duration_ms) # Sonraki hazırlıkta bellekten çalınsın
+            if not self._cache.is_pending(file_path):
+                self._prepare_player(file_path)
+            # Çözülmekteyse ses hazır olunca bellekten hazırlanır; o ana kadar çalınırsa diskten çalınır
+
+    def _prepare_player(self, file_path):
+        if self._pool.device != DEFAULT_DEVICE:
+            log.warning("'%s' önbellekte değil; '%s' bölgesinde varsayılan aygıttan çalınacak.", file_path, self._pool.zone)
+        player = self._media_player()
+        player.setMedia(QMediaContent(QUrl.fromLocalFile(file_path)))
+        self._player_file_path = file_path
+        gain_db, self._player_start_ms = playback_adjustment(get_sound_analyzer().result_for(file_path))
+        self._player_volume = round(100 * min(1.0, 10 ** (gain_db / 20)))
+        player.setVolume(self._player_volume)
+
+    def _release_player_media(self):
+        if self._player is not None and self._player_file_path:
+            self._player.setMedia(QMediaContent()) # Diskten çalma hattı serbest bırakılır
+            self._player_file_path = ""
+
+    def _bounded_duration_ms(self, duration_ms):
+        max_duration_ms = self.max_duration_ms
+        return min(duration_ms, max_duration_ms) if max_duration_ms else duration_ms
+
+    def _create_output(self, audio_format, duration_ms):
+        if self._pool.virtual_sink is not None:
+            return VirtualAudioOutput(self._pool.virtual_sink, self._pool.zone, self._channel_name,
+                                      self.file_path, duration_ms, self)
+        return QAudioOutput(self._pool.device_info(), audio_format, self)
+
+    def play(self):
+        self._awaiting_start = True
+        self._stop_fade()
+        if self._output is not None:
+            self._rewind_buffer()
+            self._output_playing = True
+            self._output.start(self._buffer)
+            self.stateChanged.emit(self.name, QMediaPlayer.PlayingState)
+        else:
+            if self._player_file_path != self.file_path:
+                self._prepare_player(self.file_path)
+            if self._player_start_ms:
+                self._player.setPosition(self._player_start_ms)
+            self._player.play()
+        max_duration_ms = self.max_duration_ms
+        if max_duration_ms:
+            self._fade_start_timer.start(max(0, max_duration_ms - FADE_OUT_MSECS))
+
+    def _start_fade_out(self):
+        self._fade_clock.start()
+        self._fade_timer.start()
+
+    def _fade_step(self):
+        remaining = 1.0 - self._fade_clock.elapsed() / min(FADE_OUT_MSECS, self.max_duration_ms or FADE_OUT_MSECS)
+        if remaining <= 0 or not self.is_playing():
+            self.stop()
+        else:
+            self._set_volume_factor(remaining * remaining) # Kulağa doğrusal gelen kısılma için karesel eğri
+
+    def _set_volume_factor(self, factor):
+        if self._output is not None:
+            self._output.setVolume(self._sound.volume * factor if self._sound is not None else factor)
+        elif self._player is not None:
+            self._player.setVolume(round(self._player_volume * factor))
+
+    def _stop_fade(self):
+        if self._fade_start_timer.isActive() or self._fade_timer.isActive():
+            self._fade_start_timer.stop()
+            self._fade_timer.stop()
+            self._set_volume_factor(1.0)
+
+    def stop(self):
+        """Sesi durdurur; kanal aynı ses için hazır kalır."""
+        self._awaiting_start = False
+        self._stop_fade()
+        if self._output_playing:
+            self._output_playing = False
+            self._output.stop()
+            self._rewind_buffer()
+            self.stateChanged.emit(self.name, QMediaPlayer.StoppedState)
+        if self._player is not None and self._player.state() != QMediaPlayer.StoppedState:
+            self._player.stop()
+
+    def _rewind_buffer(self):
+        if self._buffer is not None:
+            self._buffer.seek(self._sound.start_offset_bytes if self._sound is not None else 0)
+
+    def reset(self):
+        """Çıkış aygıtı değiştiğinde kanalı bırakır ve aynı sesi yeni aygıt için yeniden hazırlar."""
+        self.stop()
+        self._release_output()
+        self._sound = None
+        file_path, self.file_path = self.file_path, ""
+        self.prepare(file_path)
+
+    def is_playing(self):
+        return self._output_playing or (self._player is not None and self._player.state() == QMediaPlayer.PlayingState)
+
+    def _on_output_state_changed(self, state):
+        if state == QAudio.ActiveState:
+            self._emit_audio_started()
+        elif state == QAudio.IdleState and self._output_playing: # Tampon sonuna gelindi
+            self.stop()
+
+    def _on_player_state_changed(self, state):
+        self.stateChanged.emit(self.name, state)
+        self._check_player_started()
+
+    def _on_player_media_status_changed(self, status):
+        self.mediaStatusChanged.emit(self.name, status)
+        self._check_player_started()
+
+    def _check_player_started(self):
+        # Diskten çalmada ses, oynatıcı hem PlayingState'e hem BufferedMedia'ya ulaştığında başlamış sayılır
+        if (self._player.state() == QMediaPlayer.PlayingState
+                and self._player.mediaStatus() == QMediaPlayer.BufferedMedia):
+            self._emit_audio_started()
+
+    def _emit_audio_started(self):
+        if self._awaiting_start:
+            self._awaiting_start = False
+            self.audioStarted.emit(self.name)
+
+    def _release_output(self):
+        if self._output is not None:
+            self._output.stop()
+            self._output.deleteLater()
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer.deleteLater()
+        self._output = None
+        self._buffer = None
+        self._output_playing = False
+
+
+class PlayerPool(QObject):
+    """Bir bölgedeki her zil tipi ve her siren için ayrı, önceden hazırlanmış kanallar tutar.
+
+    Teneffüs ve İçeri zilleri arka arkaya çalındığında medya yeniden yüklenmez.
+    """
+    GENERAL_CHANNEL = "Genel" # Hiçbir kanala atanmamış sesler (ör. yeni seçilen zilin sınanması)
+
+    stateChanged = pyqtSignal(str, int)
+    mediaStatusChanged = pyqtSignal(str, int)
+    audioStarted = pyqtSignal(str)
+
+    def __init__(self, cache, zone=DEFAULT_ZONE, device=DEFAULT_DEVICE, max_durations=None, parent=None):
+        super().__init__(parent)
+        self._cache = cache
+        self.zone = zone
+        self.max_durations = max_durations if max_durations is not None else {} # kanal adı -> en uzun süre (ms)
+        self.device = None
+        self.virtual_sink = None
+        self._device_info = None
+        self.channels = {}
+        self.set_device(device)
+        self._cache.soundReady.connect(self._on_sound_ready)
+        self._cache.decodeFailed.connect(self._on_decode_failed)
+
+    def set_device(self, device):
+        """Bölgenin çıkış aygıtını değiştirir; hazırlanmış kanallar yeni aygıt için yeniden kurulur."""
+        device = device or DEFAULT_DEVICE
+        if device == self.device:
+            return
+        self.device = device
+        self._device_info = None
+        if device == NULL_DEVICE:
+            self.virtual_sink = VirtualSink()
+        elif device.startswith(FILE_DEVICE_PREFIX):
+            self.virtual_sink = VirtualSink(device[len(FILE_DEVICE_PREFIX):])
+        else:
+            self.virtual_sink = None
+        for channel in self.channels.values():
+            channel.reset()
+
+    def device_info(self):
+        """Bölgenin QAudioDeviceInfo'su; aygıt bulunamazsa varsayılan çıkış kullanılır."""
+        if self._device_info is None:
+            self._device_info = QAudioDeviceInfo.defaultOutputDevice()
+            if self.device != DEFAULT_DEVICE:
+                for device in QAudioDeviceInfo.availableDevices(QAudio.AudioOutput):
+                    if device.deviceName() == self.device:
+                        self._device_info = device
+                        break
+                else:
+                    log.warning("'%s' bölgesinin çıkış aygıtı bulunamadı: %s. Varsayılan aygıt kullanılıyor.", self.zone, self.device)
+        return self._device_info
+
+    def channel(self, name):
+        if name not in self.channels:
+            channel = SoundChannel(name, self._cache, self)
+            channel.stateChanged.connect(self.stateChanged)
+            channel.mediaStatusChanged.connect(self.mediaStatusChanged)
+            channel.audioStarted.connect(self.audioStarted)
+            self.channels[name] = channel
+        return self.channels[name]
+
+    def channel_name_for_path(self, file_path):
+        for name, channel in self.channels.items():
+            if channel.file_path == file_path:
+                return name
+        return self.GENERAL_CHANNEL
+
+    def prepare(self, name, file_path):
+        self.channel(name).prepare(file_path)
+
+    def play(self, name, file_path):
+        """Kanalı gerekirse hazırlar ve çalar. Bölgede aynı anda tek ses çalar; bölgenin diğer kanalları durdurulur."""
+        channel = self.channel(name)
+        for other in self.channels.values():
+            if other.is_playing():
+                other.stop()
+        channel.prepare(file_path)
+        channel.play()
+
+    def stop_all(self):
+        for channel in self.channels.values():
+            channel.stop()
+
+    def is_playing(self):
+        return any(channel.is_playing() for channel in self.channels.values())
+
+    def _on_sound_ready(self, file_path):
+        # Diskten çalmaya hazırlanmış kanallar, ses belleğe çözülünce bellekten çalmaya geçer
+        for channel in self.channels.values():
+            if channel.file_path == file_path:
+                channel.prepare(file_path)
+
+    def _on_decode_failed(self, file_path, _error):
+        # Çözülmesi beklenen ses çözülemediyse kanal diskten çalmaya hazırlanır
+        for channel in self.channels.values():
+            if channel.file_path == file_path:
+                channel.prepare(file_path)
+
+    def close(self):
+        self.stop_all()
+        self._cache.soundReady.disconnect(self._on_sound_ready)
+        self._cache.decodeFailed.disconnect(self._on_decode_failed)
+        self.deleteLater()
+
+
+class AudioRouter(QObject):
+    """Bölgelerin oynatıcı havuzlarını tutar ve sinyallerini tek yerde toplar."""
+    stateChanged = pyqtSignal(str, int)
+    mediaStatusChanged = pyqtSignal(str, int)
+    audioStarted = pyqtSignal(str)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self._cache = cache
+        self.pools = {}
+        self.max_durations = {} # kanal adı -> en uzun çalma süresi (ms); tüm bölgelerin havuzlarınca paylaşılır
+        self.pool(DEFAULT_ZONE)
+
+    def pool(self, zone=DEFAULT_ZONE):
+        """Bölgenin oynatıcı havuzunu döndürür; bilinmeyen bölge için varsayılan aygıtla oluşturur."""
+        if zone not in self.pools:
+            pool = PlayerPool(self._cache, zone, DEFAULT_DEVICE, self.max_durations, self)
+            pool.stateChanged.connect(self.stateChanged)
+            pool.mediaStatusChanged.connect(self.mediaStatusChanged)
+            pool.audioStarted.connect(self.audioStarted)
+            self.pools[zone] = pool
+        return self.pools[zone]
+
+    def configure(self, zone_devices):
+        """Bölgeleri {bölge adı: aygıt} eşlemesine göre kurar; listede olmayan bölgeler kaldırılır."""
+        for zone in list(self.pools):
+            if zone not in zone_devices and zone != DEFAULT_ZONE:
+                self.pools.pop(zone).close()
+        for zone, device in zone_devices.items():
+            self.pool(zone).set_device(device)
+
+    def set_max_durations(self, max_durations):
+        """Kanalların en uzun çalma sürelerini {kanal adı: ms} olarak değiştirir; 0 veya None sınırsızdır."""
+        self.max_durations.clear()
+        self.max_durations.update({name: ms for name, ms in max_durations.items() if ms})
+
+    def zones(self):
+        return list(self.pools)
+
+    def pools_for(self, zone):
+        if zone == ALL_ZONES or zone is None:
+            return list(self.pools.values())
+        return [self.pool(zone)]
+
+    def is_playing(self, zone=None):
+        return any(pool.is_playing() for pool in self.pools_for(zone))
+
+    def stop_all(self, zone=None):
+        for pool in self.pools_for(zone):
+            pool.stop_all()
+
+
+# --- Medya Oynatıcı Fonksiyonları ---
+_sound_cache = None
+_audio_router = None
+
+def get_sound_cache():
+    """Paylaşılan PCM ses önbelleğini döndürür, ilk çağrıda oluşturur."""
+    global _sound_cache
+    if _sound_cache is None:
+        _sound_cache = PcmSoundCache()
+        _sound_cache.attach_analyzer(get_sound_analyzer())
+    return _sound_cache
+
+def get_audio_router():
+    """Paylaşılan bölge yönlendiricisini döndürür, ilk çağrıda oluşturur."""
+    global _audio_router
+    if _audio_router is None:
+        _audio_router = AudioRouter(get_sound_cache())
+    return _audio_router
+
+def get_player_pool(zone=DEFAULT_ZONE):
+    """Bölgenin oynatıcı havuzunu döndürür."""
+    return get_audio_router().pool(zone)
+
+def configure_zones(zone_devices):
+    get_audio_router().configure(zone_devices)
+
+def preload_sounds(zone_bell_sound_paths, sirenler_base_path, bell_max_durations=None):
+    """Her bölgenin zil seslerini (önbellekte sabitlenmiş olarak) ve sirenleri arka planda çözer ve
+    her biri için ayrı bir kanalı çalmaya hazır bekletir. zone_bell_sound_paths: {bölge: {zil tipi: yol}},
+    bell_max_durations: {zil tipi: en uzun çalma süresi (ms)}; zil sesleri yalnızca bu süre kadar çözülür."""
+    cache = get_sound_cache()
+    router = get_audio_router()
+    cache.unpin_all()
+    router.set_max_durations(bell_max_durations or {})
+    for zone, bell_sound_paths in zone_bell_sound_paths.items():
+        pool = router.pool(zone)
+        for bell_type, path in bell_sound_paths.items():
+            cache.request(path, pin=True, max_duration_ms=router.max_durations.get(bell_type))
+            pool.prepare(bell_type, path)
+    for path in list_sound_files(sirenler_base_path):
+        cache.request(path)
+        router.pool(DEFAULT_ZONE).prepare(os.path.basename(path), path)
+
+def prepare_sound(channel, file_path, zone=DEFAULT_ZONE):
+    """Yaklaşan bir zil için kanalı önceden hazırlar (ön yükleme)."""
+    if file_path and os.path.exists(file_path):
+        get_player_pool(zone).prepare(channel, file_path)
+
+def is_playing(zone=None):
+    return get_audio_router().is_playing(zone)
+
+def play_sound(file_path, channel=None, zone=DEFAULT_ZONE):
+    """Verilen dosya yolundaki sesi bölgede (ALL_ZONES ile tüm bölgelerde) çalar.
+    Başarıda None, aksi halde hata mesajını döndürür.
+
+    channel verilmezse sesi önceden hazırlamış kanal, yoksa genel kanal kullanılır.
+    """
+    log.debug("play_sound çağrıldı. file_path: %s, kanal: %s, bölge: %s", file_path, channel, zone)
+
+    if not file_path:
+        error_message = "Ses dosyası yolu boş."
+    elif not QUrl.fromLocalFile(file_path).isValid():
+        error_message = f"Ses dosyası yolu geçersiz bir URL formatında: {file_path}"
+    elif not os.path.exists(file_path):
+        error_message = f"Ses dosyası bulunamadı: {file_path}"
+    else:
+        for pool in get_audio_router().pools_for(zone):
+            pool.play(channel if channel is not None else pool.channel_name_for_path(file_path), file_path)
+        log.info("Ses çalınıyor: %s (%s)", file_path, zone)
+        return None
+
+    log.warning("%s", error_message)
+    return error_message
+
+def stop_sound(zone=None):
+    """Çalmakta olan sesi durdurur. Bölge verilmezse tüm bölgelerde durdurur."""
+    log.debug("stop_sound çağrıldı.")
+    if is_playing(zone):
+        get_audio_router().stop_all(zone)
+        log.info("Ses durduruldu.")
+    else:
+        log.debug("Şu anda çalan bir ses yok.")
@@ -0,0 +1,207 @@
+"""Tarihe özel zil takvimi.
+
+Haftalık çizelgenin üzerine tarih aralıklarıyla tanımlanan istisnalar eklenir: tatil (zil çalmaz),
+başka bir günün çizelgesini kullanma (ör. sınav günü Cuma çizelgesi), saatleri kaydırma ve yalnızca
+bazı oturumlarda zil çalma (yarım gün). Aralıklar örtüşebilir; sonra eklenen istisna öncelidir.
+
+İstisnalar kaydedilirken örtüşmeyen, sıralı parçalara ayrılır. Bir tarihin istisnası ikili aramayla
+O(log n) sürede bulunur. Her tarih bir kez gün planına çözülür ve istisnalar ya da o günün çizelgesi
+değişene kadar önbellekte tutulur.
+"""
+
+from PyQt5.QtCore import QDate
+
+import heapq
+from bisect import bisect_right
+
+from ders_cizelgesi import DAY_NAMES, SESSIONS, SECONDS_PER_DAY, compile_day_timeline
+from loglama import get_logger
+
+log = get_logger(__name__)
+
+DATE_FORMAT = "yyyy-MM-dd"
+MAX_CACHED_PLANS = 64
+
+
+def weekday_name(date):
+    """QDate için DAY_NAMES içindeki gün adını döndürür."""
+    return DAY_NAMES[date.dayOfWeek() - 1] # 1 (Pazartesi) -> 0 ... 7 (Pazar) -> 6
+
+
+class DateOverride:
+    """Bir tarih aralığı (başlangıç ve bitiş dahil) için çizelge istisnası."""
+    __slots__ = ("start", "end", "skip", "template_day", "shift_minutes", "sessions", "description")
+
+    def __init__(self, start, end=None, skip=False, template_day=None, shift_minutes=0, sessions=None, description=""):
+        self.start = start
+        self.end = end if end is not None else start
+        if self.end < self.start:
+            raise ValueError(f"Bitiş tarihi ({self.end.toString(DATE_FORMAT)}) başlangıçtan önce olamaz.")
+        if template_day is not None and template_day not in DAY_NAMES:
+            raise ValueError(f"Bilinmeyen gün adı: {template_day}")
+        if sessions is not None and any(session not in SESSIONS for session in sessions):
+            raise ValueError(f"Bilinmeyen oturum: {sessions}")
+        self.skip = skip
+        self.template_day = template_day # None: tarihin kendi günü
+        self.shift_minutes = shift_minutes
+        self.sessions = tuple(sessions) if sessions is not None else None # None: tüm oturumlar
+        self.description = description
+
+    def summary(self):
+        """İstisnanın kısa Türkçe açıklaması."""
+        if self.skip:
+            return "Zil çalmaz"
+        parts = []
+        if self.template_day:
+            parts.append(f"{self.template_day} çizelgesi")
+        if self.shift_minutes:
+            parts.append(f"{self.shift_minutes:+d} dk kaydırma")
+        if self.sessions is not None:
+            parts.append("Yalnızca " + ", ".join(self.sessions) if self.sessions else "Hiçbir oturum")
+        return ", ".join(parts) if parts else "Değişiklik yok"
+
+    def to_json(self):
+        return {
+            "start": self.start.toString(DATE_FORMAT),
+            "end": self.end.toString(DATE_FORMAT),
+            "skip": self.skip,
+            "template_day": self.template_day,
+            "shift_minutes": self.shift_minutes,
+            "sessions": list(self.sessions) if self.sessions is not None else None,
+            "description": self.description,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        start = QDate.fromString(data["start"], DATE_FORMAT)
+        end = QDate.fromString(data.get("end") or data["start"], DATE_FORMAT)
+        if not start.isValid() or not end.isValid():
+            raise ValueError(f"Geçersiz tarih: {data.get('start')} - {data.get('end')}")
+        return cls(start, end, skip=bool(data.get("skip", False)), template_day=data.get("template_day"),
+                   shift_minutes=int(data.get("shift_minutes", 0)), sessions=data.get("sessions"),
+                   description=data.get("description", ""))
+
+
+class DayPlan:
+    """Bir tarihin çözülmüş zil planı: derlenmiş çizelge ve uygulanan istisna."""
+    __slots__ = ("date", "template_day", "timeline", "override")
+
+    def __init__(self, date, template_day, timeline, override=None):
+        self.date = date
+        self.template_day = template_day # Çizelgesi kullanılan gün; tatilde None
+        self.timeline = timeline # [(saniye, oturum, ders, zil tipi), ...] zamana göre sıralı
+        self.override = override
+
+
+class BellCalendar:
+    """Tarih istisnalarını aralık dizininde tutar ve tarihleri önbellekli gün planlarına çözer."""
+
+    def __init__(self, overrides=None):
+        self.overrides = []
+        self._segment_starts = [] # Örtüşmeyen parçaların başlangıç günleri (Jülyen günü), sıralı
+        self._segments = [] # (bitiş günü, istisna)
+        self._plan_cache = {}
+        self.set_overrides(overrides or [])
+
+    def set_overrides(self, overrides):
+        self.overrides = list(overrides)
+        self._rebuild_index()
+
+    def add_override(self, override):
+        self.overrides.append(override)
+        self._rebuild_index()
+
+    def remove_override(self, index):
+        del self.overrides[index]
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """İstisnaları, her günü kapsayan en öncelikli istisnayı gösteren örtüşmeyen parçalara ayırır."""
+        self._plan_cache.clear()
+        self._segment_starts = []
+        self._segments = []
+
+        intervals = sorted((override.start.toJulianDay(), override.end.toJulianDay(), priority)
+                           for priority, override in enumerate(self.overrides))
+        boundaries = sorted({start for start, _, _ in intervals} | {end + 1 for _, end, _ in intervals})
+        active = [] # (-öncelik, bitiş) yığını; süresi dolanlar tepeye geldiğinde atılır
+        next_interval = 0
+        for position, boundary in enumerate(boundaries[:-1]):
+            while next_interval < len(intervals) and intervals[next_interval][0] == boundary:
+                _, end, priority = intervals[next_interval]
+                heapq.heappush(active, (-priority, end))
+                next_interval += 1
+            while active and active[0][1] < boundary:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            override = self.overrides[-active[0][0]]
+            segment_end = boundaries[position + 1] - 1
+            if self._segments and self._segments[-1][1] is override and self._segments[-1][0] == boundary - 1:
+                self._segments[-1] = (segment_end, override) # Aynı istisnanın bitişik parçaları birleştirilir
+            else:
+                self._segment_starts.append(boundary)
+                self._segments.append((segment_end, override))
+
+    def override_for_date(self, date):
+        """Tarihe uygulanan istisnayı, yoksa None döndürür."""
+        day = date.toJulianDay()
+        position = bisect_right(self._segment_starts, day) - 1
+        if position < 0:
+            return None
+        segment_end, override = self._segments[position]
+        return override if day <= segment_end else None
+
+    def day_plan(self, schedule, date):
+        """Tarihin gün planını döndürür; aynı tarih için önbellekteki planı kullanır."""
+        day = date.toJulianDay()
+        plan = self._plan_cache.get(day)
+        if plan is None:
+            if len(self._plan_cache) >= MAX_CACHED_PLANS:
+                self._plan_cache.clear()
+            plan = self._resolve_day_plan(schedule, date)
+            self._plan_cache[day] = plan
+        return plan
+
+    def _resolve_day_plan(self, schedule, date):
+        override = self.override_for_date(date)
+        if override is None:
+            day_name = weekday_name(date)
+            return DayPlan(date, day_name, compile_day_timeline(schedule, day_name))
+        if override.skip:
+            return DayPlan(date, None, [], override)
+
+        template_day = override.template_day or weekday_name(date)
+        timeline = compile_day_timeline(schedule, template_day)
+        if override.sessions is not None:
+            timeline = [entry for entry in timeline if entry[1] in override.sessions]
+        if override.shift_minutes:
+            # Kaydırma sırayı bozmaz; gün sınırının dışına taşan ziller düşer
+            shift_secs = override.shift_minutes * 60
+            shifted = ((second + shift_secs, session, lesson_key, bell_type)
+                       for second, session, lesson_key, bell_type in timeline)
+            timeline = [entry for entry in shifted if 0 <= entry[0] < SECONDS_PER_DAY]
+        return DayPlan(date, template_day, timeline, override)
+
+    def invalidate_day(self, day_name):
+        """Verilen günün çizelgesini kullanan önbellekteki planları düşürür."""
+        for day, plan in list(self._plan_cache.items()):
+            if plan.template_day == day_name:
+                del self._plan_cache[day]
+
+    def invalidate_all(self):
+        self._plan_cache.clear()
+
+    def to_json(self):
+        return [override.to_json() for override in self.overrides]
+
+    @classmethod
+    def from_json(cls, data):
+        overrides = []
+        for item in data:
+            try:
+                overrides.append(DateOverride.from_json(item))
+            except (KeyError, TypeError, ValueError) as e:
+                log.warning("Geçersiz takvim istisnası atlandı: %s (%s)", item, e)
+        return cls(overrides)
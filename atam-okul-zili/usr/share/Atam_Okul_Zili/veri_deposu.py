@@ -0,0 +1,181 @@
+"""Çökmeye dayanıklı veri deposu.
+
+Veriler iki dosyada tutulur: tam anlık görüntü (okul_zili_data.json) ve son görüntüden sonraki
+düzenlemelerin satır satır eklendiği küçük bir günlük (okul_zili_data.json.journal).
+Her düzenleme günlüğe eklenir; anlık görüntü arka plandaki bir yazıcı iş parçacığında geçici
+dosya + fsync + yeniden adlandırma ile yazılır, ardından günlük boşaltılır. Açılışta son görüntü
+okunur ve günlük üzerine uygulanır. Böylece elektrik kesintisinde düzenlemeler kaybolmaz ve
+yarım yazılmış bir dosya veriyi bozamaz.
+"""
+
+import json
+import os
+import platform
+import queue
+import threading
+
+from loglama import get_logger
+
+log = get_logger(__name__)
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def _fsync_directory(directory):
+    """Yeniden adlandırmanın diske işlenmesi için dizini eşitler (Windows'ta desteklenmez)."""
+    if platform.system() == "Windows":
+        return
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+def write_file_atomic(path, text):
+    """Metni geçici dosya + fsync + yeniden adlandırma ile yazar; yarım yazılmış dosya oluşmaz."""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(os.path.dirname(path) or ".")
+
+def file_signature(path):
+    """Dosyanın (değişme zamanı ns, boyut) ikilisi; dosya yoksa None."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def apply_journal_record(data, record):
+    """Bir günlük kaydını veri sözlüğüne uygular."""
+    if record.get("op") == "lesson_time":
+        day, session, lesson_key, bell_type, text = record["args"]
+        lesson_times = data.setdefault("lesson_times", {})
+        lesson_times.setdefault(day, {}).setdefault(session, {}).setdefault(lesson_key, {})[bell_type] = text
+    elif record.get("op") == "calendar_overrides":
+        data["calendar_overrides"] = record["args"][0] # İstisna listesi küçük olduğu için tamamı yazılır
+
+
+class JournaledDataStore:
+    """Anlık görüntü + ekleme günlüğü ile çalışan, yazmaları arka planda yapan veri deposu."""
+
+    def __init__(self, data_file, on_error=None):
+        self.data_file = data_file
+        self.journal_file = data_file + JOURNAL_SUFFIX
+        self.on_error = on_error # Yazıcı iş parçacığından çağrılır
+        self._seq = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Dosyanın son okunduğu ve bu süreçte son yazıldığı andaki imzası; dış değişiklikleri ayırt etmek için
+        self.loaded_signature = None
+        self.written_signature = None # Yazıcı iş parçacığında güncellenir
+
+    def load(self):
+        """Son anlık görüntüyü okur ve günlükteki sonraki düzenlemeleri uygular.
+        Dosya yoksa None döndürür. Bozuk anlık görüntüde istisna fırlatır."""
+        data = None
+        self.loaded_signature = file_signature(self.data_file) # Okuma sırasında değişirse sonraki denetim yakalar
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        snapshot_seq = data.get("journal_seq", 0) if data else 0
+        self._seq = snapshot_seq
+
+        replayed = 0
+        for record in self._read_journal():
+            if record.get("seq", 0) <= snapshot_seq:
+                continue # Görüntü yazıldıktan sonra günlük boşaltılamadan kesilmiş
+            if data is None:
+                data = {}
+            apply_journal_record(data, record)
+            self._seq = max(self._seq, record["seq"])
+            replayed += 1
+        if replayed:
+            log.info("Günlükten %d düzenleme geri yüklendi: %s", replayed, self.journal_file)
+        return data
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_file):
+            return []
+        records = []
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break # Yazılırken kesilmiş son satır
+        return records
+
+    def changed_on_disk(self):
+        """Anlık görüntü dosyası son okumadan ve bu sürecin son yazmasından sonra başkasınca değiştirildiyse True."""
+        signature = file_signature(self.data_file)
+        return signature is not None and signature not in (self.loaded_signature, self.written_signature)
+
+    def append(self, op, *args):
+        """Düzenlemeyi günlüğe eklenmek üzere sıraya koyar; çağıranı bekletmez."""
+        with self._lock:
+            self._seq += 1
+            self._submit(("append", {"seq": self._seq, "op": op, "args": list(args)}))
+
+    def save_snapshot(self, data):
+        """Verinin tam görüntüsünü arka planda atomik olarak yazar ve günlüğü boşaltır."""
+        with self._lock:
+            # Sözlük yazıcı iş parçacığında okunurken arayüz değiştirmesin diye metne burada çevrilir
+            snapshot_text = json.dumps(dict(data, journal_seq=self._seq), ensure_ascii=False, indent=4)
+            self._submit(("snapshot", snapshot_text))
+
+    def save_snapshot_now(self, data):
+        """save_snapshot() gibi, ancak çağıran iş parçacığında hemen yazar; hata olursa OSError fırlatır.
+        Sırada bekleyen yazmalar önce bitirilir ki daha eski bir görüntü bunun üzerine yazılmasın."""
+        self.flush()
+        with self._lock:
+            snapshot_text = json.dumps(dict(data, journal_seq=self._seq), ensure_ascii=False, indent=4)
+            self._write_snapshot(snapshot_text)
+
+    def flush(self, timeout=5.0):
+        """Sıradaki tüm yazmaların bitmesini bekler (ör. program kapanırken)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._submit(("flush", done))
+        return done.wait(timeout)
+
+    def _submit(self, job):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer_loop, name="veri-deposu-yazici", daemon=True)
+            self._thread.start()
+        self._queue.put(job)
+
+    def _writer_loop(self):
+        while True:
+            kind, payload = self._queue.get()
+            try:
+                if kind == "append":
+                    self._write_journal_record(payload)
+                elif kind == "snapshot":
+                    self._write_snapshot(payload)
+                elif kind == "flush":
+                    payload.set()
+            except Exception as e:
+                log.warning("Veri deposu yazma hatası: %s", e)
+                if self.on_error:
+                    self.on_error(str(e))
+
+    def _write_journal_record(self, record):
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshot(self, text):
+        write_file_atomic(self.data_file, text)
+        self.written_signature = file_signature(self.data_file)
+
+        # Görüntüden önce sıraya girmiş tüm kayıtlar zaten yazıldı; günlük boşaltılabilir
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        log.info("Tüm veriler '%s' dosyasına kaydedildi.", self.data_file)
@@ -0,0 +1,205 @@
+"""Hızlandırılmış zil benzetimi.
+
+Bir zil çizelgesini günler veya haftalar boyunca, gerçek zamanı beklemeden saniyeler içinde oynatır.
+Çekirdeğe elle ilerletilen bir saat (saat.ManualClock) takılır ve her benzetim saniyesinde tick()
+çağrılır; ses "null" (istenirse "file:") sanal çıkışına gider ve kaydedilir. Çıktıda hangi zilin ne
+zaman çaldığı, hangilerinin bells_rung_today nedeniyle bastırıldığı, hangilerinin telafi penceresi
+aşıldığı için kaçırıldığı ve hangilerinin açılışta, yeniden yüklemede veya gün dönümünde geçmiş
+sayılıp hiç çalınmadığı listelenir.
+
+Gerçek veri dosyası değiştirilmez; geçici bir dizine kopyalanır ve bütün bölgeler sanal çıkışa
+yönlendirilir. Olay döngüsünün takılması --stall ile, veri dosyasının dışarıdan yeniden yüklenmesi
+--reload-at ile canlandırılabilir.
+
+    python3 zil_benzetimi.py --start 2026-10-19T00:00 --days 7
+    python3 zil_benzetimi.py --stall 2026-10-19T08:29:50 300 --reload-at 2026-10-19T10:00:00 --json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from collections import Counter
+
+from PyQt5.QtCore import QCoreApplication, QDateTime, QTime, Qt
+
+from ders_cizelgesi import seconds_to_time_str
+from loglama import setup_logging
+from saat import ManualClock, set_clock
+from ses_oynatici import get_audio_router, DEFAULT_ZONE, NULL_DEVICE, FILE_DEVICE_PREFIX
+from veri_deposu import JournaledDataStore, write_file_atomic
+from zil_cekirdegi import (OkulZiliCekirdegi, get_app_data_directory, DATA_FILE_NAME,
+                           SKIP_ALREADY_RUNG, SKIP_MISSED, SKIP_NO_SOUND, SKIP_MERGED, SKIP_MARKED_PAST)
+
+FIRED = "fired"
+OUTCOME_LABELS = {
+    FIRED: "ÇALDI",
+    SKIP_ALREADY_RUNG: "BASTIRILDI",
+    SKIP_MISSED: "KAÇIRILDI",
+    SKIP_NO_SOUND: "SES YOK",
+    SKIP_MERGED: "BİRLEŞTİRİLDİ",
+    SKIP_MARKED_PAST: "GEÇMİŞ SAYILDI",
+}
+PROCESS_EVENTS_EVERY_SECS = 60 # Sanal çıkışların ve planlayıcının sinyalleri bu kadar benzetim saniyesinde bir işlenir
+
+
+def parse_datetime(text):
+    """"2026-10-19T08:30", "2026-10-19 08:30:00" veya "2026-10-19" biçimindeki zamanı okur."""
+    value = QDateTime.fromString(text.strip().replace(" ", "T"), Qt.ISODate)
+    if not value.isValid():
+        raise argparse.ArgumentTypeError(f"Geçersiz zaman: {text}")
+    return value
+
+
+class BellSimulation:
+    """Çekirdeği elle ilerletilen saatle çalıştırır ve zil olaylarını kaydeder."""
+
+    def __init__(self, data, start, record_file=None, work_dir=None):
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="atam-zil-benzetim-")
+        self.clock = ManualClock(start)
+        self.events = [] # Her zil için bir sözlük; benzetim sırasıyla
+        self._reported = set() # (tarih, zil girdisi); yeniden yüklemede geçmiş sayılan ziller bir kez listelensin
+        self.stalls = [] # (başlangıç, süre sn)
+        self.reloads = [] # QDateTime listesi
+
+        # Bölgeler ses atamaları korunarak sanal çıkışa yönlendirilir; yeniden yüklemede de öyle kalır
+        device = FILE_DEVICE_PREFIX + os.path.abspath(record_file) if record_file else NULL_DEVICE
+        audio_zones = data.get("audio_zones") or {DEFAULT_ZONE: {"bell_sound_paths": {}}}
+        for config in audio_zones.values():
+            config["device"] = device
+        data["audio_zones"] = audio_zones
+        data_file = os.path.join(self.work_dir, DATA_FILE_NAME)
+        write_file_atomic(data_file, json.dumps(data, ensure_ascii=False))
+
+        set_clock(self.clock)
+        self.core = OkulZiliCekirdegi(data_file=data_file)
+        self.core.tick_engine.stop() # Tikleri gerçek saat yerine benzetim verir
+        self.core.bellRang.connect(self._on_bell_rang)
+        self.core.bellSkipped.connect(self._on_bell_skipped)
+        self.core.load_all_data()
+
+    def run(self, days, step_secs=1):
+        """Saati days gün boyunca step_secs adımlarla ilerletir ve her adımda tick() çağırır."""
+        end = self.clock.now().addDays(days)
+        stalls = sorted(self.stalls, key=lambda stall: stall[0].toMSecsSinceEpoch())
+        reloads = sorted(self.reloads, key=lambda when: when.toMSecsSinceEpoch())
+        last_processed = self.clock.now()
+        while self.clock.now() < end:
+            now = self.clock.now()
+            if stalls and stalls[0][0] <= now:
+                stall_start, stall_secs = stalls.pop(0)
+                self.clock.set(stall_start.addSecs(stall_secs)) # Takılma boyunca hiç tik gelmez
+                now = self.clock.now()
+            self.core.tick(now)
+            while reloads and reloads[0] <= now:
+                reloads.pop(0)
+                self.core.load_all_data() # Dosya izleyicisinin tikten sonra tetiklediği yeniden yükleme
+            if last_processed.secsTo(now) >= PROCESS_EVENTS_EVERY_SECS:
+                QCoreApplication.processEvents()
+                last_processed = now
+            self.clock.advance(step_secs)
+
+    def close(self):
+        self.core.data_store.flush()
+        set_clock(None)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def summary(self):
+        counts = Counter(event["outcome"] for event in self.events)
+        return {outcome: counts.get(outcome, 0) for outcome in OUTCOME_LABELS}
+
+    def _add_event(self, day, entry, outcome):
+        now = self.clock.now()
+        self._reported.add((now.date().toJulianDay(), tuple(entry)))
+        scheduled_secs, session, lesson_key, bell_type = entry
+        self.events.append({
+            "time": now.toString("yyyy-MM-dd HH:mm:ss"),
+            "day": day,
+            "scheduled": seconds_to_time_str(scheduled_secs),
+            "late_secs": QTime(0, 0).secsTo(now.time()) - scheduled_secs,
+            "session": session,
+            "lesson": lesson_key,
+            "bell_type": bell_type,
+            "outcome": outcome,
+        })
+        return self.events[-1]
+
+    def _on_bell_rang(self, day, session, lesson_key, bell_type):
+        timeline = self.core.today_timeline[:self.core.next_bell_index]
+        entry = next(entry for entry in reversed(timeline) if entry[1:] == (session, lesson_key, bell_type))
+        event = self._add_event(day, entry, FIRED)
+        # Sanal çıkışın kayıtları her zilden sonra boşaltılır; böylece kayıt geçmişinin sınırı aşılmaz
+        event["zones"] = []
+        for pool in get_audio_router().pools.values():
+            if pool.virtual_sink is not None:
+                event["zones"].extend(record["zone"] for record in pool.virtual_sink.records)
+                pool.virtual_sink.records.clear()
+
+    def _on_bell_skipped(self, day, entry, reason):
+        if reason == SKIP_MARKED_PAST and (self.clock.now().date().toJulianDay(), tuple(entry)) in self._reported:
+            return # Daha önce kaçırıldığı veya sesi olmadığı için listelenmiş
+        self._add_event(day, entry, reason)
+
+
+def format_event(event):
+    line = (f"{event['time']}  {OUTCOME_LABELS[event['outcome']]:<14} {event['day']} "
+            f"{event['scheduled']} {event['session']} {event['lesson']} {event['bell_type']}")
+    if event["late_secs"] > 1:
+        line += f" ({event['late_secs']} sn gecikme)"
+    if event.get("zones"):
+        line += f" [{', '.join(event['zones'])}]"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ATAM Okul Zili çizelgesini hızlandırılmış zamanda oynatır.")
+    parser.add_argument("--data-file", help=f"Oynatılacak veri dosyası (varsayılan: uygulama veri dizinindeki {DATA_FILE_NAME}). Dosya değiştirilmez.")
+    parser.add_argument("--start", type=parse_datetime, help="Benzetimin başladığı an (varsayılan: bugün 00:00).")
+    parser.add_argument("--days", type=int, default=7, help="Oynatılacak gün sayısı (varsayılan: 7).")
+    parser.add_argument("--step", type=int, default=1, help="Tikler arası benzetim süresi, sn (varsayılan: 1).")
+    parser.add_argument("--stall", nargs=2, action="append", default=[], metavar=("ZAMAN", "SN"),
+                        help="Verilen andan itibaren SN saniye hiç tik gelmez (olay döngüsü takılması). Birden fazla verilebilir.")
+    parser.add_argument("--reload-at", type=parse_datetime, action="append", default=[], metavar="ZAMAN",
+                        help="Verilen anda veri dosyası yeniden yüklenir. Birden fazla verilebilir.")
+    parser.add_argument("--record", help="Sanal çıkışa giden sesleri JSON satırları olarak bu dosyaya da yazar.")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazar.")
+    parser.add_argument("--log", action="store_true", help="Uygulama kayıtlarını da konsola yazar.")
+    args = parser.parse_args(argv)
+    if args.days < 1 or args.step < 1:
+        parser.error("--days ve --step en az 1 olmalıdır.")
+    try:
+        stalls = [(parse_datetime(when), int(secs)) for when, secs in args.stall]
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(f"--stall: {e}")
+
+    if args.log:
+        setup_logging()
+    app = QCoreApplication(sys.argv[:1])
+
+    data_file = args.data_file or os.path.join(get_app_data_directory(), DATA_FILE_NAME)
+    data = JournaledDataStore(data_file).load() or {}
+    start = args.start or QDateTime(QDateTime.currentDateTime().date(), QTime(0, 0))
+
+    simulation = BellSimulation(data, start, record_file=args.record)
+    simulation.stalls = stalls
+    simulation.reloads = args.reload_at
+    try:
+        simulation.run(args.days, args.step)
+    finally:
+        app.processEvents()
+        simulation.close()
+
+    summary = simulation.summary()
+    if args.json:
+        print(json.dumps({"start": start.toString(Qt.ISODate), "days": args.days, "step_secs": args.step,
+                          "summary": summary, "events": simulation.events}, ensure_ascii=False, indent=2))
+    else:
+        for event in simulation.events:
+            print(format_event(event))
+        print(", ".join(f"{OUTCOME_LABELS[outcome]}: {count}" for outcome, count in summary.items()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,775 @@
+#!/usr/bin/env python3
+"""ATAM Okul Zili zamanlayıcı çekirdeği.
+
+Zil çizelgesini, kayıtlı verileri ve zamanında zil çalmayı arayüzden bağımsız olarak yönetir.
+Masaüstü oturumu olmayan makinelerde tek başına çalıştırılabilir:
+
+    python3 /usr/share/Atam_Okul_Zili/zil_cekirdegi.py --daemon
+"""
+
+import sys
+from PyQt5.QtCore import (QObject, QCoreApplication, QTimer, QTime, QDateTime, QElapsedTimer,
+                          QFileSystemWatcher, QLockFile, QSocketNotifier, Qt, pyqtSignal)
+
+import argparse
+import os
+import platform
+import signal
+import socket
+from bisect import bisect_left
+from itertools import takewhile
+
+from ders_cizelgesi import (Schedule, BELL_TYPES, SECONDS_PER_DAY, DEFAULT_BELL_PRIORITIES, seconds_to_time_str,
+                            select_bell, find_conflicts)
+from takvim import BellCalendar
+from gecikme_olcumu import BellLatencyTracker, METRICS_FILE_NAME
+from veri_deposu import JournaledDataStore
+from ses_oynatici import (get_audio_router, get_sound_cache, configure_zones, is_playing, preload_sounds, prepare_sound,
+                          zone_channel_name, ALL_ZONES, DEFAULT_ZONE, DEFAULT_DEVICE)
+from ses_analizi import get_sound_analyzer, ANALYSIS_CACHE_FILE_NAME
+from calma_planlayici import (get_playback_scheduler, PRIORITY_BELL, PRIORITY_CEREMONY, PRIORITY_EMERGENCY,
+                              STARTED, QUEUED, DROPPED, FAILED)
+from melodi_kutuphanesi import MelodyLibrary, LIBRARY_DB_FILE_NAME, MELODILER_BASE_PATH, USER_SOUNDS_DIR_NAME
+from baslangic_olcumu import StartupProfile
+from loglama import get_logger, setup_logging
+from saat import get_clock
+
+log = get_logger(__name__)
+
+# Bu yollar, .deb paketi kurulumunda `/usr/share/Atam_Okul_Zili/` altına yerleştirilmelidir.
+SIRENLER_BASE_PATH = "/usr/share/Atam_Okul_Zili/sirenler/"
+DATA_FILE_NAME = "okul_zili_data.json"
+LOCK_FILE_NAME = "okul_zili.lock" # Aynı veri dizininde tek bir çekirdek çalışsın diye
+PREROLL_MSECS = 5000 # Zilin sesi, çalınacağı andan bu kadar önce hazırlanır
+SAVE_DEBOUNCE_MSECS = 2000 # Düzenlemelerden sonra tam kaydın ertelendiği süre
+DEFAULT_CATCH_UP_WINDOW_SECS = 120 # Takılma yüzünden kaçırılan zil en fazla bu kadar gecikmeyle yine çalınır
+ON_TIME_TOLERANCE_SECS = 1 # Bu kadar gecikme zamanında sayılır; fazlası kaçırılmış zil olarak telafi edilir
+
+# bellSkipped nedenleri
+SKIP_ALREADY_RUNG = "already_rung" # bells_rung_today'de var; bugün zaten çaldı ya da çalmış sayıldı
+SKIP_MISSED = "missed" # gecikme telafi penceresini aştı
+SKIP_NO_SOUND = "no_sound" # hiçbir bölgede ses atanmamış
+SKIP_MERGED = "merged" # aynı anda çalan daha öncelikli zille birleştirildi
+SKIP_MARKED_PAST = "marked_past" # açılışta, yeniden yüklemede veya gün dönümünde zamanı geçmiş bulundu
+DEFAULT_CONTROL_PORT = 8765 # Uzaktan denetim arayüzünün varsayılan kapısı
+DEFAULT_BELL_MAX_DURATION_SECS = 60 # Zil olarak atanan şarkılar en fazla bu kadar çalar; 0 sınırsız
+
+# Özel durum sesleri: SIRENLER_BASE_PATH altındaki dosya adları
+SPECIAL_SOUND_FILES = {
+    "ten_kasim": "10 KASIM siren ve İstiklal Marşı bileşik.mp3",
+    "istiklal_marsi": "İSTİKLAL MARŞI.mp3",
+    "saygi_ti": "saygı_ti.mp3",
+    "deprem": "deprem.mp3",
+    "yangin": "yangın.mp3",
+}
+SPECIAL_SOUND_PRIORITIES = {
+    "ten_kasim": PRIORITY_CEREMONY,
+    "istiklal_marsi": PRIORITY_CEREMONY,
+    "saygi_ti": PRIORITY_CEREMONY,
+    "deprem": PRIORITY_EMERGENCY,
+    "yangin": PRIORITY_EMERGENCY,
+}
+
+
+def get_app_data_directory():
+    """İşletim sistemine göre uygulama veri dizinini döndürür."""
+    if platform.system() == "Windows":
+        # %APPDATA% dizini (C:\Users\<User>\AppData\Roaming)
+        app_data_path = os.path.join(os.getenv('APPDATA'), "ATAM Okul Zili")
+    elif platform.system() == "Darwin": # macOS
+        app_data_path = os.path.join(os.path.expanduser('~'), "Library", "Application Support", "ATAM Okul Zili")
+    else: # Linux ve diğer Unix benzeri sistemler
+        app_data_path = os.path.join(os.path.expanduser('~'), ".ATAM Okul Zili") # Gizli klasör önerisi
+
+    # Dizinin mevcut olduğundan emin olun, yoksa oluşturun
+    os.makedirs(app_data_path, exist_ok=True)
+    return app_data_path
+
+def day_name_for_date(date_obj):
+    """QDate için Türkçe gün adını döndürür."""
+    day_names_turkish_list = ["Pazar", "Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi"]
+    return day_names_turkish_list[date_obj.dayOfWeek() % 7] # 7 (Pazar) -> 0, 1 (Pazartesi) -> 1 ...
+
+
+# --- Tik Üreteci ---
+class TickEngine(QObject):
+    """Duvar saatinin saniye sınırlarına hizalanmış, aralıkları monoton saatle ölçen tik üreteci.
+
+    Her tik bir sonraki saniye sınırına yeniden kurulduğu için hata birikmez. Olay döngüsü
+    takılıp tikler atlanırsa bunu fark eder ve bildirir; gözlenen sapmayı istatistik olarak tutar.
+    """
+    ticked = pyqtSignal(QDateTime)
+    stallDetected = pyqtSignal(int) # atlanan tik sayısı
+
+    ALIGN_OFFSET_MSECS = 5 # Sınırın hemen ardından uyanılır; böylece saniye bir önceki değerde okunmaz
+    CLOCK_JUMP_THRESHOLD_MSECS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self._monotonic = QElapsedTimer()
+        self._last_monotonic_ms = None
+        self._last_wall_ms = None
+
+        self.tick_count = 0
+        self.skipped_ticks = 0
+        self.max_stall_ms = 0
+        self.clock_jumps = 0
+        self.last_drift_ms = 0
+        self.max_drift_ms = 0
+        self._abs_drift_sum = 0
+
+    def start(self):
+        self._monotonic.start()
+        self._arm()
+
+    def stop(self):
+        self._timer.stop()
+
+    def _arm(self):
+        now_msecs = QDateTime.currentMSecsSinceEpoch()
+        self._timer.start(1000 - now_msecs % 1000 + self.ALIGN_OFFSET_MSECS)
+
+    def _on_timeout(self):
+        current_datetime = QDateTime.currentDateTime()
+        wall_ms = current_datetime.toMSecsSinceEpoch()
+        monotonic_ms = self._monotonic.elapsed()
+
+        # Hedeflenen andan (saniye sınırı + ofset) işaretli sapma
+        drift_ms = (wall_ms - self.ALIGN_OFFSET_MSECS + 500) % 1000 - 500
+        self.tick_count += 1
+        self.last_drift_ms = drift_ms
+        self.max_drift_ms = max(self.max_drift_ms, abs(drift_ms))
+        self._abs_drift_sum += abs(drift_ms)
+
+        if self._last_monotonic_ms is not None:
+            elapsed_ms = monotonic_ms - self._last_monotonic_ms
+            skipped = max(0, round(elapsed_ms / 1000) - 1)
+            if skipped:
+                self.skipped_ticks += skipped
+                self.max_stall_ms = max(self.max_stall_ms, elapsed_ms)
+                log.warning("Olay döngüsü %d ms takıldı, %d tik atlandı.", elapsed_ms, skipped)
+                self.stallDetected.emit(skipped)
+            if abs((wall_ms - self._last_wall_ms) - elapsed_ms) > self.CLOCK_JUMP_THRESHOLD_MSECS:
+                self.clock_jumps += 1
+                log.warning("Sistem saati %d ms atladı.", (wall_ms - self._last_wall_ms) - elapsed_ms)
+        self._last_monotonic_ms = monotonic_ms
+        self._last_wall_ms = wall_ms
+
+        self._arm()
+        self.ticked.emit(current_datetime)
+
+    def drift_report(self):
+        """Gözlenen sapma ve takılma istatistiklerini döndürür."""
+        return {
+            "ticks": self.tick_count,
+            "skipped_ticks": self.skipped_ticks,
+            "max_stall_ms": self.max_stall_ms,
+            "clock_jumps": self.clock_jumps,
+            "last_drift_ms": self.last_drift_ms,
+            "max_drift_ms": self.max_drift_ms,
+            "mean_abs_drift_ms": round(self._abs_drift_sum / self.tick_count, 1) if self.tick_count else 0,
+        }
+
+
+class AlreadyRunningError(RuntimeError):
+    """Aynı veri dizininde başka bir çekirdek (arayüzsüz kip veya başka bir pencere) çalışıyor."""
+
+
+# --- Zamanlayıcı Çekirdeği ---
+class OkulZiliCekirdegi(QObject):
+    """Zil saatlerini ve ayarları tutar, kaydeder/yükler ve zili zamanında çalar.
+
+    Arayüz içermez; ana pencere bu nesneye bağlanan isteğe bağlı bir ön yüzdür.
+    """
+    bellRang = pyqtSignal(str, str, str, str) # gün, oturum, ders, zil tipi
+    bellSkipped = pyqtSignal(str, object, str) # gün, zil girdisi (sn, oturum, ders, zil tipi), SKIP_* nedeni
+    playbackFailed = pyqtSignal(str) # hata mesajı
+    saveFailed = pyqtSignal(str) # hata mesajı; yazıcı iş parçacığından kuyruklu bağlantıyla gelir
+    dataLoaded = pyqtSignal()
+    manualPlayback = pyqtSignal(str) # elle (arayüzden veya uzaktan) çalınan zil tipi ya da özel ses adı
+    assignmentInvalid = pyqtSignal(str, str) # zil olarak atanmış ses dosyası, sorun; arka plan denetimi bulduğunda
+
+    def __init__(self, data_file=None, parent=None):
+        super().__init__(parent)
+        self.bell_sound_paths = {bt: "" for bt in BELL_TYPES}
+        self.school_name_text = "Ayarlardan Okul Adınızı Giriniz"
+        self.school_logo_path = ""
+        self.catch_up_window_secs = DEFAULT_CATCH_UP_WINDOW_SECS
+        self.bell_max_durations = {bt: DEFAULT_BELL_MAX_DURATION_SECS for bt in BELL_TYPES} # zil tipi -> saniye
+        self.bell_priorities = dict(DEFAULT_BELL_PRIORITIES) # Aynı anda çalacak zillerden önceliği büyük olan çalar
+        # Ses bölgeleri: {bölge: {"device": aygıt, "bell_sound_paths": {zil tipi: yol}}}.
+        # Bölgede atanmamış zil tipleri için genel bell_sound_paths kullanılır.
+        self.audio_zones = {DEFAULT_ZONE: {"device": DEFAULT_DEVICE, "bell_sound_paths": {}}}
+        # Bu makineden (127.0.0.1) zil/siren çaldırmak için HTTP/JSON denetim arayüzü; boş anahtar doğrulamayı kapatır
+        self.control_api_settings = {"enabled": False, "port": DEFAULT_CONTROL_PORT, "token": ""}
+        self.control_api = None
+        # Ses çözme, kütüphane taraması ve denetim arayüzü, çizelge kurulup zil çalmaya hazır olduktan
+        # sonra start_background_services() ile başlatılır
+        self.background_services_started = False
+
+        if data_file:
+            self.DATA_FILE = os.path.abspath(data_file)
+            self.app_data_dir = os.path.dirname(self.DATA_FILE)
+        else:
+            # JSON dosyasının kaydedileceği uygulama veri dizini
+            self.app_data_dir = get_app_data_directory()
+            self.DATA_FILE = os.path.join(self.app_data_dir, DATA_FILE_NAME)
+
+        # İki çekirdek aynı dosyaları paylaşırsa her zil iki kez çalar, günlük ve kayıtlar birbirini ezer
+        # ve ikisi de denetim arayüzünün kapısını açmaya çalışır; bu yüzden ikincisi hiç başlamaz
+        self.instance_lock = QLockFile(os.path.join(self.app_data_dir, LOCK_FILE_NAME))
+        self.instance_lock.setStaleLockTime(0) # Kilit yalnızca sahibi süreç artık yoksa bayat sayılır
+        if not self.instance_lock.tryLock(0):
+            raise AlreadyRunningError(f"ATAM Okul Zili bu veri dizininde zaten çalışıyor: {self.app_data_dir}")
+        if QCoreApplication.instance() is not None:
+            QCoreApplication.instance().aboutToQuit.connect(self.release_instance_lock)
+
+        self.sirenler_base_path = SIRENLER_BASE_PATH
+        # Seslerin ses yüksekliği analizi; program kapanırken yarım kalan analizler beklenmez
+        get_sound_analyzer().set_cache_file(os.path.join(self.app_data_dir, ANALYSIS_CACHE_FILE_NAME))
+        if QCoreApplication.instance() is not None:
+            QCoreApplication.instance().aboutToQuit.connect(get_sound_analyzer().shutdown)
+
+        # Melodi, siren ve kullanıcı klasörlerindeki seslerin dizini; zil seçimi ve atama denetimi buradan okunur
+        self.melodiler_base_path = MELODILER_BASE_PATH
+        self.user_sounds_dir = os.path.join(self.app_data_dir, USER_SOUNDS_DIR_NAME)
+        try:
+            os.makedirs(self.user_sounds_dir, exist_ok=True)
+        except OSError as e:
+            log.warning("Kullanıcı ses klasörü oluşturulamadı: %s (%s)", self.user_sounds_dir, e)
+        self.melody_library = MelodyLibrary(os.path.join(self.app_data_dir, LIBRARY_DB_FILE_NAME), self)
+        self.melody_library.entryChanged.connect(self._on_library_entry_changed)
+        self._reported_invalid_assignments = set()
+        if QCoreApplication.instance() is not None:
+            QCoreApplication.instance().aboutToQuit.connect(self.melody_library.stop)
+        self.lesson_times = Schedule()
+        self.calendar = BellCalendar() # Tatiller, sınav günleri gibi tarihe özel istisnalar
+
+        # Düzenlemeler günlüğe eklenir; tam kayıt ertelenip arka planda atomik olarak yazılır
+        self.data_store = JournaledDataStore(self.DATA_FILE, on_error=self.saveFailed.emit)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.timeout.connect(self.save_all_data)
+
+        self.bells_rung_today = set()
+        self.last_day_checked = get_clock().now().date()
+
+        # Bugünün derlenmiş zil çizelgesi ve sıradaki zilin indeksi.
+        # Çizelge yalnızca saatler değiştiğinde, veriler yüklendiğinde veya gün döndüğünde yeniden derlenir.
+        self.today_plan = None
+        self.today_timeline = []
+        self.today_timeline_day = None
+        self.next_bell_index = 0
+
+        # Sıradaki zil (gün içinde zil kalmadıysa gece yarısı) için kurulan tek atımlık zamanlayıcı
+        self.bell_timer = QTimer(self)
+        self.bell_timer.setSingleShot(True)
+        self.bell_timer.setTimerType(Qt.PreciseTimer) # Uzun aralıklarda kaba zamanlayıcı dakikalarca kayabilir
+        self.bell_timer.timeout.connect(self._on_bell_timer)
+
+        # Sıradaki zilin kanalını zamanından biraz önce hazırlar; zil anında yalnızca play() kalır
+        self.preroll_timer = QTimer(self)
+        self.preroll_timer.setSingleShot(True)
+        self.preroll_timer.setTimerType(Qt.PreciseTimer)
+        self.preroll_timer.timeout.connect(self._on_preroll_timer)
+
+        # Arka arkaya gelen düzenlemeleri tek bir yeniden derlemede birleştirir
+        self.timeline_rebuild_timer = QTimer(self)
+        self.timeline_rebuild_timer.setSingleShot(True)
+        self.timeline_rebuild_timer.timeout.connect(self.rebuild_today_timeline)
+
+        self.data_file_watcher = None
+
+        # Zil, siren ve marşlar bölge başına öncelik sırasıyla çalınır
+        self.playback = get_playback_scheduler()
+
+        # Planlanan an, eşleşme anı ve sesin başladığı an arasındaki gecikmeler
+        self.latency_tracker = BellLatencyTracker(os.path.join(self.app_data_dir, METRICS_FILE_NAME), self)
+        get_audio_router().audioStarted.connect(self.latency_tracker.on_audio_started)
+
+        # Saniye sınırlarına hizalı tik; gün dönümünü ve takılmadan sonra kaçırılan zilleri yakalar
+        self.tick_engine = TickEngine(self)
+        self.tick_engine.ticked.connect(self.tick)
+        self.latency_tracker.report_providers["tick_drift"] = self.tick_engine.drift_report
+        self.tick_engine.start()
+
+    def set_lesson_time(self, day, session, lesson_key, bell_type, text):
+        text = self.lesson_times.set_text(day, session, lesson_key, bell_type, text)
+        self.data_store.append("lesson_time", day, session, lesson_key, bell_type, text)
+        self.save_timer.start(SAVE_DEBOUNCE_MSECS)
+        self.calendar.invalidate_day(day)
+        if self.today_plan is not None and day == self.today_plan.template_day:
+            self.timeline_rebuild_timer.start(0)
+
+    def replace_lesson_times(self, schedule):
+        """Çizelgeyi topluca değiştirir (içe aktarma, toplu düzenleme). Yuva yuva yazmak yerine tek bir
+        tam kayıt yapılır ve bugünün çizelgesi bir kez derlenir."""
+        self.lesson_times = schedule
+        self.calendar.invalidate_all()
+        self.save_all_data()
+        self.rebuild_today_timeline()
+
+    def add_calendar_override(self, override):
+        self.calendar.add_override(override)
+        self._calendar_changed()
+
+    def remove_calendar_override(self, index):
+        self.calendar.remove_override(index)
+        self._calendar_changed()
+
+    def _calendar_changed(self):
+        self.data_store.append("calendar_overrides", self.calendar.to_json())
+        self.save_timer.start(SAVE_DEBOUNCE_MSECS)
+        self.rebuild_today_timeline()
+
+    def tick(self, current_datetime=None):
+        """Gün dönümünü denetler ve sıradaki zil geldiyse çalar. Maliyeti zil sayısından bağımsızdır."""
+        if current_datetime is None:
+            current_datetime = get_clock().now()
+        current_date_obj = current_datetime.date()
+        current_day_name_turkish = day_name_for_date(current_date_obj)
+
+        if current_date_obj != self.last_day_checked:
+            self.bells_rung_today.clear()
+            self.last_day_checked = current_date_obj
+            log.info("Yeni gün, çalınan ziller sıfırlandı.")
+            self.mark_past_bells_as_rung_for_day(current_day_name_turkish)
+
+        self.check_and_ring_bell(current_day_name_turkish, current_datetime)
+
+    def rebuild_today_timeline(self):
+        """Bugünün gün planını (takvim istisnaları uygulanmış çizelge) alır ve sıradaki zil zamanlayıcısını kurar."""
+        self.timeline_rebuild_timer.stop()
+        self.today_timeline_day = day_name_for_date(self.last_day_checked)
+        self.today_plan = self.calendar.day_plan(self.lesson_times, self.last_day_checked)
+        self.today_timeline = self.today_plan.timeline
+        if self.today_plan.override is not None:
+            override = self.today_plan.override
+            log.info("Bugün için takvim istisnası uygulanıyor: %s %s", override.summary(), override.description)
+
+        # Geçmiş ziller atlanır; bu saniyedekiler bells_rung_today ile tekrar çalmaktan korunur
+        current_secs = QTime(0, 0).secsTo(get_clock().now().time())
+        self.next_bell_index = bisect_left(self.today_timeline, (current_secs,))
+        self._arm_next_bell_timer()
+
+    def _arm_next_bell_timer(self):
+        """Tek atımlık zamanlayıcıyı sıradaki zilin tam saniye sınırına, zil kalmadıysa gece yarısına kurar.
+        Zil, saniyelik tikin evresinden bağımsız olarak hedef anda çalar."""
+        if self.next_bell_index < len(self.today_timeline):
+            target_msecs = self.today_timeline[self.next_bell_index][0] * 1000
+        else:
+            target_msecs = SECONDS_PER_DAY * 1000
+        delay = target_msecs - QTime(0, 0).msecsTo(get_clock().now().time())
+        self.bell_timer.start(max(0, delay))
+
+        if self.next_bell_index < len(self.today_timeline):
+            self.preroll_timer.start(max(0, delay - PREROLL_MSECS))
+        else:
+            self.preroll_timer.stop()
+
+    def _on_preroll_timer(self):
+        """Sıradaki anda çalacak zillerin kanallarını hazırlar."""
+        if self.next_bell_index >= len(self.today_timeline):
+            return
+        next_secs = self.today_timeline[self.next_bell_index][0]
+        entries = list(takewhile(lambda entry: entry[0] == next_secs, self.today_timeline[self.next_bell_index:]))
+        bell_type = select_bell(entries, self.bell_priorities)[3] # Aynı andaki zillerden yalnızca çalacak olan hazırlanır
+        for zone in self.audio_zones:
+            prepare_sound(bell_type, self.zone_bell_sound_path(zone, bell_type), zone)
+
+    def _on_bell_timer(self):
+        self.tick()
+        self._arm_next_bell_timer()
+
+    def check_and_ring_bell(self, day, current_datetime):
+        """Zamanı gelmiş zilleri çalar. Olay döngüsü takıldığı için zamanı geçmiş ziller,
+        gecikme telafi penceresini aşmıyorsa yine de çalınır. Aynı tikte zamanı gelen ziller
+        birbirini kesmesin diye öncelik sırasına göre tek zile indirgenir."""
+        if day != self.today_timeline_day:
+            return # Gün dönümü tick içinde çizelgeyi yeniden derler
+
+        current_secs = QTime(0, 0).secsTo(current_datetime.time())
+        timeline = self.today_timeline
+        advanced = False
+        due_bells = [] # (zil girdisi, bölge -> ses yolu)
+
+        while self.next_bell_index < len(timeline) and timeline[self.next_bell_index][0] <= current_secs:
+            scheduled_secs, session, lesson_key, bell_type = timeline[self.next_bell_index]
+            self.next_bell_index += 1
+            advanced = True
+
+            scheduled_time_str = seconds_to_time_str(scheduled_secs)
+            bell_identifier = (scheduled_time_str, bell_type, day, session, lesson_key)
+            if bell_identifier in self.bells_rung_today:
+                self.bellSkipped.emit(day, timeline[self.next_bell_index - 1], SKIP_ALREADY_RUNG)
+                continue
+
+            late_secs = current_secs - scheduled_secs
+            if late_secs > ON_TIME_TOLERANCE_SECS:
+                if late_secs > self.catch_up_window_secs:
+                    log.warning("%s zili %d sn gecikti, telafi penceresi dışında kaldı; çalınmadı.", scheduled_time_str, late_secs)
+                    self.bellSkipped.emit(day, timeline[self.next_bell_index - 1], SKIP_MISSED)
+                    continue
+                log.warning("Kaçırılan %s zili %d sn gecikmeyle çalınıyor.", scheduled_time_str, late_secs)
+
+            zone_sound_paths = {zone: self.zone_bell_sound_path(zone, bell_type) for zone in self.audio_zones}
+            if any(zone_sound_paths.values()):
+                self.bells_rung_today.add(bell_identifier)
+                due_bells.append(((scheduled_secs, session, lesson_key, bell_type), zone_sound_paths))
+            else:
+                log.warning("'%s' için ses yolu tanımlanmamış. Zil çalmadı: %s", bell_type, scheduled_time_str)
+                self.bellSkipped.emit(day, timeline[self.next_bell_index - 1], SKIP_NO_SOUND)
+
+        if due_bells:
+            ringing = select_bell([entry for entry, _ in due_bells], self.bell_priorities)
+            for entry, zone_sound_paths in due_bells:
+                if entry is ringing:
+                    self._ring_bell(day, entry, zone_sound_paths)
+                else:
+                    log.info("%s %s %s zili aynı anda çalan %s %s %s ziliyle birleştirildi, ayrıca çalınmadı.",
+                             seconds_to_time_str(entry[0]), entry[2], entry[3],
+                             seconds_to_time_str(ringing[0]), ringing[2], ringing[3])
+                    self.bellSkipped.emit(day, entry, SKIP_MERGED)
+
+        if advanced:
+            self._arm_next_bell_timer()
+
+    def _ring_bell(self, day, entry, zone_sound_paths):
+        scheduled_secs, session, lesson_key, bell_type = entry
+        scheduled_time_str = seconds_to_time_str(scheduled_secs)
+        log.info("Zil çalınıyor: Gün=%s, Oturum=%s, Ders=%s, Zil Tipi=%s, Planlanan Saat=%s", day, session, lesson_key, bell_type, scheduled_time_str)
+        due_msecs = QDateTime(self.last_day_checked, QTime(0, 0)).addSecs(scheduled_secs).toMSecsSinceEpoch()
+        # Bölgeler birbirini beklemeden, kendi çıkışlarından aynı anda çalar
+        for zone, sound_path in zone_sound_paths.items():
+            if not sound_path:
+                continue
+            channel_key = zone_channel_name(zone, bell_type)
+            self.latency_tracker.begin(channel_key, f"{day} {scheduled_time_str} {session} {lesson_key} {channel_key}", due_msecs)
+            request = self.playback.submit(sound_path, PRIORITY_BELL, channel=bell_type, zone=zone, label=bell_type)
+            if request.status != STARTED: # Sırada bekleyen zilin gecikmesi çalma gecikmesi sayılmaz
+                self.latency_tracker.cancel(channel_key)
+            if request.status == FAILED:
+                self.playbackFailed.emit(request.error)
+        self.bellRang.emit(day, session, lesson_key, bell_type)
+
+    def bell_play_seconds(self):
+        """Zil tiplerinin beklenen çalma süreleri (sn): en uzun süre ile sesin kütüphanedeki süresinden kısa olanı.
+        İkisi de bilinmeyen zil tipleri listede yer almaz."""
+        play_secs = {}
+        for bell_type in BELL_TYPES:
+            candidates = [self.bell_max_durations.get(bell_type) or None]
+            entry = self.melody_library.entry(self.bell_sound_paths.get(bell_type, ""))
+            if entry is not None and entry.duration_ms:
+                candidates.append(-(-entry.duration_ms // 1000))
+            candidates = [secs for secs in candidates if secs]
+            if candidates:
+                play_secs[bell_type] = min(candidates)
+        return play_secs
+
+    def schedule_conflicts(self, day):
+        """Haftalık çizelgede günün çakışan ve birbirini kesen zilleri (ScheduleConflict listesi)."""
+        return find_conflicts(self.lesson_times, day, self.bell_priorities, self.bell_play_seconds())
+
+    def mark_past_bells_as_rung_for_day(self, day_name_turkish):
+        """Verilen günün çizelgesini derler ve şu andan önceki zilleri çalınmış olarak işaretler."""
+        self.rebuild_today_timeline()
+        if day_name_turkish != self.today_timeline_day:
+            return
+
+        for scheduled_secs, session, lesson_key, bell_type in self.today_timeline[:self.next_bell_index]:
+            scheduled_time_str = seconds_to_time_str(scheduled_secs)
+            bell_identifier = (scheduled_time_str, bell_type, day_name_turkish, session, lesson_key)
+            if bell_identifier not in self.bells_rung_today:
+                self.bellSkipped.emit(day_name_turkish, (scheduled_secs, session, lesson_key, bell_type), SKIP_MARKED_PAST)
+            self.bells_rung_today.add(bell_identifier)
+            log.debug("Geçmiş zil işaretlendi (başlangıçta/gün değişiminde çalmayacak): %s", bell_identifier)
+
+    def zone_bell_sound_path(self, zone, bell_type):
+        """Bölgede çalacak zil sesi; bölgeye özel atama yoksa genel zil sesi."""
+        zone_paths = self.audio_zones.get(zone, {}).get("bell_sound_paths", {})
+        return zone_paths.get(bell_type) or self.bell_sound_paths.get(bell_type, "")
+
+    def set_audio_zones(self, audio_zones):
+        """Ses bölgelerini değiştirir, oynatıcıları yeni aygıtlara yönlendirir ve sesleri yeniden hazırlar."""
+        self.audio_zones = dict(audio_zones)
+        self.audio_zones.setdefault(DEFAULT_ZONE, {"device": DEFAULT_DEVICE, "bell_sound_paths": {}})
+        self.apply_audio_zones()
+        self.save_timer.start(SAVE_DEBOUNCE_MSECS)
+
+    def apply_audio_zones(self):
+        configure_zones({zone: config.get("device", DEFAULT_DEVICE) for zone, config in self.audio_zones.items()})
+        if self.background_services_started:
+            self.preload_sounds()
+            self.refresh_melody_library()
+
+    def start_background_services(self):
+        """Zilin çalmasını beklemeyen işleri başlatır: seslerin belleğe çözülmesi, melodi kütüphanesinin
+        taranması ve denetim arayüzü. Açılış hızlı olsun diye load_all_data bunları ilk yüklemede başlatmaz;
+        o ana kadar çalan ziller diskten çalınır."""
+        if self.background_services_started:
+            return
+        self.background_services_started = True
+        self.preload_sounds()
+        self.refresh_melody_library()
+        self.apply_control_api()
+
+    def assigned_sound_paths(self):
+        """Genel ve bölgelere özel zil sesi olarak atanmış tüm dosyalar."""
+        paths = set(self.bell_sound_paths.values())
+        for config in self.audio_zones.values():
+            paths.update(config.get("bell_sound_paths", {}).values())
+        paths.discard("")
+        return paths
+
+    def sound_assignment_problems(self):
+        """Sorunu bilinen zil sesi atamaları: [(atama adı, dosya yolu, sorun)]."""
+        problems = []
+        for bell_type in BELL_TYPES:
+            path = self.bell_sound_paths.get(bell_type, "")
+            problem = self.melody_library.problem_for(path)
+            if problem:
+                problems.append((bell_type, path, problem))
+        for zone, config in self.audio_zones.items():
+            for bell_type, path in config.get("bell_sound_paths", {}).items():
+                problem = self.melody_library.problem_for(path)
+                if problem:
+                    problems.append((f"{zone} / {bell_type}", path, problem))
+        return problems
+
+    def refresh_melody_library(self):
+        """Ses klasörlerini ve atanmış dosyaları arka planda yeniden dizinletir."""
+        self._reported_invalid_assignments.clear()
+        self.melody_library.refresh([self.melodiler_base_path, self.sirenler_base_path, self.user_sounds_dir],
+                                    self.assigned_sound_paths())
+
+    def _on_library_entry_changed(self, path):
+        if path not in self.assigned_sound_paths() or path in self._reported_invalid_assignments:
+            return
+        problem = self.melody_library.problem_for(path)
+        if problem:
+            self._reported_invalid_assignments.add(path)
+            log.warning("Atanmış zil sesi kullanılamıyor: %s (%s)", path, problem)
+            self.assignmentInvalid.emit(path, problem)
+
+    def play_manual_bell(self, bell_type):
+        """Zil tipinin sesini tüm bölgelerde hemen çalar. Hata olursa mesajı döndürür."""
+        return self._submit_manual(self.bell_sound_paths.get(bell_type), PRIORITY_BELL, bell_type, channel=bell_type)
+
+    def special_sound_path(self, name):
+        return os.path.join(self.sirenler_base_path, SPECIAL_SOUND_FILES[name])
+
+    def play_special_sound(self, name):
+        """Siren veya marşı (SPECIAL_SOUND_FILES anahtarı) tüm bölgelerde çalar. Hata olursa mesajı döndürür."""
+        return self._submit_manual(self.special_sound_path(name), SPECIAL_SOUND_PRIORITIES[name], name)
+
+    def _submit_manual(self, path, priority, label, channel=None):
+        request = self.playback.submit(path, priority, channel=channel, zone=ALL_ZONES, label=label)
+        if request.status in (FAILED, DROPPED):
+            return request.error
+        log.info("Elle çalındı%s: %s", " (sırada)" if request.status == QUEUED else "", label)
+        self.manualPlayback.emit(label)
+        return None
+
+    def stop_sound(self, label):
+        """Yalnızca verilen zil tipinin veya özel sesin çalmasını durdurur, sırada bekliyorsa çıkarır."""
+        self.playback.stop(label=label)
+
+    def stop_all_sounds(self):
+        self.playback.stop()
+
+    def next_bell(self):
+        """Bugün çalacak sıradaki zil (saniye, oturum, ders, zil tipi); kalmadıysa None."""
+        if self.next_bell_index < len(self.today_timeline):
+            return self.today_timeline[self.next_bell_index]
+        return None
+
+    def status_report(self):
+        """Çalma durumu, bugünün planı ve sıradaki zil özeti."""
+        plan = self.today_plan
+        return {
+            "playing": is_playing(),
+            "zones": {zone: is_playing(zone) for zone in self.audio_zones},
+            "playback": self.playback.report(),
+            "date": self.last_day_checked.toString("yyyy-MM-dd"),
+            "day": self.today_timeline_day,
+            "template_day": plan.template_day if plan else None,
+            "override": plan.override.summary() if plan and plan.override else None,
+            "bells_today": len(self.today_timeline),
+            "next_bell": self.next_bell(),
+        }
+
+    def apply_control_api(self):
+        """Denetim arayüzünü ayarlara göre başlatır, yeniden başlatır veya durdurur."""
+        from kontrol_api import ControlApiServer # Arayüz kapalıyken asyncio yüklenmez
+
+        settings = self.control_api_settings
+        if self.control_api is not None:
+            if (settings.get("enabled") and self.control_api.port == settings.get("port")
+                    and self.control_api.token == settings.get("token", "")):
+                return
+            self.control_api.stop()
+            self.control_api = None
+        if not settings.get("enabled"):
+            return
+        server = ControlApiServer(self, port=settings.get("port", DEFAULT_CONTROL_PORT), token=settings.get("token", ""))
+        error_message = server.start()
+        if error_message:
+            log.error("Denetim arayüzü başlatılamadı: %s", error_message)
+            return
+        self.control_api = server
+
+    def save_all_data(self):
+        """Tüm verilerin tam kaydını arka planda yazdırır; çağıranı bekletmez.
+        Yazma hatası saveFailed sinyaliyle bildirilir."""
+        self.save_timer.stop()
+        data = {
+            "school_name": self.school_name_text,
+            "school_logo_path": self.school_logo_path,
+            "bell_sound_paths": self.bell_sound_paths,
+            "catch_up_window_seconds": self.catch_up_window_secs,
+            "bell_max_durations": self.bell_max_durations,
+            "bell_priorities": self.bell_priorities,
+            "audio_zones": self.audio_zones,
+            "control_api": self.control_api_settings,
+            "lesson_times": self.lesson_times.to_json(),
+            "calendar_overrides": self.calendar.to_json(),
+        }
+        self.data_store.save_snapshot(data)
+
+    def flush_data(self, timeout=5.0):
+        """Bekleyen tüm kayıtların diske yazılmasını bekler (ör. program kapanırken)."""
+        if self.save_timer.isActive():
+            self.save_all_data()
+        self.latency_tracker.flush()
+        get_sound_analyzer().flush()
+        return self.data_store.flush(timeout)
+
+    def release_instance_lock(self):
+        """Tek kopya kilidini bırakır (ör. pencere kapanırken); böylece arayüzsüz kip hemen başlatılabilir."""
+        self.instance_lock.unlock()
+
+    def load_all_data(self):
+        """Son kaydı ve günlükteki sonraki düzenlemeleri yükler, bugünün çizelgesini kurar.
+        Dosya okunamazsa istisna fırlatır; çizelge yine de mevcut verilerle kurulur."""
+        try:
+            data = self.data_store.load()
+            if data is not None:
+                self.school_name_text = data.get("school_name", self.school_name_text)
+                self.school_logo_path = data.get("school_logo_path", self.school_logo_path)
+                self.bell_sound_paths = data.get("bell_sound_paths", self.bell_sound_paths)
+                self.catch_up_window_secs = data.get("catch_up_window_seconds", self.catch_up_window_secs)
+                self.bell_max_durations.update(data.get("bell_max_durations", {}))
+                self.bell_priorities.update(data.get("bell_priorities", {}))
+                self.audio_zones = data.get("audio_zones") or self.audio_zones
+                self.audio_zones.setdefault(DEFAULT_ZONE, {"device": DEFAULT_DEVICE, "bell_sound_paths": {}})
+                self.control_api_settings.update(data.get("control_api", {}))
+
+                self.lesson_times = Schedule.from_json(data.get("lesson_times", {}))
+                self.calendar = BellCalendar.from_json(data.get("calendar_overrides", []))
+
+                log.info("Tüm veriler '%s' dosyasından yüklendi.", self.DATA_FILE)
+            else:
+                log.info("'%s' dosyası bulunamadı, varsayılan veriler kullanılıyor.", self.DATA_FILE)
+        finally:
+            self.mark_past_bells_as_rung_for_day(day_name_for_date(get_clock().now().date()))
+            self.apply_audio_zones()
+            if self.background_services_started:
+                self.apply_control_api()
+        self.dataLoaded.emit()
+
+    def preload_sounds(self):
+        """Zil ve siren seslerini zil anından önce arka planda belleğe çözer."""
+        zone_bell_sound_paths = {zone: {bell_type: self.zone_bell_sound_path(zone, bell_type) for bell_type in BELL_TYPES}
+                                 for zone in self.audio_zones}
+        preload_sounds(zone_bell_sound_paths, self.sirenler_base_path,
+                       {bell_type: secs * 1000 for bell_type, secs in self.bell_max_durations.items()})
+
+    def watch_data_file(self):
+        """Veri dosyası dışarıdan (ör. arayüz tarafından) değiştirildiğinde verileri yeniden yükler.
+        Dizindeki diğer dosyaların (ölçümler, günlük, kayıtlar) ve programın kendi kayıtlarının
+        değişmesi yeniden yükleme yapmaz."""
+        self.data_file_watcher = QFileSystemWatcher(self)
+        # Dosya yeniden adlandırılarak yazıldığında izleme düşer; dizin yalnızca izlemeyi yeniden kurmak için izlenir
+        self.data_file_watcher.addPath(self.app_data_dir)
+        if os.path.exists(self.DATA_FILE):
+            self.data_file_watcher.addPath(self.DATA_FILE)
+
+        reload_timer = QTimer(self)
+        reload_timer.setSingleShot(True)
+        reload_timer.timeout.connect(self._reload_watched_data_file)
+        self.data_file_watcher.fileChanged.connect(lambda _: reload_timer.start(500))
+        self.data_file_watcher.directoryChanged.connect(lambda _: reload_timer.start(500))
+
+    def _reload_watched_data_file(self):
+        if os.path.exists(self.DATA_FILE) and self.DATA_FILE not in self.data_file_watcher.files():
+            self.data_file_watcher.addPath(self.DATA_FILE)
+        if not self.data_store.changed_on_disk():
+            return
+        log.info("Veri dosyası dışarıdan değiştirildi, yeniden yükleniyor.")
+        try:
+            self.load_all_data()
+        except Exception as e:
+            log.warning("Veriler yeniden yüklenemedi: %s", e)
+
+
+def _install_quit_signal_handlers(app):
+    """SIGTERM/SIGINT geldiğinde Qt olay döngüsünü düzgünce sonlandırır."""
+    read_sock, write_sock = socket.socketpair()
+    read_sock.setblocking(False)
+    write_sock.setblocking(False)
+    signal.set_wakeup_fd(write_sock.fileno())
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: app.quit())
+
+    # Sinyal geldiğinde soket okunabilir olur ve Python işleyicisi çalışma fırsatı bulur
+    notifier = QSocketNotifier(read_sock.fileno(), QSocketNotifier.Read, app)
+    notifier.activated.connect(lambda _: read_sock.recv(64))
+    app._quit_signal_sockets = (read_sock, write_sock, notifier)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ATAM Okul Zili arayüzsüz zamanlayıcı.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Arayüz olmadan çalışır ve zilleri kayıtlı çizelgeye göre çalar.")
+    parser.add_argument("--data-file", help=f"Kullanılacak veri dosyası (varsayılan: uygulama veri dizinindeki {DATA_FILE_NAME}).")
+    parser.add_argument("--debug", action="store_true", help="Hata ayıklama (DEBUG) kayıtlarını da yazar.")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Açılış aşamalarına (zilin çalmaya hazır olması, seslerin çözülmesi) kadar geçen süreyi kayıtlara yazar.")
+    args = parser.parse_args(argv)
+
+    if not args.daemon:
+        parser.print_help()
+        return 2
+
+    log_dir = os.path.dirname(os.path.abspath(args.data_file)) if args.data_file else get_app_data_directory()
+    setup_logging(log_dir, debug=args.debug or None)
+
+    startup_profile = StartupProfile(enabled=args.startup_profile)
+    startup_profile.mark("imports")
+    app = QCoreApplication(sys.argv[:1])
+    _install_quit_signal_handlers(app)
+
+    try:
+        core = OkulZiliCekirdegi(data_file=args.data_file)
+    except AlreadyRunningError as e:
+        log.error("%s. İkinci kopya başlatılmadı.", e)
+        return 1
+    core.playbackFailed.connect(lambda message: log.warning("%s", message))
+    try:
+        core.load_all_data()
+    except Exception as e:
+        log.error("Yükleme Hatası: Veriler yüklenirken bir hata oluştu: %s", e)
+    startup_profile.mark("ready_to_ring")
+    core.watch_data_file()
+    core.start_background_services()
+    startup_profile.mark("background_services")
+    startup_profile.watch_sounds(get_sound_cache(), core.assigned_sound_paths())
+
+    log.info("ATAM Okul Zili arayüzsüz kipte çalışıyor.")
+    return app.exec_()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""ATAM Okul Zili başarım ölçümleri.
+
+Arayüzsüz (QT_QPA_PLATFORM=offscreen) ve sesi hiçbir yere göndermeyen "null" ses bölgesiyle çalışır;
+kullanıcının veri dizinine dokunmamak için geçici bir HOME dizini kullanır. Ölçülenler:
+
+    - saniyelik tikin (çekirdek tick + pencere updateTime) maliyeti, dolu ve seyrek çizelgeyle
+    - veri yükleme (_load_all_data) ve kaydetme (_save_all_data + diske yazma) hızı
+    - ana pencerenin kurulma süresi ve bileşen (widget) sayısı
+    - Ayarlar ve Özel Durumlar pencerelerinin açılma süresi
+
+Sonuçlar baseline.json'daki temel değerlerle karşılaştırılır; bir ölçüm izin verilen paydan fazla
+kötüleşirse çıkış kodu 1 olur. Tekrarlanan ölçümlerde gürültüden en az etkilenen en kısa süre alınır. Temel değerler makineye özeldir: depodaki baseline.json tek bir geliştirici makinesinde kaydedilmiştir
+ve CI'da kullanılmadan önce o makinede (ya da donanım değiştiğinde) --update-baseline ile yeniden kaydedilmelidir.
+
+    python3 benchmarks/zil_kiyaslama.py
+    python3 benchmarks/zil_kiyaslama.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import wave
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCHMARK_DIR, os.pardir, "atam-okul-zili", "usr", "share", "Atam_Okul_Zili")
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_TOLERANCE = 0.5 # Süre ölçümlerinde temel değerin %50 fazlasına kadar gerileme sayılmaz
+TICK_COUNT = 3600 # Bir saatlik saniyelik tik
+TICK_START_SECS = 7 * 3600 # Tiklerin başladığı saat (07:00); dolu çizelgenin ilk zilleri bu saatte
+LOAD_SAVE_REPEATS = 20
+WINDOW_REPEATS = 5
+DIALOG_REPEATS = 10
+
+# Ölçüm adı -> (birim, izin verilen kötüleşme payı); widget sayısı gibi sayımlar hiç artmamalıdır
+METRICS = {
+    "tick_full_mean_us": ("µs", DEFAULT_TOLERANCE),
+    "tick_full_max_us": ("µs", 2.0), # En kötü tik zil çalmayı da içerir, oynaktır
+    "tick_sparse_mean_us": ("µs", DEFAULT_TOLERANCE),
+    "load_all_data_ms": ("ms", DEFAULT_TOLERANCE),
+    "save_all_data_ms": ("ms", DEFAULT_TOLERANCE),
+    "main_window_init_ms": ("ms", DEFAULT_TOLERANCE),
+    "main_window_widgets": ("adet", 0.0),
+    "settings_window_open_ms": ("ms", DEFAULT_TOLERANCE),
+    "special_situations_window_open_ms": ("ms", DEFAULT_TOLERANCE),
+}
+
+
+def full_schedule_json():
+    """Her gün iki oturumda dokuzar ders ve her derste üç zil: 7 x 2 x 9 x 3 = 378 zil."""
+    from ders_cizelgesi import DAY_NAMES, SESSIONS, LESSON_KEYS, seconds_to_time_str
+    session_starts = {SESSIONS[0]: 7 * 3600, SESSIONS[1]: 13 * 3600 + 50 * 60}
+    lesson_times = {}
+    for day in DAY_NAMES:
+        lesson_times[day] = {}
+        for session in SESSIONS:
+            lesson_times[day][session] = {}
+            for index, lesson_key in enumerate(LESSON_KEYS):
+                start = session_starts[session] + index * 45 * 60
+                lesson_times[day][session][lesson_key] = {
+                    "Öğretmenler": seconds_to_time_str(start - 120),
+                    "İçeri": seconds_to_time_str(start),
+                    "Teneffüs": seconds_to_time_str(start + 40 * 60),
+                }
+    return lesson_times
+
+def sparse_schedule_json():
+    """Her gün yalnızca ilk dersin iki zili."""
+    from ders_cizelgesi import DAY_NAMES
+    return {day: {"Sabah": {"1.Ders": {"İçeri": "07:00", "Teneffüs": "07:40"}}} for day in DAY_NAMES}
+
+def write_bell_sound(path):
+    """Zil sesi olarak kullanılacak bir saniyelik sessiz WAV dosyası."""
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(44100)
+        wav_file.writeframes(bytes(44100 * 4))
+
+def write_data_file(data_file, lesson_times):
+    from ders_cizelgesi import BELL_TYPES
+    from ses_oynatici import DEFAULT_ZONE, NULL_DEVICE
+    os.makedirs(os.path.dirname(data_file), exist_ok=True)
+    bell_sound_path = os.path.join(os.path.dirname(data_file), "kiyaslama_zili.wav")
+    write_bell_sound(bell_sound_path)
+    data = {
+        "school_name": "Kıyaslama Okulu",
+        "bell_sound_paths": {bell_type: bell_sound_path for bell_type in BELL_TYPES},
+        "audio_zones": {DEFAULT_ZONE: {"device": NULL_DEVICE, "bell_sound_paths": {}}},
+        "lesson_times": lesson_times,
+    }
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _elapsed_ms(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+def _delete_window(app, widget):
+    widget.close()
+    widget.deleteLater()
+    app.processEvents()
+
+def measure_ticks(app, window, lesson_times):
+    """Bir saatlik saniyelik tiki (çekirdek tick + pencere updateTime) çalıştırır.
+    Tik başına süreleri (µs) ve çalan zil sayısını döndürür."""
+    from bisect import bisect_left
+    from PyQt5.QtCore import QDate, QDateTime, QTime
+    from ders_cizelgesi import Schedule
+
+    core = window.core
+    core.bells_rung_today.clear()
+    # Doğrudan atamak takvimin önbelleğe aldığı günlük planı eskisiyle bırakırdı
+    core.replace_lesson_times(Schedule.from_json(lesson_times))
+    # Gerçek saatten bağımsız olarak ölçüm penceresindeki ziller çalsın
+    core.next_bell_index = bisect_left(core.today_timeline, (TICK_START_SECS,))
+    start = QDateTime(QDate.currentDate(), QTime(0, 0)).addSecs(TICK_START_SECS)
+    rung = []
+    core.bellRang.connect(rung.append)
+    durations_us = []
+    for second in range(TICK_COUNT):
+        current = start.addSecs(second)
+        started = time.perf_counter()
+        core.tick(current)
+        window.updateTime(current)
+        durations_us.append((time.perf_counter() - started) * 1e6)
+        if second % 60 == 0:
+            app.processEvents() # Zil çalınca kurulan zamanlayıcılar ve sinyaller birikmesin
+    core.bellRang.disconnect(rung.append)
+    core.stop_all_sounds()
+    return durations_us, len(rung)
+
+def run_benchmarks():
+    from PyQt5.QtWidgets import QApplication, QWidget
+    import atam_okul_zili as gui
+    from ders_cizelgesi import Schedule
+    from zil_cekirdegi import get_app_data_directory, DATA_FILE_NAME
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    data_file = os.path.join(get_app_data_directory(), DATA_FILE_NAME)
+    write_data_file(data_file, full_schedule_json())
+    results = {}
+
+    init_times, widget_counts = [], []
+    for _ in range(WINDOW_REPEATS):
+        windows = []
+        init_times.append(_elapsed_ms(lambda: windows.append(gui.OkulZiliProgrami())))
+        widget_counts.append(len(windows[0].findChildren(QWidget)))
+        _delete_window(app, windows[0])
+    results["main_window_init_ms"] = min(init_times)
+    results["main_window_widgets"] = max(widget_counts)
+
+    window = gui.OkulZiliProgrami()
+    window.show()
+    app.processEvents()
+
+    tick_full, bells_rung = measure_ticks(app, window, full_schedule_json())
+    if not bells_rung:
+        raise RuntimeError("Tik ölçümünde hiç zil çalmadı; ölçüm zil çalma maliyetini içermiyor.")
+    results["tick_full_mean_us"] = statistics.fmean(tick_full)
+    results["tick_full_max_us"] = max(tick_full)
+    results["tick_sparse_mean_us"] = statistics.fmean(measure_ticks(app, window, sparse_schedule_json())[0])
+
+    window.core.replace_lesson_times(Schedule.from_json(full_schedule_json())) # Kayıt ve yükleme dolu çizelgeyle ölçülür
+    save_times, load_times = [], []
+    for _ in range(LOAD_SAVE_REPEATS):
+        save_times.append(_elapsed_ms(lambda: (window._save_all_data(), window.core.flush_data())))
+        load_times.append(_elapsed_ms(window._load_all_data))
+    results["save_all_data_ms"] = min(save_times)
+    results["load_all_data_ms"] = min(load_times)
+
+    for metric, dialog_class in (("settings_window_open_ms", gui.SettingsWindow),
+                                 ("special_situations_window_open_ms", gui.SpecialSituationsWindow)):
+        open_times = []
+        for _ in range(DIALOG_REPEATS):
+            dialogs = []
+            def open_dialog():
+                dialogs.append(dialog_class(window))
+                dialogs[0].show()
+                app.processEvents()
+            open_times.append(_elapsed_ms(open_dialog))
+            _delete_window(app, dialogs[0])
+        results[metric] = min(open_times)
+
+    window.core.flush_data()
+    _delete_window(app, window)
+    return results
+
+
+def environment_summary():
+    from PyQt5.QtCore import QT_VERSION_STR
+    return {"python": platform.python_version(), "qt": QT_VERSION_STR, "machine": platform.machine(),
+            "system": platform.system(), "recorded": time.strftime("%Y-%m-%d")}
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def compare(results, baseline):
+    """Her ölçüm için (ad, değer, temel değer, oran, gerileme mi) satırlarını döndürür."""
+    rows = []
+    baseline_metrics = baseline.get("metrics", {}) if baseline else {}
+    for name, value in results.items():
+        reference = baseline_metrics.get(name)
+        if reference is None:
+            rows.append((name, value, None, None, False))
+            continue
+        tolerance = reference.get("tolerance", METRICS[name][1])
+        ratio = value / reference["value"] if reference["value"] else None
+        regressed = value > reference["value"] * (1 + tolerance)
+        rows.append((name, value, reference["value"], ratio, regressed))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ATAM Okul Zili başarım ölçümleri (arayüzsüz, sessiz).")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Karşılaştırılacak temel değer dosyası.")
+    parser.add_argument("--update-baseline", action="store_true", help="Sonuçları temel değer olarak kaydeder.")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası.")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    home_dir = tempfile.mkdtemp(prefix="atam-kiyaslama-")
+    os.environ["HOME"] = home_dir # Kullanıcının gerçek zil verilerine dokunulmaz
+    sys.path.insert(0, os.path.abspath(APP_DIR))
+
+    results = run_benchmarks()
+    report = {"environment": environment_summary(),
+              "metrics": {name: {"value": round(value, 3), "unit": METRICS[name][0], "tolerance": METRICS[name][1]}
+                          for name, value in results.items()}}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    regressions = 0
+    for name, value, reference, ratio, regressed in compare(results, baseline):
+        unit = METRICS[name][0]
+        if reference is None:
+            print(f"{name:36} {value:12.2f} {unit:5} (temel değer yok)")
+            continue
+        regressions += regressed
+        print(f"{name:36} {value:12.2f} {unit:5} temel {reference:10.2f}  x{ratio:.2f}" + ("  GERİLEME" if regressed else ""))
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"Temel değerler kaydedildi: {args.baseline}")
+        return 0
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
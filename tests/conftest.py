@@ -0,0 +1,9 @@
+"""Sınamalar uygulama modüllerini paketlenmiş dizindeki düz adlarıyla içe aktarır."""
+
+import os
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                       "atam-okul-zili", "usr", "share", "Atam_Okul_Zili")
+sys.path.insert(0, os.path.abspath(APP_DIR))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
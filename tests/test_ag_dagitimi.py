@@ -0,0 +1,54 @@
+"""Bir denetleyici ve iki düğümün aynı makinede, tek süreçte dağıtımı."""
+
+import asyncio
+import json
+import os
+
+from ag_dagitimi import BellController, BellNode
+from veri_deposu import JournaledDataStore
+
+
+async def wait_until(condition, timeout=10.0):
+    for _ in range(int(timeout / 0.05)):
+        if condition():
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("Düğümler zamanında güncellenmedi.")
+
+def test_controller_distributes_edit_and_asset_to_two_nodes(tmp_path):
+    sound = tmp_path / "zil.wav"
+    sound.write_bytes(b"RIFF-zil-sesi")
+    controller_file = tmp_path / "denetleyici" / "okul_zili_data.json"
+    controller_file.parent.mkdir()
+    data = {"school_name": "Atatürk İlkokulu", "bell_sound_paths": {"İçeri": str(sound)},
+            "lesson_times": {"Pazartesi": {"Sabah": {"1.Ders": {"İçeri": "08:30"}}}}}
+    controller_file.write_text(json.dumps(data), encoding="utf-8")
+
+    async def scenario():
+        controller = BellController(str(controller_file), "anahtar", host="127.0.0.1", port=0, poll_interval=0.05)
+        await controller.start()
+        nodes = []
+        for node_id in ("lab-1", "lab-2"):
+            node_file = tmp_path / node_id / "okul_zili_data.json"
+            node_file.parent.mkdir()
+            node_file.write_text(json.dumps({"audio_zones": {"Ana Bina": {"device": "null"}}}), encoding="utf-8")
+            nodes.append(BellNode("127.0.0.1", controller.port, node_id, "anahtar", str(node_file)))
+        tasks = [asyncio.get_running_loop().create_task(node.run_forever()) for node in nodes]
+        try:
+            await wait_until(lambda: all(node.version == controller.version for node in nodes))
+            data["lesson_times"]["Pazartesi"]["Sabah"]["1.Ders"]["İçeri"] = "08:40"
+            controller_file.write_text(json.dumps(data), encoding="utf-8")
+            await wait_until(lambda: controller.version == 2 and all(node.version == 2 for node in nodes))
+        finally:
+            for task in tasks:
+                task.cancel()
+        return nodes
+
+    for node in asyncio.run(scenario()):
+        node_data = JournaledDataStore(node.data_file).load()
+        assert node_data["lesson_times"]["Pazartesi"]["Sabah"]["1.Ders"]["İçeri"] == "08:40"
+        assert node_data["audio_zones"] == {"Ana Bina": {"device": "null"}} # Makineye özel alan korunur
+        asset_path = node_data["bell_sound_paths"]["İçeri"]
+        assert os.path.dirname(asset_path) == node.asset_dir
+        with open(asset_path, 'rb') as f:
+            assert f.read() == sound.read_bytes()
@@ -0,0 +1,29 @@
+"""Çizelgenin CSV ve iCalendar olarak dışa aktarılıp yeniden okunması."""
+
+import pytest
+
+from cizelge_aktarimi import export_schedule, import_schedule, ScheduleImportError, CSV_HEADER
+from ders_cizelgesi import Schedule
+
+
+def sample_schedule():
+    schedule = Schedule()
+    schedule.set_text("Pazartesi", "Sabah", "1.Ders", "İçeri", "08:30")
+    schedule.set_text("Pazartesi", "Sabah", "1.Ders", "Öğretmenler", "08:28")
+    schedule.set_text("Pazartesi", "Sabah", "1.Ders", "Teneffüs", "09:10:15") # Saniyeli zil
+    schedule.set_text("Çarşamba", "Öğle", "3.Ders", "İçeri", "14:05:30")
+    schedule.set_text("Pazar", "Sabah", "1.Ders", "İçeri", "00:00:01")
+    return schedule
+
+@pytest.mark.parametrize("extension", ["csv", "ics"])
+def test_round_trip(tmp_path, extension):
+    schedule = sample_schedule()
+    path = str(tmp_path / f"cizelge.{extension}")
+    export_schedule(schedule, path)
+    assert import_schedule(path) == schedule
+
+def test_csv_without_rows_is_rejected(tmp_path):
+    path = tmp_path / "bos.csv"
+    path.write_text(",".join(CSV_HEADER) + "\n", encoding="utf-8")
+    with pytest.raises(ScheduleImportError):
+        import_schedule(str(path))